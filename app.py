@@ -1,9 +1,16 @@
+import logging
+import os
+import sys
+
 import dash
 import dash_bootstrap_components as dbc
-from dash import html, dcc, page_container
+from dash import html, page_container
+from utils import cache, compresion
 
 app = dash.Dash(__name__, use_pages=True, external_stylesheets=[dbc.themes.BOOTSTRAP])
 server = app.server
+cache.iniciar(server)
+compresion.iniciar(server)
 app.layout = html.Div([
     # Encabezado principal con fondo sutil
     html.Header(
@@ -61,7 +68,24 @@ app.layout = html.Div([
     page_container
 ])
 
+# Las vistas por defecto se pueden calcular antes de atender tráfico con
+# PRECALENTAR=1. Con la cache en memoria del proceso (la de por defecto) solo
+# conviene con gunicorn --preload: se hace una vez en el proceso maestro y los
+# workers heredan la cache; sin --preload cada worker repetiría el cálculo.
+# Con un backend compartido (FileSystemCache, Redis) se llena aparte con
+# `python app.py precalentar`.
+if os.environ.get('PRECALENTAR', '0') == '1' and sys.argv[1:] != ['precalentar']:
+    cache.precalentar()
+
 
 
 if __name__ == "__main__":
-    app.run_server(debug=True)
+    if sys.argv[1:] == ['precalentar']:
+        logging.basicConfig(level=logging.INFO, format='%(message)s')
+        if not cache.compartida():
+            # Una cache en memoria se pierde al terminar este proceso
+            logging.error('precalentar requiere un CACHE_TYPE compartido (FileSystemCache, RedisCache)')
+            sys.exit(1)
+        cache.precalentar()
+    else:
+        app.run_server(debug=True)
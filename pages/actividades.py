@@ -1,3 +1,4 @@
+import functools
 import pandas as pd
 import numpy as np
 import dash
@@ -5,9 +6,15 @@ from dash import dcc, html, Input, Output, dash_table, State
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import plotly.express as px
+from utils import almacen, bitsets, cache, cubo, figuras, indicadores, memo, paginacion
+from utils.treemap import construir_treemap, profundidades, rollup, treemap_de_niveles
 
-# Cargar el archivo CSV
-df = pd.read_csv('actividades.csv')
+# Dataset compartido y su cubo de agregados (se calculan una sola vez por proceso)
+df = almacen.obtener('actividades')
+cubo.precalcular('actividades')
+bitsets.precalcular('actividades', 'Seccion', 'DISTRITO')
+bitsets.precalcular('actividades', 'Division', 'DISTRITO')
+bitsets.precalcular('actividades', 'Actividad_principal', 'DISTRITO')
 
 descripciones = {
     'a': """
@@ -53,12 +60,35 @@ Una actividad ampliamente distribuida sugiere una mayor adaptabilidad y populari
 dash.register_page(__name__, path="/actividades")
 
 
+def dropdown(radio):
+    if radio == 'Seccion':   
+        valores = sorted(df['Seccion'].unique())
+        options = [{"label": v, "value": v} for v in valores]
+        value = []
+    elif radio == 'Division':
+        valores = sorted(df['Division'].unique())
+        options = [{"label": v, "value": v} for v in valores]
+        value = []
+    elif radio == 'Actividad_principal':
+        valores = sorted(df['Actividad_principal'].unique())
+        options = [{"label": v, "value": v} for v in valores]
+        value = []
+    
+    return options, value
+
+
+# Opciones y selección por defecto de cada modo del radio: se calculan una vez
+# y viajan con el layout, así el cambio de modo se resuelve en el navegador
+CATALOGOS = {radio: dict(zip(['options', 'value'], dropdown(radio))) for radio in ['Seccion', 'Division', 'Actividad_principal']}
+
 # Inicializar la figura vacía para evitar errores
 fig= go.Figure()
 fig2= go.Figure()
 # Layout de la página principal
 layout = dbc.Container([
 
+    dcc.Store(id='catalogosc', data=CATALOGOS),
+
     # Título centrado
     dbc.Row([
         dbc.Col(
@@ -196,8 +226,13 @@ layout = dbc.Container([
                     'lineHeight': '15px'
                 },
                 data=[],
-                filter_action='native',
-                sort_action='native',
+                page_action='custom',
+                page_current=0,
+                page_size=paginacion.TAMANO_PAGINA,
+                filter_action='custom',
+                filter_query='',
+                sort_action='custom',
+                sort_by=[],
             ),
             width=8,
             className='mx-auto'
@@ -231,32 +266,29 @@ layout = dbc.Container([
 ], fluid=True)
 
 
-@dash.callback(
+dash.clientside_callback(
+    """
+    function(radio, catalogos) {
+        var catalogo = catalogos[radio];
+        return [catalogo.options, catalogo.value];
+    }
+    """,
     Output('dropdown-optionsc', 'options'),
     Output('dropdown-optionsc', 'value'),
-    Input('radioc', 'value')
+    Input('radioc', 'value'),
+    State('catalogosc', 'data')
 )
-def dropdown(radio):
-    if radio == 'Seccion':   
-        valores = sorted(df['Seccion'].unique())
-        options = [{"label": v, "value": v} for v in valores]
-        value = []
-    elif radio == 'Division':
-        valores = sorted(df['Division'].unique())
-        options = [{"label": v, "value": v} for v in valores]
-        value = []
-    elif radio == 'Actividad_principal':
-        valores = sorted(df['Actividad_principal'].unique())
-        options = [{"label": v, "value": v} for v in valores]
-        value = []
-    
-    return options, value
+
+
+def _rentabilidades(tabla, global_empresas):
+    # Columnas derivadas de los treemaps 'c' a partir de las sumas de la tabla
+    tabla['porcentaje_empresas'] = indicadores.participacion(tabla['Cantidad_Empresas'], global_empresas)
+    tabla['rentabilidad_empresas'] = indicadores.rentabilidad(tabla['PARTICIPACION'], tabla['porcentaje_empresas'])
+    return tabla
+
 
 @dash.callback(
     [Output('plot1c', 'figure'),
-     Output('plot2c', 'figure'),
-     Output('tablec', 'columns'),
-     Output('tablec', 'data'),
      Output('explicacion-containerb', 'children')],  
     [State('radioc', 'value'),
      Input('dropdown-optionsc', 'value'),
@@ -266,14 +298,13 @@ def dropdown(radio):
 #+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 
+@cache.memorizar('actividades', cache.seleccion)
 def update_dashboard(radio, selected_options, selected_info):
     
 #----------------------------------------------------------------------------------------------
 #-----------------------------------------------------------------------------------------------
     if radio == 'Seccion':
         seleccionados = selected_options
-        dff = df.loc[df['Seccion'].isin(seleccionados)]
-        dff2 = df.copy()
 #------------------------------------------------------------------------------------------------
 #------------------------------------------------------------------------------------------------------------------------------------------------------------- 
 #        
@@ -282,74 +313,502 @@ def update_dashboard(radio, selected_options, selected_info):
             children = descripciones.get('a') 
 
             # Agrupar y sumar las empresas por Sección, Departamento y Distrito
-            df_secciones = dff.groupby(['Seccion', 'DEPARTAMENTO', 'DISTRITO'])['Cantidad_Empresas'].sum().reset_index()
-            df_secciones2 = dff2.groupby(['Seccion', 'DEPARTAMENTO', 'DISTRITO'])['Cantidad_Empresas'].sum().reset_index()
-            # Crear una columna de código único para Sección
-            df_secciones['Codigo_Seccion'] = df_secciones['Seccion'].astype('category').cat.codes
-
-            # Vincular el código de Sección a los Departamentos y Distritos
-            df_secciones['DEPARTAMENTO_COD'] = df_secciones['Codigo_Seccion'].astype(str) + " - " + df_secciones['DEPARTAMENTO']
-            df_secciones['DISTRITO_COD'] = df_secciones['DEPARTAMENTO_COD'] + " - " + df_secciones['DISTRITO']
-
-            # Inicializar listas para el Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 1️⃣ Agregar Secciones (Nivel Abuelo)
-            for _, row in df_secciones[['Seccion', 'Codigo_Seccion']].drop_duplicates().iterrows():
-                labels.append(row['Seccion'])
-                parents.append('')  # No tiene padre, es la raíz
-                values.append(df_secciones[df_secciones['Seccion'] == row['Seccion']]['Cantidad_Empresas'].sum())
-
-            # 2️⃣ Agregar Departamentos (Nivel Padre)
-            for _, row in df_secciones[['DEPARTAMENTO_COD', 'Seccion']].drop_duplicates().iterrows():
-                labels.append(row['DEPARTAMENTO_COD'])
-                parents.append(row['Seccion'])  # El padre de cada departamento es la sección
-                values.append(df_secciones[df_secciones['DEPARTAMENTO_COD'] == row['DEPARTAMENTO_COD']]['Cantidad_Empresas'].sum())
-
-            # 3️⃣ Agregar Distritos (Nivel Hijo)
-            for _, row in df_secciones[['DISTRITO_COD', 'DEPARTAMENTO_COD']].drop_duplicates().iterrows():
-                labels.append(row['DISTRITO_COD'])
-                parents.append(row['DEPARTAMENTO_COD'])  # El padre de cada distrito es el departamento
-                values.append(df_secciones[df_secciones['DISTRITO_COD'] == row['DISTRITO_COD']]['Cantidad_Empresas'].sum())
+            df_secciones = cubo.agregado('actividades', ['Seccion', 'DEPARTAMENTO', 'DISTRITO'], ['Cantidad_Empresas'], seleccion={'Seccion': seleccionados})
+
+            # Jerarquía del treemap: un groupby por nivel
+            arbol = construir_treemap(df_secciones, ['Seccion', 'DEPARTAMENTO', 'DISTRITO'], 'Cantidad_Empresas')
+
+            # Crear el gráfico Treemap
+            fig = figuras.treemap(
+                **arbol,
+                hoverinfo="label+value+percent entry",  # Información al pasar el mouse
+                textinfo="label+value+percent entry",  # Mostrar etiqueta + valor + porcentaje
+            )
+
+            # Mostrar gráfico
+            fig.update_layout(title=f'Cantidad de empresas en cada territorio por secciones economicas')
+
+
+
+#-------------------------------------------------------------------------------------------------------------------------------
+#         
+        elif selected_info == 'b':
+
+            children = descripciones.get('b') 
+
+            df_secciones = cubo.agregado('actividades', ['Seccion', 'DEPARTAMENTO', 'DISTRITO'], ['PARTICIPACION'], seleccion={'Seccion': seleccionados})
+
+            # Jerarquía del treemap: un groupby por nivel
+            arbol = construir_treemap(df_secciones, ['Seccion', 'DEPARTAMENTO', 'DISTRITO'], 'PARTICIPACION')
+
+            # Crear el gráfico Treemap
+            fig = figuras.treemap(
+                **arbol,
+                hoverinfo="label+value+percent entry",  # Información al pasar el mouse
+                textinfo="label+value+percent entry",  # Mostrar etiqueta + valor + porcentaje
+            )
+            # Mostrar gráfico
+            fig.update_layout(title=f'Distribucion de ganancias en cada territorio por secciones economicas')
+#-----------------------------------------------------------------------------------------------------------------------------------
+        elif selected_info == 'c':
+            children = descripciones.get('c')
+
+            # Total global (para todos los sectores)
+            global_empresas = df['Cantidad_Empresas'].sum()
+
+            # Todos los niveles de la jerarquía salen del agregado más fino
+            niveles = ['Seccion', 'DEPARTAMENTO', 'DISTRITO']
+            hojas = cubo.agregado('actividades', niveles, ['Cantidad_Empresas', 'PARTICIPACION'], seleccion={'Seccion': seleccionados})
+            tablas = rollup(hojas, niveles, ['Cantidad_Empresas', 'PARTICIPACION'])
+            derivar = functools.partial(_rentabilidades, global_empresas=global_empresas)
+            tablas = [derivar(tabla) for tabla in tablas]
+            arbol = treemap_de_niveles(tablas, niveles, 'rentabilidad_empresas', derivar=derivar)
+
+            fig = figuras.treemap(
+                **arbol,
+                hoverinfo="label+value+percent entry",
+                textinfo="label+value+percent entry"
+            )
+            fig.update_layout(title=f"Rentabilidad por sector economico (treemap): Sección, Departamento y Distrito en {selected_options}")
+
+#-----------------------------------------------------------------------------------------------------------------------------------
+
+        elif selected_info == 'd':
+
+            children = descripciones.get('d')
+
+            # Agrupar y sumar las empresas por Sección, Division y actividad principal
+            df_secciones = cubo.agregado('actividades', ['Seccion', 'Division', 'Actividad_principal'], ['Cantidad_Empresas'], seleccion={'Seccion': seleccionados})
+
+            # Jerarquía del treemap: un groupby por nivel
+            arbol = construir_treemap(df_secciones, ['Seccion', 'Division', 'Actividad_principal'], 'Cantidad_Empresas')
 
             # Crear el gráfico Treemap
-            fig = go.Figure(go.Treemap(
+            fig = figuras.treemap(
+                **arbol,
+                hoverinfo="label+value+percent entry",  # Información al pasar el mouse
+                textinfo="label+value+percent entry",  # Mostrar etiqueta + valor + porcentaje
+            )
+            fig.update_layout(title='Cantidad de empresas segun secciones economicas seleccionadas')
+
+ #----------------------------------------------------------------------------------------------------------------------------------------------------------       
+        elif selected_info == 'e':
+
+            children = descripciones.get('e')
+
+# Cantidad de empresas por cada habitante 
+#+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+            pd.set_option('display.float_format', '{:,.0f}'.format)
+
+            df_secciones = cubo.agregado('actividades', ['Seccion', 'Division', 'Actividad_principal'], ['Aporte'], seleccion={'Seccion': seleccionados})
+            df_secciones['GANANCIA'] = df_secciones['Aporte'] * 10
+
+            # Jerarquía del treemap: un groupby por nivel
+            arbol = construir_treemap(df_secciones, ['Seccion', 'Division', 'Actividad_principal'], 'GANANCIA')
+            arbol['values'] = arbol['values'].astype('int64')
+
+            # Textos formateados por nivel
+            prefijos = ['Sección', 'División', 'Actividad']
+            text = [f"{label}<br>{total:,.0f}" for label, total in zip(arbol['labels'], arbol['values'])]
+            hovertext = [
+                f"{prefijos[nivel]}: {label}<br>Ganancia: {total:,.0f}"
+                for nivel, label, total in zip(profundidades(arbol), arbol['labels'], arbol['values'])
+            ]
+
+            # Crear el gráfico Treemap
+            fig = figuras.treemap(
+                **arbol,
+                text=text,
+                hovertext=hovertext,
+                hoverinfo='text',
+                textinfo='text'
+            )
+
+            fig.update_layout(margin=dict(t=50, l=25, r=25, b=25))
+            fig.update_layout(title='Ganancias por secciones economicas seleccionadas. Total Pais = G$ 53.682.677.926.130')
+
+ #----------------------------------------------------------------------------------------------------------------------------------------
+
+
+        elif selected_info == 'f':
+
+            children = descripciones.get('f')
+
+# Cantidad de distritos por seccion economica
+#+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+          
+
+            df_secciones = cubo.agregado('actividades', ['Seccion'], ['Cantidad_Distritos'], seleccion={'Seccion': seleccionados}).rename(columns={'Cantidad_Distritos': 'DISTRITO'})
+            # Distritos en los que se desarrolla alguna de las seleccionadas (OR de sus filas de bits)
+            total = bitsets.distintos('actividades', 'Seccion', 'DISTRITO', seleccionados)
+
+            # Un solo nivel, sin raíz: columnas completas y los valores como array
+            labels = df_secciones['Seccion'].astype(str).tolist()
+            parents = [''] * len(df_secciones)
+            values = df_secciones['DISTRITO'].to_numpy()
+
+            # 3️⃣ Crear Treemap
+            fig = figuras.treemap(
                 labels=labels,
                 parents=parents,
                 values=values,
+                hoverinfo="label+value",
+                textinfo="label+value",
+            )
+
+
+            fig.update_layout(title=f'Cantidad de distritos en las que se desarrollan las secciones seleccionadas ({total} en conjunto). Total de distritos = 253')
+
+
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------       
+#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------   
+    elif radio == 'Division':
+        seleccionados = selected_options
+
+    #------------------------------------------------------------------------------------------------------------------------------------------------------------- 
+    #        
+        if selected_info == 'a':
+
+            children = descripciones.get('a')
+
+            # Agrupar y sumar las empresas por Division, Departamento y Distrito
+            df_divisiones = cubo.agregado('actividades', ['Division', 'DEPARTAMENTO', 'DISTRITO'], ['Cantidad_Empresas'], seleccion={'Division': seleccionados})
+
+            # Jerarquía del treemap: un groupby por nivel
+            arbol = construir_treemap(df_divisiones, ['Division', 'DEPARTAMENTO', 'DISTRITO'], 'Cantidad_Empresas')
+
+            # Crear el gráfico Treemap
+            fig = figuras.treemap(
+                **arbol,
                 hoverinfo="label+value+percent entry",  # Información al pasar el mouse
                 textinfo="label+value+percent entry",  # Mostrar etiqueta + valor + porcentaje
-            ))
+            )
 
             # Mostrar gráfico
             fig.update_layout(title=f'Cantidad de empresas en cada territorio por secciones economicas')
 
-            df_secciones2 = dff2.groupby(['Seccion', 'DEPARTAMENTO', 'DISTRITO'])['Cantidad_Empresas'].sum().reset_index()
+
+
+    #-------------------------------------------------------------------------------------------------------------------------------
+    #         
+        elif selected_info == 'b':
+
+            children = descripciones.get('b')   
+
+            df_divisiones = cubo.agregado('actividades', ['Division', 'DEPARTAMENTO', 'DISTRITO'], ['PARTICIPACION'], seleccion={'Division': seleccionados})
+
+            # Jerarquía del treemap: un groupby por nivel
+            arbol = construir_treemap(df_divisiones, ['Division', 'DEPARTAMENTO', 'DISTRITO'], 'PARTICIPACION')
+
+            # Crear el gráfico Treemap
+            fig = figuras.treemap(
+                **arbol,
+                hoverinfo="label+value+percent entry",  # Información al pasar el mouse
+                textinfo="label+value+percent entry",  # Mostrar etiqueta + valor + porcentaje
+            )
+            # Mostrar gráfico
+            fig.update_layout(title=f'Distribucion de ganancias en cada territorio por divisiones economicas')
+#-----------------------------------------------------------------------------------------------------------------------------------
+        elif selected_info == 'c':
+            children = descripciones.get('c')
+
+            # Total global (para todos los sectores)
+            global_empresas = df['Cantidad_Empresas'].sum()
+
+            # Todos los niveles de la jerarquía salen del agregado más fino
+            niveles = ['Division', 'DEPARTAMENTO', 'DISTRITO']
+            hojas = cubo.agregado('actividades', niveles, ['Cantidad_Empresas', 'PARTICIPACION'], seleccion={'Division': seleccionados})
+            tablas = rollup(hojas, niveles, ['Cantidad_Empresas', 'PARTICIPACION'])
+            derivar = functools.partial(_rentabilidades, global_empresas=global_empresas)
+            tablas = [derivar(tabla) for tabla in tablas]
+            arbol = treemap_de_niveles(tablas, niveles, 'rentabilidad_empresas', derivar=derivar)
+
+            fig = figuras.treemap(
+                **arbol,
+                hoverinfo="label+value+percent entry",
+                textinfo="label+value+percent entry"
+            )
+            fig.update_layout(title=f"Rentabilidad por sector economico (treemap): División, Departamento y Distrito en {selected_options}")
+
+#-----------------------------------------------------------------------------------------------------------------------------------
+
+        elif selected_info == 'd':
+
+            children = descripciones.get('d') 
+
+
+
+            # Agrupar y sumar las empresas por División y Actividad Principal
+            df_divisiones = cubo.agregado('actividades', ['Division', 'Actividad_principal'], ['Cantidad_Empresas'], seleccion={'Division': seleccionados})
+            df_divisiones = df_divisiones.loc[df_divisiones['Division'] != 'Desconocido']
+
+            # Jerarquía del treemap: un groupby por nivel
+            arbol = construir_treemap(df_divisiones, ['Division', 'Actividad_principal'], 'Cantidad_Empresas')
+
+            # Crear el gráfico Treemap
+            fig = figuras.treemap(
+                **arbol,
+                hoverinfo="label+value+percent parent",
+                textinfo="label+value+percent parent"
+            )
+
+            fig.update_layout(title='Cantidad de empresas según divisiones económicas seleccionadas')
+
+    #----------------------------------------------------------------------------------------------------------------------------------------------------------       
+        elif selected_info == 'e':
+
+            children = descripciones.get('e')
+
+            pd.set_option('display.float_format', '{:,.0f}'.format)
+
+                        # Agrupar y calcular ganancia por División y Actividad Principal
+            df_divisiones = cubo.agregado('actividades', ['Division', 'Actividad_principal'], ['Aporte'], seleccion={'Division': seleccionados})
+            df_divisiones = df_divisiones.loc[df_divisiones['Division'] != 'Desconocido']
+            # Calcular ganancia
+            df_divisiones['GANANCIA'] = df_divisiones['Aporte'] * 10
+
+            # Jerarquía del treemap: un groupby por nivel
+            arbol = construir_treemap(df_divisiones, ['Division', 'Actividad_principal'], 'GANANCIA')
+            arbol['values'] = arbol['values'].astype('int64')
+
+            # Textos formateados por nivel
+            prefijos = ['División', 'Actividad']
+            text = [f"{label}<br>{total:,.0f}" for label, total in zip(arbol['labels'], arbol['values'])]
+            hovertext = [
+                f"{prefijos[nivel]}: {label}<br>Ganancia: {total:,.0f}"
+                for nivel, label, total in zip(profundidades(arbol), arbol['labels'], arbol['values'])
+            ]
+
+            # Crear el gráfico Treemap
+            fig = figuras.treemap(
+                **arbol,
+                text=text,
+                hovertext=hovertext,
+                hoverinfo='text',
+                textinfo='text'
+            )
+
+            fig.update_layout(
+                title='Ganancias por divisiones económicas seleccionadas. Total País = G$ 53.682.677.926.130',
+                margin=dict(t=50, l=25, r=25, b=25)
+            )
+    #----------------------------------------------------------------------------------------------------------------------------------------
+
+
+        elif selected_info == 'f':
+
+            children = descripciones.get('f')   
+         
+                # Cantidad de distritos por división económica
+#+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+            df_divisiones = cubo.agregado('actividades', ['Division'], ['Cantidad_Distritos'], seleccion={'Division': seleccionados}).rename(columns={'Cantidad_Distritos': 'DISTRITO'})
+            # Distritos en los que se desarrolla alguna de las seleccionadas (OR de sus filas de bits)
+            total = bitsets.distintos('actividades', 'Division', 'DISTRITO', seleccionados)
+            df_divisiones = df_divisiones.loc[df_divisiones['Division'] != 'Desconocido']
+            # Un solo nivel, sin raíz: columnas completas y los valores como array
+            labels = df_divisiones['Division'].astype(str).tolist()
+            parents = [''] * len(df_divisiones)
+            values = df_divisiones['DISTRITO'].to_numpy()
+
+            # Crear Treemap
+            fig = figuras.treemap(
+                labels=labels,
+                parents=parents,
+                values=values,
+                hoverinfo="label+value",
+                textinfo="label+value",
+            )
+
+            fig.update_layout(title=f'Cantidad de distritos en las que se desarrollan las divisiones seleccionadas ({total} en conjunto). Total de distritos = 253')  
+            
+#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------   
+    elif radio == 'Actividad_principal':
+        seleccionados = selected_options
+
+    #------------------------------------------------------------------------------------------------------------------------------------------------------------- 
+    #        
+        if selected_info == 'a':
+
+            children = descripciones.get('a')
+
+            # Agrupar y sumar las empresas por Actividad_principal, Departamento y Distrito
+            df_actividades = cubo.agregado('actividades', ['Actividad_principal', 'DEPARTAMENTO', 'DISTRITO'], ['Cantidad_Empresas'], seleccion={'Actividad_principal': seleccionados})
+
+            # Jerarquía del treemap: un groupby por nivel
+            arbol = construir_treemap(df_actividades, ['Actividad_principal', 'DEPARTAMENTO', 'DISTRITO'], 'Cantidad_Empresas')
+
+            # Crear el gráfico Treemap
+            fig = figuras.treemap(
+                **arbol,
+                hoverinfo="label+value+percent entry",  # Información al pasar el mouse
+                textinfo="label+value+percent entry",  # Mostrar etiqueta + valor + porcentaje
+            )
+
+            # Mostrar gráfico
+            fig.update_layout(title=f'Cantidad de empresas en cada territorio por actividad economicas')
+
+
+
+    #-------------------------------------------------------------------------------------------------------------------------------
+    #         
+        elif selected_info == 'b':
+
+            children = descripciones.get('b')
+
+            df_actividades = cubo.agregado('actividades', ['Actividad_principal', 'DEPARTAMENTO', 'DISTRITO'], ['PARTICIPACION'], seleccion={'Actividad_principal': seleccionados})
+
+            # Jerarquía del treemap: un groupby por nivel
+            arbol = construir_treemap(df_actividades, ['Actividad_principal', 'DEPARTAMENTO', 'DISTRITO'], 'PARTICIPACION')
+
+            # Crear el gráfico Treemap
+            fig = figuras.treemap(
+                **arbol,
+                hoverinfo="label+value+percent entry",  # Información al pasar el mouse
+                textinfo="label+value+percent entry",  # Mostrar etiqueta + valor + porcentaje
+            )
+            fig.update_layout(title='Distribución de ganancias en cada territorio por actividades económicas')
+#-----------------------------------------------------------------------------------------------------------------------------------
+        elif selected_info == 'c':
+            children = descripciones.get('c')
+
+            # Total global (para todos los sectores)
+            global_empresas = df['Cantidad_Empresas'].sum()
+
+            # Todos los niveles de la jerarquía salen del agregado más fino
+            niveles = ['Actividad_principal', 'DEPARTAMENTO', 'DISTRITO']
+            hojas = cubo.agregado('actividades', niveles, ['Cantidad_Empresas', 'PARTICIPACION'], seleccion={'Actividad_principal': seleccionados})
+            tablas = rollup(hojas, niveles, ['Cantidad_Empresas', 'PARTICIPACION'])
+            derivar = functools.partial(_rentabilidades, global_empresas=global_empresas)
+            tablas = [derivar(tabla) for tabla in tablas]
+            arbol = treemap_de_niveles(tablas, niveles, 'rentabilidad_empresas', derivar=derivar)
+
+            fig = figuras.treemap(
+                **arbol,
+                hoverinfo="label+value+percent entry",
+                textinfo="label+value+percent entry"
+            )
+            fig.update_layout(title=f"Rentabilidad por sector economico (treemap): Actividad, Departamento y Distrito en {selected_options}")
+
+    #-----------------------------------------------------------------------------------------------------------------------------------
+
+        elif selected_info == 'd':
+
+            children = descripciones.get('d')
+
+        # Cantidad de empresas por actividad economica
+
+           # Agrupar y sumar las empresas por Actividad Principal
+            df_actividades = cubo.agregado('actividades', ['Actividad_principal'], ['Cantidad_Empresas'], seleccion={'Actividad_principal': seleccionados})
+            df_actividades = df_actividades.loc[df_actividades['Actividad_principal'] != 'Desconocido']
+
+            # Un solo nivel, sin raíz: columnas completas y los valores como array
+            labels = df_actividades['Actividad_principal'].astype(str).tolist()
+            parents = [''] * len(df_actividades)
+            values = df_actividades['Cantidad_Empresas'].to_numpy()
+
+            # Crear el gráfico Treemap
+            fig = figuras.treemap(
+                labels=labels,
+                parents=parents,
+                values=values,
+                hoverinfo="label+value+percent entry",
+                textinfo="label+value+percent entry"
+            )
+
+            fig.update_layout(title='Cantidad de empresas según actividades económicas principales')
+
+
+    #----------------------------------------------------------------------------------------------------------------------------------------------------------       
+        elif selected_info == 'e':
+
+            children = descripciones.get('e')
+
+
+            pd.set_option('display.float_format', '{:,.0f}'.format)
+
+            # Agrupar y calcular ganancia por Actividad Principal
+            df_actividades = cubo.agregado('actividades', ['Actividad_principal'], ['Aporte'], seleccion={'Actividad_principal': seleccionados})
+            df_actividades = df_actividades.loc[df_actividades['Actividad_principal'] != 'Desconocido']
+            # Calcular ganancia
+            df_actividades['GANANCIA'] = df_actividades['Aporte'] * 10
+
+            # Actividades (único nivel raíz), con los valores como array
+            labels = df_actividades['Actividad_principal'].astype(str).tolist()
+            parents = [''] * len(df_actividades)
+            values = df_actividades['GANANCIA'].to_numpy().astype('int64')
+            text = [f"{label}<br>{total:,.0f}" for label, total in zip(labels, values)]
+            hovertext = [f"Actividad: {label}<br>Ganancia: {total:,.0f}" for label, total in zip(labels, values)]
+
+            # Crear el gráfico Treemap
+            fig = figuras.treemap(
+                labels=labels,
+                parents=parents,
+                values=values,
+                text=text,
+                hovertext=hovertext,
+                hoverinfo='text',
+                textinfo='text'
+            )
+
+            fig.update_layout(
+                title='Ganancias por actividades económicas principales. Total País = G$ 53.682.677.926.130',
+                margin=dict(t=50, l=25, r=25, b=25)
+            )
+
+
+    #----------------------------------------------------------------------------------------------------------------------------------------
+
+
+        elif selected_info == 'f':
+
+            children = descripciones.get('f')
+
+            df_actividades = cubo.agregado('actividades', ['Actividad_principal'], ['Cantidad_Distritos'], seleccion={'Actividad_principal': seleccionados}).rename(columns={'Cantidad_Distritos': 'DISTRITO'})
+            # Distritos en los que se desarrolla alguna de las seleccionadas (OR de sus filas de bits)
+            total = bitsets.distintos('actividades', 'Actividad_principal', 'DISTRITO', seleccionados)
+            df_actividades = df_actividades.loc[df_actividades['Actividad_principal'] != 'Desconocido']
+
+            # Un solo nivel, sin raíz: columnas completas y los valores como array
+            labels = df_actividades['Actividad_principal'].astype(str).tolist()
+            parents = [''] * len(df_actividades)
+            values = df_actividades['DISTRITO'].to_numpy()
+
+            # Crear Treemap
+            fig = figuras.treemap(
+                labels=labels,
+                parents=parents,
+                values=values,
+                hoverinfo="label+value",
+                textinfo="label+value",
+            )
+
+            fig.update_layout(title=f'Cantidad de distritos en los que se desarrollan las actividades económicas principales seleccionadas ({total} en conjunto). Total de distritos = 253')
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------
+
+    return fig, children
+
+
+@memo.por_version('actividades')
+def nacional(radio, selected_info):
+    # Gráfico y tabla a nivel nacional: no dependen de la selección del dropdown,
+    # así que se calculan una sola vez por versión del dataset
+
+    if radio == 'Seccion':
+        if selected_info == 'a':
+            df_secciones2 = cubo.agregado('actividades', ['Seccion', 'DEPARTAMENTO', 'DISTRITO'], ['Cantidad_Empresas'])
             df_secciones2 = df_secciones2.sort_values(by='Cantidad_Empresas', ascending=False)
-            df_secciones3 = df_secciones2.groupby(['Seccion', 'DEPARTAMENTO'])['Cantidad_Empresas'].sum().reset_index()
+            df_secciones3 = df_secciones2.groupby(['Seccion', 'DEPARTAMENTO'], observed=True)['Cantidad_Empresas'].sum().reset_index()
             df_secciones3 = df_secciones3.sort_values(by='Cantidad_Empresas', ascending=False)
-            totales = df_secciones3.groupby('Seccion')['Cantidad_Empresas'].sum().reset_index()
+            totales = df_secciones3.groupby('Seccion', observed=True)['Cantidad_Empresas'].sum().reset_index()
             datos = df_secciones3
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                             datos,
                             x='Seccion',
                             y='Cantidad_Empresas',
                             color='DEPARTAMENTO',  # Se mantiene la categorización por 'Seccion'
-                            color_continuous_scale='Viridis',  # Aplica el mismo esquema de colores
-                            title='Cantidad de empresas en cada territorio')
+                            title='Cantidad de empresas en cada territorio', total=totales)
             # Ajustar la leyenda para que aparezca abajo
-            for i, row in totales.iterrows():
-                fig2.add_annotation(
-                    x=row['Seccion'],
-                    y=row['Cantidad_Empresas'],
-                    text=f"{int(row['Cantidad_Empresas']):,}",  # Formato con separador de miles
-                    showarrow=False,
-                    yshift=22,
-                    font=dict(color="black", size=12),
-                    textangle=90
-                )
 
             # Layout final
             fig2.update_layout(
@@ -373,82 +832,21 @@ def update_dashboard(radio, selected_options, selected_info):
                     )},       
             ]
 
-
-
-#-------------------------------------------------------------------------------------------------------------------------------
-#         
         elif selected_info == 'b':
-
-            children = descripciones.get('b') 
-
-            df_secciones = dff.groupby(['Seccion', 'DEPARTAMENTO', 'DISTRITO'])['PARTICIPACION'].sum().reset_index()
-            df_secciones2 = dff2.groupby(['Seccion', 'DEPARTAMENTO', 'DISTRITO'])['PARTICIPACION'].sum().reset_index()
-            # Crear una columna de código único para Sección
-            df_secciones['Codigo_Seccion'] = df_secciones['Seccion'].astype('category').cat.codes
-
-            # Vincular el código de Sección a los Departamentos y Distritos
-            df_secciones['DEPARTAMENTO_COD'] = df_secciones['Codigo_Seccion'].astype(str) + " - " + df_secciones['DEPARTAMENTO']
-            df_secciones['DISTRITO_COD'] = df_secciones['DEPARTAMENTO_COD'] + " - " + df_secciones['DISTRITO']
-
-            # Inicializar listas para el Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 1️⃣ Agregar Secciones (Nivel Abuelo)
-            for _, row in df_secciones[['Seccion', 'Codigo_Seccion']].drop_duplicates().iterrows():
-                labels.append(row['Seccion'])
-                parents.append('')  # No tiene padre, es la raíz
-                values.append(df_secciones[df_secciones['Seccion'] == row['Seccion']]['PARTICIPACION'].sum())
-
-            # 2️⃣ Agregar Departamentos (Nivel Padre)
-            for _, row in df_secciones[['DEPARTAMENTO_COD', 'Seccion']].drop_duplicates().iterrows():
-                labels.append(row['DEPARTAMENTO_COD'])
-                parents.append(row['Seccion'])  # El padre de cada departamento es la sección
-                values.append(df_secciones[df_secciones['DEPARTAMENTO_COD'] == row['DEPARTAMENTO_COD']]['PARTICIPACION'].sum())
-
-            # 3️⃣ Agregar Distritos (Nivel Hijo)
-            for _, row in df_secciones[['DISTRITO_COD', 'DEPARTAMENTO_COD']].drop_duplicates().iterrows():
-                labels.append(row['DISTRITO_COD'])
-                parents.append(row['DEPARTAMENTO_COD'])  # El padre de cada distrito es el departamento
-                values.append(df_secciones[df_secciones['DISTRITO_COD'] == row['DISTRITO_COD']]['PARTICIPACION'].sum())
-
-            # Crear el gráfico Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value+percent entry",  # Información al pasar el mouse
-                textinfo="label+value+percent entry",  # Mostrar etiqueta + valor + porcentaje
-            ))
-            # Mostrar gráfico
-            fig.update_layout(title=f'Distribucion de ganancias en cada territorio por secciones economicas')
-
-            df_secciones2 = dff2.groupby(['Seccion', 'DEPARTAMENTO', 'DISTRITO'])['PARTICIPACION'].sum().reset_index()
+            df_secciones2 = cubo.agregado('actividades', ['Seccion', 'DEPARTAMENTO', 'DISTRITO'], ['PARTICIPACION'])
             df_secciones2 = df_secciones2.sort_values(by='PARTICIPACION', ascending=False)
-            df_secciones3 = df_secciones2.groupby(['Seccion', 'DEPARTAMENTO'])['PARTICIPACION'].sum().reset_index()
+            df_secciones3 = df_secciones2.groupby(['Seccion', 'DEPARTAMENTO'], observed=True)['PARTICIPACION'].sum().reset_index()
             df_secciones3 = df_secciones3.sort_values(by='PARTICIPACION', ascending=False)
-            totales = df_secciones3.groupby('Seccion')['PARTICIPACION'].sum().reset_index()
+            totales = df_secciones3.groupby('Seccion', observed=True)['PARTICIPACION'].sum().reset_index()
             datos = df_secciones3
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                             datos,
                             x='Seccion',
                             y='PARTICIPACION',
                             color='DEPARTAMENTO',  # Se mantiene la categorización por 'Seccion'
-                            color_continuous_scale='Viridis',  # Aplica el mismo esquema de colores
-                            title='Participacion de sectores en la ganancia nacional')
+                            title='Participacion de sectores en la ganancia nacional', total=totales)
             # Ajustar la leyenda para que aparezca abajo
             # Ajustar la leyenda para que aparezca abajo
-            for i, row in totales.iterrows():
-                fig2.add_annotation(
-                    x=row['Seccion'],
-                    y=row['PARTICIPACION'],
-                    text=f"{int(row['PARTICIPACION']):,}",  # Formato con separador de miles
-                    showarrow=False,
-                    yshift=22,
-                    font=dict(color="black", size=12),
-                    textangle=90
-                )
 
             # Layout final
             fig2.update_layout(
@@ -479,118 +877,24 @@ def update_dashboard(radio, selected_options, selected_info):
                     )
                 },
             ]
-#-----------------------------------------------------------------------------------------------------------------------------------
-        elif selected_info == 'c':
-            children = descripciones.get('c')
 
+        elif selected_info == 'c':
             # Agrupar globalmente por Sección (sector económico)
-            secciones2 = dff2.groupby('Seccion').agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            ).reset_index()
+            secciones2 = cubo.agregado('actividades', 'Seccion', ['Cantidad_Empresas', 'PARTICIPACION'])
 
             # Total global (para todos los sectores)
-            global_empresas = dff2['Cantidad_Empresas'].sum()
+            global_empresas = df['Cantidad_Empresas'].sum()
             
 
             # Calcular el porcentaje global de empresas y la rentabilidad base para cada Sección
-            secciones2['porcentaje_empresas'] = secciones2['Cantidad_Empresas'] / global_empresas * 100
-            secciones2['rentabilidad_empresas'] = secciones2.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100) 
-                    if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0) else 0,
-                axis=1
-            )
-            secciones2 = secciones2.fillna(0)
-
-
-            # Nivel 1: Sección (sector económico)
-            df_seccion = dff.groupby('Seccion', as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            df_seccion['porcentaje_empresas'] = df_seccion['Cantidad_Empresas'] / global_empresas * 100
-            df_seccion['rentabilidad_empresas'] = df_seccion.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                    if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0) else 0,
-                axis=1
-            )
-            df_seccion = df_seccion.fillna(0)
-            df_seccion['SEC_ID'] = df_seccion['Seccion']  # Identificador único para el nivel Sección
-
-            # Nivel 2: Departamento, agrupando por Seccion y DEPARTAMENTO
-            df_departamento = dff.groupby(['Seccion','DEPARTAMENTO'], as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            df_departamento['porcentaje_empresas'] = df_departamento['Cantidad_Empresas'] / global_empresas * 100
-            df_departamento['rentabilidad_empresas'] = df_departamento.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                    if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0) else 0,
-                axis=1
-            )
-            df_departamento = df_departamento.fillna(0)
-            # Crear un ID combinando Seccion y Departamento
-            df_departamento['DEP_ID'] = df_departamento['Seccion'] + ' - ' + df_departamento['DEPARTAMENTO']
-
-            # Nivel 3: Distrito, agrupando por Seccion, DEPARTAMENTO y DISTRITO
-            df_distrito = dff.groupby(['Seccion','DEPARTAMENTO','DISTRITO'], as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            df_distrito['porcentaje_empresas'] = df_distrito['Cantidad_Empresas'] / global_empresas * 100
-            df_distrito['rentabilidad_empresas'] = df_distrito.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                    if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0) else 0,
-                axis=1
-            )
-            df_distrito = df_distrito.fillna(0)
-            # Crear un ID: Seccion - Departamento - Distrito
-            df_distrito['DIST_ID'] = df_distrito['Seccion'] + ' - ' + df_distrito['DEPARTAMENTO'] + ' - ' + df_distrito['DISTRITO']
-
-
-            ids = []
-            labels = []
-            parents = []
-            values = []
-
-            # Nivel 1: Sección
-            for _, row in df_seccion.iterrows():
-                ids.append(row['SEC_ID'])
-                labels.append(row['Seccion'])
-                parents.append('')  # Nivel superior
-                values.append(row['rentabilidad_empresas'])
-
-            # Nivel 2: Departamento
-            for _, row in df_departamento.iterrows():
-                ids.append(row['DEP_ID'])
-                labels.append(row['DEPARTAMENTO'])
-                parents.append(row['Seccion'])  # El padre es la Sección
-                values.append(row['rentabilidad_empresas'])
-
-            # Nivel 3: Distrito
-            for _, row in df_distrito.iterrows():
-                ids.append(row['DIST_ID'])
-                labels.append(row['DISTRITO'])
-                # El padre es el ID del departamento, que se compone de "Seccion - DEPARTAMENTO"
-                padre = row['Seccion'] + ' - ' + row['DEPARTAMENTO']
-                parents.append(padre)
-                values.append(row['rentabilidad_empresas'])
-
-            fig = go.Figure(go.Treemap(
-                ids=ids,
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value+percent entry",
-                textinfo="label+value+percent entry"
-            ))
-
-            fig.update_layout(title=f"Rentabilidad por sector economico (treemap): Sección, Departamento y Distrito en {selected_options}")
+            secciones2['porcentaje_empresas'] = indicadores.participacion(secciones2['Cantidad_Empresas'], global_empresas)
+            secciones2['rentabilidad_empresas'] = indicadores.rentabilidad(secciones2['PARTICIPACION'], secciones2['porcentaje_empresas'])
+            secciones2 = secciones2.fillna({'porcentaje_empresas': 0, 'rentabilidad_empresas': 0})
 
             # Usamos los datos globales por Sección (secciones2) para el gráfico de barras.
             secciones2 = secciones2.sort_values(by='rentabilidad_empresas', ascending=False) 
   
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 secciones2,
                 x='Seccion',
                 y='rentabilidad_empresas',
@@ -607,81 +911,24 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'RELACION', 'id': 'rentabilidad_empresas'}
             ]
 
-#-----------------------------------------------------------------------------------------------------------------------------------
-
         elif selected_info == 'd':
-
-            children = descripciones.get('d')
-
-            # Agrupar y sumar las empresas por Sección, Division y actividad principal
-            df_secciones = dff.groupby(['Seccion', 'Division', 'Actividad_principal'])['Cantidad_Empresas'].sum().reset_index()
-            df_secciones2 = dff2.groupby(['Seccion', 'Division', 'Actividad_principal'])['Cantidad_Empresas'].sum().reset_index()
-            # Crear una columna de código único para Sección
-            df_secciones['Codigo_Seccion'] = df_secciones['Seccion'].astype('category').cat.codes
-            df_secciones['Division_cod'] = df_secciones['Codigo_Seccion'].astype(str)+ " - " + df_secciones['Division']
-            df_secciones['Actividad_principal_cod'] = df_secciones['Division_cod'] + " - " + df_secciones['Actividad_principal']
-
-
-            # Inicializar listas para el Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 1️⃣ Agregar Secciones (Nivel Abuelo)
-            for _, row in df_secciones[['Seccion', 'Codigo_Seccion']].drop_duplicates().iterrows():
-                labels.append(row['Seccion'])
-                parents.append('')  # No tiene padre, es la raíz
-                values.append(df_secciones[df_secciones['Seccion'] == row['Seccion']]['Cantidad_Empresas'].sum())
-
-            # 2️⃣ Agregar Departamentos (Nivel Padre)
-            for _, row in df_secciones[['Seccion', 'Division_cod']].drop_duplicates().iterrows():
-                labels.append(row['Division_cod'])
-                parents.append(row['Seccion'])  # El padre de cada division es la sección
-                values.append(df_secciones[df_secciones['Division_cod'] == row['Division_cod']]['Cantidad_Empresas'].sum())
-
-            # 3️⃣ Agregar Distritos (Nivel Hijo)
-            for _, row in df_secciones[['Division_cod', 'Actividad_principal_cod']].drop_duplicates().iterrows():
-                labels.append(row['Actividad_principal_cod'])
-                parents.append(row['Division_cod'])  # El padre de cada actividad es la division
-                values.append(df_secciones[df_secciones['Actividad_principal_cod'] == row['Actividad_principal_cod']]['Cantidad_Empresas'].sum())
-
-            # Crear el gráfico Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value+percent entry",  # Información al pasar el mouse
-                textinfo="label+value+percent entry",  # Mostrar etiqueta + valor + porcentaje
-            ))
-            fig.update_layout(title='Cantidad de empresas segun secciones economicas seleccionadas')
+            df_secciones2 = cubo.agregado('actividades', ['Seccion', 'Division', 'Actividad_principal'], ['Cantidad_Empresas'])
 
             df_secciones2 = df_secciones2.sort_values(by='Cantidad_Empresas', ascending=False)
-            df_secciones3 = df_secciones2.groupby(['Seccion', 'Division'])['Cantidad_Empresas'].sum().reset_index()
+            df_secciones3 = df_secciones2.groupby(['Seccion', 'Division'], observed=True)['Cantidad_Empresas'].sum().reset_index()
             df_secciones3 = df_secciones3.sort_values(by='Cantidad_Empresas', ascending=False)
-            totales = df_secciones3.groupby('Seccion')['Cantidad_Empresas'].sum().reset_index()
+            totales = df_secciones3.groupby('Seccion', observed=True)['Cantidad_Empresas'].sum().reset_index()
 
             # Gráfico de barras apiladas
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 df_secciones3,
                 x='Seccion',
                 y='Cantidad_Empresas',
                 color='Division',
                 title='Cantidad de empresas segun secciones economicas',
-                color_discrete_sequence=px.colors.sequential.Viridis
+                color_discrete_sequence=px.colors.sequential.Viridis, total=totales, leyenda=False
             )
 
-            # Agregar anotaciones con el total por Sección
-            for i, row in totales.iterrows():
-                fig2.add_annotation(
-                    x=row['Seccion'],
-                    y=row['Cantidad_Empresas'],
-                    text=f"{int(row['Cantidad_Empresas']):,}",  # Formato con separador de miles
-                    showarrow=False,
-                    yshift=22,
-                    font=dict(color="black", size=12),
-                    textangle=90
-                )
-
             # Layout final
             fig2.update_layout(
                 showlegend=False,
@@ -690,7 +937,7 @@ def update_dashboard(radio, selected_options, selected_info):
 
 
             # Para la tabla se usan los datos filtrados
-            df_secciones4 = df_secciones2.groupby('Seccion')['Cantidad_Empresas'].sum().reset_index()
+            df_secciones4 = df_secciones2.groupby('Seccion', observed=True)['Cantidad_Empresas'].sum().reset_index()
             data = df_secciones4.to_dict('records')
             from dash.dash_table.Format import Format, Scheme, Group
             columns=[
@@ -703,105 +950,29 @@ def update_dashboard(radio, selected_options, selected_info):
                     )},       
             ]
 
- #----------------------------------------------------------------------------------------------------------------------------------------------------------       
         elif selected_info == 'e':
-
-            children = descripciones.get('e')
-
-# Cantidad de empresas por cada habitante 
-#+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-            pd.set_option('display.float_format', '{:,.0f}'.format)
-
-            df_secciones = dff.groupby(['Seccion', 'Division', 'Actividad_principal'])['Aporte'].sum().reset_index()
-            df_secciones2 = dff2.groupby(['Seccion', 'Division', 'Actividad_principal'])['Aporte'].sum().reset_index()
-            df_secciones['GANANCIA'] = df_secciones['Aporte'] * 10
+            df_secciones2 = cubo.agregado('actividades', ['Seccion', 'Division', 'Actividad_principal'], ['Aporte'])
             df_secciones2['GANANCIA'] = df_secciones2['Aporte'] * 10
             df_secciones2['GANANCIA'] = df_secciones2['GANANCIA'].astype(float)
 
-            # Crear una columna de código único para Sección
-            df_secciones['Codigo_Seccion'] = df_secciones['Seccion'].astype('category').cat.codes
-            df_secciones['Division_cod'] = df_secciones['Codigo_Seccion'].astype(str)+ " - " + df_secciones['Division']
-            df_secciones['Actividad_principal_cod'] = df_secciones['Division_cod'] + " - " + df_secciones['Actividad_principal']
-
-
-            # Rehacer listas con textos formateados
-            labels = []
-            parents = []
-            values = []
-            text = []
-            hovertext = []
-
-            # Secciones (abuelo)
-            for _, row in df_secciones[['Seccion', 'Codigo_Seccion']].drop_duplicates().iterrows():
-                total = int(df_secciones[df_secciones['Seccion'] == row['Seccion']]['GANANCIA'].sum())
-                labels.append(row['Seccion'])
-                parents.append('')
-                values.append(total)
-                text.append(f"{row['Seccion']}<br>{total:,.0f}")
-                hovertext.append(f"Sección: {row['Seccion']}<br>Ganancia: {total:,.0f}")
-
-            # Divisiones (padre)
-            for _, row in df_secciones[['Seccion', 'Division_cod']].drop_duplicates().iterrows():
-                total = int(df_secciones[df_secciones['Division_cod'] == row['Division_cod']]['GANANCIA'].sum())
-                labels.append(row['Division_cod'])
-                parents.append(row['Seccion'])
-                values.append(total)
-                text.append(f"{row['Division_cod']}<br>{total:,.0f}")
-                hovertext.append(f"División: {row['Division_cod']}<br>Ganancia: {total:,.0f}")
-
-            # Actividades (hijo)
-            for _, row in df_secciones[['Division_cod', 'Actividad_principal_cod']].drop_duplicates().iterrows():
-                total = int(df_secciones[df_secciones['Actividad_principal_cod'] == row['Actividad_principal_cod']]['GANANCIA'].sum())
-                labels.append(row['Actividad_principal_cod'])
-                parents.append(row['Division_cod'])
-                values.append(total)
-                text.append(f"{row['Actividad_principal_cod']}<br>{total:,.0f}")
-                hovertext.append(f"Actividad: {row['Actividad_principal_cod']}<br>Ganancia: {total:,.0f}")
-
-            # Crear el gráfico Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                text=text,
-                hovertext=hovertext,
-                hoverinfo='text',
-                textinfo='text'
-            ))
-
-            fig.update_layout(margin=dict(t=50, l=25, r=25, b=25))
-            fig.update_layout(title='Ganancias por secciones economicas seleccionadas. Total Pais = G$ 53.682.677.926.130')
-
             df_secciones2 = df_secciones2.sort_values(by='GANANCIA', ascending=False)
-            df_secciones3 = df_secciones2.groupby(['Seccion', 'Division'])['GANANCIA'].sum().reset_index()
-            totales = df_secciones3.groupby('Seccion')['GANANCIA'].sum().reset_index()
+            df_secciones3 = df_secciones2.groupby(['Seccion', 'Division'], observed=True)['GANANCIA'].sum().reset_index()
+            totales = df_secciones3.groupby('Seccion', observed=True)['GANANCIA'].sum().reset_index()
 
             df_secciones2 = df_secciones2.sort_values(by='GANANCIA', ascending=False)
-            df_secciones3 = df_secciones2.groupby(['Seccion', 'Division'])['GANANCIA'].sum().reset_index()
+            df_secciones3 = df_secciones2.groupby(['Seccion', 'Division'], observed=True)['GANANCIA'].sum().reset_index()
             df_secciones3 = df_secciones3.sort_values(by='GANANCIA', ascending=False)
-            totales = df_secciones3.groupby('Seccion')['GANANCIA'].sum().reset_index()
+            totales = df_secciones3.groupby('Seccion', observed=True)['GANANCIA'].sum().reset_index()
 
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 df_secciones3,
                 x='Seccion',
                 y='GANANCIA',
                 color='Division',
                 title='Ganancias por secciones económicas',
-                color_discrete_sequence=px.colors.sequential.Viridis
+                color_discrete_sequence=px.colors.sequential.Viridis, total=totales, separador='.', leyenda=False
             )
 
-            # Agregar anotaciones con el total por Sección
-            for i, row in totales.iterrows():
-                fig2.add_annotation(
-                    x=row['Seccion'],
-                    y=row['GANANCIA'],
-                    text=f"{int(row['GANANCIA']):,}".replace(",", "."),  # ✅ Separador de miles con punto
-                    showarrow=False,
-                    yshift=70,
-                    font=dict(color="black", size=12),
-                    textangle=90
-                )
-
             # Formatear eje Y en miles de millones de guaraníes (eje nomás, sin cambiar datos)
             max_val = df_secciones3['GANANCIA'].max()
             tick_vals = np.arange(0, max_val + 1e12, 1e12)
@@ -821,7 +992,7 @@ def update_dashboard(radio, selected_options, selected_info):
 
 
             # Para la tabla se usan los datos filtrados
-            df_secciones4 = df_secciones2.groupby('Seccion')['GANANCIA'].sum().reset_index()
+            df_secciones4 = df_secciones2.groupby('Seccion', observed=True)['GANANCIA'].sum().reset_index()
 
             # Pasar a la tabla
             data = df_secciones4.to_dict('records')
@@ -844,46 +1015,12 @@ def update_dashboard(radio, selected_options, selected_info):
                 },
             ]
 
- #----------------------------------------------------------------------------------------------------------------------------------------
-
-
         elif selected_info == 'f':
-
-            children = descripciones.get('f')
-
-# Cantidad de distritos por seccion economica
-#+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-          
-
-            df_secciones = dff.groupby(['Seccion'])['DISTRITO'].nunique().reset_index()
-            df_secciones2 = dff2.groupby(['Seccion'])['DISTRITO'].nunique().reset_index()
-
-            # 2️⃣ Inicializar listas para Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 🔹 Agregar distritos como único nivel
-            for _, row in df_secciones.iterrows():
-                labels.append(row['Seccion'])
-                parents.append("")  # Nivel raíz, ya que no hay departamentos ni país
-                values.append(row['DISTRITO'])
-
-            # 3️⃣ Crear Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value",
-                textinfo="label+value",
-            ))
-
-
-            fig.update_layout(title='Cantidad de distritos en las que se desarrollan las secciones seleccionadas. Total de distritos = 253')
+            df_secciones2 = cubo.agregado('actividades', ['Seccion'], ['Cantidad_Distritos']).rename(columns={'Cantidad_Distritos': 'DISTRITO'})
 
             datos = df_secciones2.sort_values(by='DISTRITO', ascending=False)
             # Gráfico de barras apiladas
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 datos,
                 x='Seccion',
                 y='DISTRITO',
@@ -897,77 +1034,22 @@ def update_dashboard(radio, selected_options, selected_info):
             )
 
 
-            # Para la tabla se usan los datos filtrados
-            data = df_secciones2.to_dict('records')
-            columns=[
-                {'name': 'SECCION', 'id': 'Seccion'},
-                {'name': 'DISTRITOS', 'id': 'DISTRITO'},
-            ]
-
-
-#-----------------------------------------------------------------------------------------------------------------------------------------------------------       
-#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------   
-    elif radio == 'Division':
-        seleccionados = selected_options
-        dff = df.loc[df['Division'].isin(seleccionados)]  
-        dff2 = df.copy()    
-
-    #------------------------------------------------------------------------------------------------------------------------------------------------------------- 
-    #        
-        if selected_info == 'a':
-
-            children = descripciones.get('a')
-
-            # Agrupar y sumar las empresas por Division, Departamento y Distrito
-            df_divisiones = dff.groupby(['Division', 'DEPARTAMENTO', 'DISTRITO'])['Cantidad_Empresas'].sum().reset_index()
-            df_divisiones2 = dff2.groupby(['Division', 'DEPARTAMENTO', 'DISTRITO'])['Cantidad_Empresas'].sum().reset_index()
-            # Crear una columna de código único para Division
-            df_divisiones['Codigo_Division'] = df_divisiones['Division'].astype('category').cat.codes
-
-            # Vincular el código de Division a los Departamentos y Distritos
-            df_divisiones['DEPARTAMENTO_COD'] = df_divisiones['Codigo_Division'].astype(str) + " - " + df_divisiones['DEPARTAMENTO']
-            df_divisiones['DISTRITO_COD'] = df_divisiones['DEPARTAMENTO_COD'] + " - " + df_divisiones['DISTRITO']
-
-            # Inicializar listas para el Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 1️⃣ Agregar Division (Nivel Abuelo)
-            for _, row in df_divisiones[['Division', 'Codigo_Division']].drop_duplicates().iterrows():
-                labels.append(row['Division'])
-                parents.append('')  # No tiene padre, es la raíz
-                values.append(df_divisiones[df_divisiones['Division'] == row['Division']]['Cantidad_Empresas'].sum())
-
-            # 2️⃣ Agregar Departamentos (Nivel Padre)
-            for _, row in df_divisiones[['DEPARTAMENTO_COD', 'Division']].drop_duplicates().iterrows():
-                labels.append(row['DEPARTAMENTO_COD'])
-                parents.append(row['Division'])  # El padre de cada departamento es la Division
-                values.append(df_divisiones[df_divisiones['DEPARTAMENTO_COD'] == row['DEPARTAMENTO_COD']]['Cantidad_Empresas'].sum())
-
-            # 3️⃣ Agregar Distritos (Nivel Hijo)
-            for _, row in df_divisiones[['DISTRITO_COD', 'DEPARTAMENTO_COD']].drop_duplicates().iterrows():
-                labels.append(row['DISTRITO_COD'])
-                parents.append(row['DEPARTAMENTO_COD'])  # El padre de cada distrito es el departamento
-                values.append(df_divisiones[df_divisiones['DISTRITO_COD'] == row['DISTRITO_COD']]['Cantidad_Empresas'].sum())
-
-            # Crear el gráfico Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value+percent entry",  # Información al pasar el mouse
-                textinfo="label+value+percent entry",  # Mostrar etiqueta + valor + porcentaje
-            ))
+            # Para la tabla se usan los datos filtrados
+            data = df_secciones2.to_dict('records')
+            columns=[
+                {'name': 'SECCION', 'id': 'Seccion'},
+                {'name': 'DISTRITOS', 'id': 'DISTRITO'},
+            ]
 
-            # Mostrar gráfico
-            fig.update_layout(title=f'Cantidad de empresas en cada territorio por secciones economicas')
+    elif radio == 'Division':
+        if selected_info == 'a':
+            df_divisiones2 = cubo.agregado('actividades', ['Division', 'DEPARTAMENTO', 'DISTRITO'], ['Cantidad_Empresas'])
 
-            df_divisiones3 = dff2.groupby('Division')['Cantidad_Empresas'].sum().reset_index()
+            df_divisiones3 = cubo.agregado('actividades', 'Division', ['Cantidad_Empresas'])
             df_divisiones3 = df_divisiones3.sort_values(by='Cantidad_Empresas', ascending=False)
             df_divisiones3 = df_divisiones3.head(20)
             datos = df_divisiones3
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                             datos,
                             x='Division',
                             y='Cantidad_Empresas',
@@ -994,63 +1076,14 @@ def update_dashboard(radio, selected_options, selected_info):
                     )},       
             ]
 
-
-
-    #-------------------------------------------------------------------------------------------------------------------------------
-    #         
         elif selected_info == 'b':
-
-            children = descripciones.get('b')   
-
-            df_divisiones = dff.groupby(['Division', 'DEPARTAMENTO', 'DISTRITO'])['PARTICIPACION'].sum().reset_index()
-            # Crear una columna de código único para Division
-            df_divisiones['Codigo_Division'] = df_divisiones['Division'].astype('category').cat.codes
-
-            # Vincular el código de Division a los Departamentos y Distritos
-            df_divisiones['DEPARTAMENTO_COD'] = df_divisiones['Codigo_Division'].astype(str) + " - " + df_divisiones['DEPARTAMENTO']
-            df_divisiones['DISTRITO_COD'] = df_divisiones['DEPARTAMENTO_COD'] + " - " + df_divisiones['DISTRITO']
-
-            # Inicializar listas para el Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 1️⃣ Agregar Division (Nivel Abuelo)
-            for _, row in df_divisiones[['Division', 'Codigo_Division']].drop_duplicates().iterrows():
-                labels.append(row['Division'])
-                parents.append('')  # No tiene padre, es la raíz
-                values.append(df_divisiones[df_divisiones['Division'] == row['Division']]['PARTICIPACION'].sum())
-
-            # 2️⃣ Agregar Departamentos (Nivel Padre)
-            for _, row in df_divisiones[['DEPARTAMENTO_COD', 'Division']].drop_duplicates().iterrows():
-                labels.append(row['DEPARTAMENTO_COD'])
-                parents.append(row['Division'])  # El padre de cada departamento es la sección
-                values.append(df_divisiones[df_divisiones['DEPARTAMENTO_COD'] == row['DEPARTAMENTO_COD']]['PARTICIPACION'].sum())
-
-            # 3️⃣ Agregar Distritos (Nivel Hijo)
-            for _, row in df_divisiones[['DISTRITO_COD', 'DEPARTAMENTO_COD']].drop_duplicates().iterrows():
-                labels.append(row['DISTRITO_COD'])
-                parents.append(row['DEPARTAMENTO_COD'])  # El padre de cada distrito es el departamento
-                values.append(df_divisiones[df_divisiones['DISTRITO_COD'] == row['DISTRITO_COD']]['PARTICIPACION'].sum())
-
-            # Crear el gráfico Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value+percent entry",  # Información al pasar el mouse
-                textinfo="label+value+percent entry",  # Mostrar etiqueta + valor + porcentaje
-            ))
-            # Mostrar gráfico
-            fig.update_layout(title=f'Distribucion de ganancias en cada territorio por divisiones economicas')
-
-            df_divisiones2 = dff2.groupby(['Division', 'DEPARTAMENTO', 'DISTRITO'])['PARTICIPACION'].sum().reset_index()
-            df_divisiones3 = df_divisiones2.groupby('Division')['PARTICIPACION'].sum().reset_index()
+            df_divisiones2 = cubo.agregado('actividades', ['Division', 'DEPARTAMENTO', 'DISTRITO'], ['PARTICIPACION'])
+            df_divisiones3 = df_divisiones2.groupby('Division', observed=True)['PARTICIPACION'].sum().reset_index()
             df_divisiones3 = df_divisiones3.sort_values(by='PARTICIPACION', ascending=False)
             df_divisiones3 = df_divisiones3.head(20)
             df_divisiones3 = df_divisiones3.sort_values(by='PARTICIPACION', ascending=False)
             datos = df_divisiones3
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                             datos,
                             x='Division',
                             y='PARTICIPACION',
@@ -1079,115 +1112,24 @@ def update_dashboard(radio, selected_options, selected_info):
                     )
                 },
             ]
-#-----------------------------------------------------------------------------------------------------------------------------------
-        elif selected_info == 'c':
-            children = descripciones.get('c')
 
+        elif selected_info == 'c':
             # Agrupar globalmente por DIVISION
-            divisiones2 = dff2.groupby('Division').agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            ).reset_index()
+            divisiones2 = cubo.agregado('actividades', 'Division', ['Cantidad_Empresas', 'PARTICIPACION'])
 
             # Calcular los totales globales (para usar en el cálculo de porcentajes en el DataFrame filtrado)
-            global_empresas = dff2['Cantidad_Empresas'].sum()
+            global_empresas = df['Cantidad_Empresas'].sum()
 
 
             # Calcular el porcentaje global de empresas y la rentabilidad base para cada División
-            divisiones2['porcentaje_empresas'] = divisiones2['Cantidad_Empresas'] / global_empresas * 100
-            divisiones2['rentabilidad_empresas'] = divisiones2.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                    if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0) else 0,
-                axis=1
-            )
-            divisiones2 = divisiones2.fillna(0)
-
-            # Nivel 1: División (agrupación a nivel Division)
-            df_division = dff.groupby('Division', as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            df_division['porcentaje_empresas'] = df_division['Cantidad_Empresas'] / global_empresas * 100
-            df_division['rentabilidad_empresas'] = df_division.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                    if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0) else 0,
-                axis=1
-            )
-            df_division = df_division.fillna(0)
-            df_division['DIV_ID'] = df_division['Division']  # Identificador único para el nivel división
-
-            # Nivel 2: Departamento, agrupando por Division y DEPARTAMENTO
-            df_departamento = dff.groupby(['Division', 'DEPARTAMENTO'], as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            df_departamento['porcentaje_empresas'] = df_departamento['Cantidad_Empresas'] / global_empresas * 100
-            df_departamento['rentabilidad_empresas'] = df_departamento.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                    if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0) else 0,
-                axis=1
-            )
-            df_departamento = df_departamento.fillna(0)
-            df_departamento['DEP_ID'] = df_departamento['Division'] + ' - ' + df_departamento['DEPARTAMENTO']
-
-            # Nivel 3: Distrito, agrupando por Division, DEPARTAMENTO y DISTRITO
-            df_distrito = dff.groupby(['Division', 'DEPARTAMENTO', 'DISTRITO'], as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            df_distrito['porcentaje_empresas'] = df_distrito['Cantidad_Empresas'] / global_empresas * 100
-            df_distrito['rentabilidad_empresas'] = df_distrito.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                    if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0) else 0,
-                axis=1
-            )
-            df_distrito = df_distrito.fillna(0)
-            df_distrito['DIST_ID'] = df_distrito['Division'] + ' - ' + df_distrito['DEPARTAMENTO'] + ' - ' + df_distrito['DISTRITO']
-
-
-            ids = []
-            labels = []
-            parents = []
-            values = []
-
-            # Nivel 1: División
-            for _, row in df_division.iterrows():
-                ids.append(row['DIV_ID'])
-                labels.append(row['Division'])
-                parents.append('')  # Sin padre (nivel superior)
-                values.append(row['rentabilidad_empresas'])
-
-            # Nivel 2: Departamento
-            for _, row in df_departamento.iterrows():
-                ids.append(row['DEP_ID'])
-                labels.append(row['DEPARTAMENTO'])
-                # El padre es el valor de 'Division' (ID del nivel 1)
-                parents.append(row['Division'])
-                values.append(row['rentabilidad_empresas'])
-
-            # Nivel 3: Distrito
-            for _, row in df_distrito.iterrows():
-                ids.append(row['DIST_ID'])
-                labels.append(row['DISTRITO'])
-                # El padre es la combinación: Division - DEPARTAMENTO
-                padre = row['Division'] + ' - ' + row['DEPARTAMENTO']
-                parents.append(padre)
-                values.append(row['rentabilidad_empresas'])
-
-            fig = go.Figure(go.Treemap(
-                ids=ids,
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value+percent entry",
-                textinfo="label+value+percent entry"
-            ))
-            fig.update_layout(title=f"Rentabilidad por sector economico (treemap): División, Departamento y Distrito en {selected_options}")
+            divisiones2['porcentaje_empresas'] = indicadores.participacion(divisiones2['Cantidad_Empresas'], global_empresas)
+            divisiones2['rentabilidad_empresas'] = indicadores.rentabilidad(divisiones2['PARTICIPACION'], divisiones2['porcentaje_empresas'])
+            divisiones2 = divisiones2.fillna({'porcentaje_empresas': 0, 'rentabilidad_empresas': 0})
 
             divisiones2 = divisiones2.sort_values(by='rentabilidad_empresas', ascending=False)
             divisiones3 = divisiones2.head(20)
             # Para el gráfico de barras usamos los datos globales por División (divisiones2)
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 divisiones3,
                 x='Division',
                 y='rentabilidad_empresas',
@@ -1203,60 +1145,18 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'RELACION', 'id': 'rentabilidad_empresas'}
             ]
 
-#-----------------------------------------------------------------------------------------------------------------------------------
-
         elif selected_info == 'd':
-
-            children = descripciones.get('d') 
-
-
-
-            # Agrupar y sumar las empresas por División y Actividad Principal
-            df_divisiones = dff.groupby(['Division', 'Actividad_principal'])['Cantidad_Empresas'].sum().reset_index()
-            df_divisiones2 = dff2.groupby(['Division', 'Actividad_principal'])['Cantidad_Empresas'].sum().reset_index()
-            df_divisiones = df_divisiones.loc[df_divisiones['Division'] != 'Desconocido']
+            df_divisiones2 = cubo.agregado('actividades', ['Division', 'Actividad_principal'], ['Cantidad_Empresas'])
             df_divisiones2 = df_divisiones2.loc[df_divisiones2['Division'] != 'Desconocido']
-            # Crear una columna de código único para División
-            df_divisiones['Codigo_Division'] = df_divisiones['Division'].astype('category').cat.codes.astype(str)
-            df_divisiones['Actividad_principal_cod'] = df_divisiones['Codigo_Division'] + " - " + df_divisiones['Actividad_principal']
-
-            # Inicializar listas para el Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 1️⃣ Agregar División (Nivel raíz)
-            for division in df_divisiones['Division'].unique():
-                total_empresas = df_divisiones[df_divisiones['Division'] == division]['Cantidad_Empresas'].sum()
-                labels.append(division)
-                parents.append("")  # Nivel raíz
-                values.append(total_empresas)
-
-            # 2️⃣ Agregar Actividades principales (Nivel hijo)
-            for _, row in df_divisiones.iterrows():
-                labels.append(row['Actividad_principal_cod'])
-                parents.append(row['Division'])  # El padre es la División
-                values.append(row['Cantidad_Empresas'])
-
-            # Crear el gráfico Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value+percent parent",
-                textinfo="label+value+percent parent"
-            ))
-
-            fig.update_layout(title='Cantidad de empresas según divisiones económicas seleccionadas')
 
-            df_divisiones3 = df_divisiones2.groupby(['Division'])['Cantidad_Empresas'].sum().reset_index()
+            df_divisiones3 = df_divisiones2.groupby(['Division'], observed=True)['Cantidad_Empresas'].sum().reset_index()
             df_divisiones3 = df_divisiones3.sort_values(by='Cantidad_Empresas', ascending=False)
             df_divisiones3 = df_divisiones3.head(20)
             df_divisiones3 = df_divisiones3.sort_values(by='Cantidad_Empresas', ascending=False)
 
 
             # Gráfico de barras apiladas
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 df_divisiones3,
                 x='Division',
                 y='Cantidad_Empresas',
@@ -1270,7 +1170,7 @@ def update_dashboard(radio, selected_options, selected_info):
             )
 
             # Para la tabla se usan los datos filtrados
-            df_divisiones4 = df_divisiones2.groupby('Division')['Cantidad_Empresas'].sum().reset_index()
+            df_divisiones4 = df_divisiones2.groupby('Division', observed=True)['Cantidad_Empresas'].sum().reset_index()
             data = df_divisiones4.to_dict('records')
             from dash.dash_table.Format import Format, Scheme, Group
             columns=[
@@ -1283,99 +1183,30 @@ def update_dashboard(radio, selected_options, selected_info):
                     )},       
             ]
 
-    #----------------------------------------------------------------------------------------------------------------------------------------------------------       
         elif selected_info == 'e':
-
-            children = descripciones.get('e')
-
-            pd.set_option('display.float_format', '{:,.0f}'.format)
-
-                        # Agrupar y calcular ganancia por División y Actividad Principal
-            df_divisiones = dff.groupby(['Division', 'Actividad_principal'])['Aporte'].sum().reset_index()
-            df_divisiones2 = dff2.groupby(['Division', 'Actividad_principal'])['Aporte'].sum().reset_index()
-            df_divisiones = df_divisiones.loc[df_divisiones['Division'] != 'Desconocido']
+            df_divisiones2 = cubo.agregado('actividades', ['Division', 'Actividad_principal'], ['Aporte'])
             df_divisiones2 = df_divisiones2.loc[df_divisiones2['Division'] != 'Desconocido']
-            # Calcular ganancia
-            df_divisiones['GANANCIA'] = df_divisiones['Aporte'] * 10
             df_divisiones2['GANANCIA'] = df_divisiones2['Aporte'] * 10
             df_divisiones2['GANANCIA'] = df_divisiones2['GANANCIA'].astype(float)
 
-            # Crear códigos únicos
-            df_divisiones['Codigo_Division'] = df_divisiones['Division'].astype('category').cat.codes
-            df_divisiones['Actividad_principal_cod'] = df_divisiones['Codigo_Division'].astype(str) + " - " + df_divisiones['Actividad_principal']
-
-            # Inicializar listas
-            labels = []
-            parents = []
-            values = []
-            text = []
-            hovertext = []
-
-            # División (padre)
-            for _, row in df_divisiones[['Division', 'Codigo_Division']].drop_duplicates().iterrows():
-                total = int(df_divisiones[df_divisiones['Division'] == row['Division']]['GANANCIA'].sum())
-                labels.append(row['Division'])
-                parents.append('')
-                values.append(total)
-                text.append(f"{row['Division']}<br>{total:,.0f}")
-                hovertext.append(f"División: {row['Division']}<br>Ganancia: {total:,.0f}")
-
-            # Actividades (hijo)
-            for _, row in df_divisiones[['Division', 'Actividad_principal_cod']].drop_duplicates().iterrows():
-                total = int(df_divisiones[df_divisiones['Actividad_principal_cod'] == row['Actividad_principal_cod']]['GANANCIA'].sum())
-                labels.append(row['Actividad_principal_cod'])
-                parents.append(row['Division'])
-                values.append(total)
-                text.append(f"{row['Actividad_principal_cod']}<br>{total:,.0f}")
-                hovertext.append(f"Actividad: {row['Actividad_principal_cod']}<br>Ganancia: {total:,.0f}")
-
-            # Crear el gráfico Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                text=text,
-                hovertext=hovertext,
-                hoverinfo='text',
-                textinfo='text'
-            ))
-
-            fig.update_layout(
-                title='Ganancias por divisiones económicas seleccionadas. Total País = G$ 53.682.677.926.130',
-                margin=dict(t=50, l=25, r=25, b=25)
-            )
-
 
             # Datos para gráfico de barras
-            df_divisiones3 = df_divisiones2.groupby(['Division'])['GANANCIA'].sum().reset_index()
+            df_divisiones3 = df_divisiones2.groupby(['Division'], observed=True)['GANANCIA'].sum().reset_index()
             df_divisiones3 = df_divisiones3.sort_values(by='GANANCIA', ascending=False)
             df_divisiones3 = df_divisiones3.head(20)
             df_divisiones3 = df_divisiones3.sort_values(by='GANANCIA', ascending=False)
-            totales = df_divisiones3.groupby('Division')['GANANCIA'].sum().reset_index()
+            totales = df_divisiones3.groupby('Division', observed=True)['GANANCIA'].sum().reset_index()
 
-            import numpy as np
 
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 df_divisiones3,
                 x='Division',
                 y='GANANCIA',
                 #color='Division',
                 title='Ganancias por divisiones económicas',
-                color_discrete_sequence=px.colors.sequential.Viridis
+                color_discrete_sequence=px.colors.sequential.Viridis, total=totales, separador='.'
             )
 
-            # Agregar anotaciones con el total por Sección
-            for i, row in totales.iterrows():
-                fig2.add_annotation(
-                    x=row['Division'],
-                    y=row['GANANCIA'],
-                    text=f"{int(row['GANANCIA']):,}".replace(",", "."),  # ✅ Separador de miles con punto
-                    showarrow=False,
-                    yshift=70,
-                    font=dict(color="black", size=12),
-                    textangle=90
-                )
-
             # Formatear eje Y en miles de millones de guaraníes (eje nomás, sin cambiar datos)
             max_val = df_divisiones3['GANANCIA'].max()
             tick_vals = np.arange(0, max_val + 1e12, 1e12)
@@ -1393,7 +1224,7 @@ def update_dashboard(radio, selected_options, selected_info):
 
 
             # Tabla de resumen por División
-            df_divisiones4 = df_divisiones2.groupby('Division')['GANANCIA'].sum().reset_index()
+            df_divisiones4 = df_divisiones2.groupby('Division', observed=True)['GANANCIA'].sum().reset_index()
 
             # Pasar a la tabla
             data = df_divisiones4.to_dict('records')
@@ -1414,46 +1245,15 @@ def update_dashboard(radio, selected_options, selected_info):
                     )
                 },
             ]
-    #----------------------------------------------------------------------------------------------------------------------------------------
-
 
         elif selected_info == 'f':
-
-            children = descripciones.get('f')   
-         
-                # Cantidad de distritos por división económica
-#+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-
-            df_divisiones = dff.groupby(['Division'])['DISTRITO'].nunique().reset_index()
-            df_divisiones2 = dff2.groupby(['Division'])['DISTRITO'].nunique().reset_index()
-            df_divisiones = df_divisiones.loc[df_divisiones['Division'] != 'Desconocido']
+            df_divisiones2 = cubo.agregado('actividades', ['Division'], ['Cantidad_Distritos']).rename(columns={'Cantidad_Distritos': 'DISTRITO'})
             df_divisiones2 = df_divisiones2.loc[df_divisiones2['Division'] != 'Desconocido']
-            # Inicializar listas para Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 🔹 Agregar divisiones como único nivel
-            for _, row in df_divisiones.iterrows():
-                labels.append(row['Division'])
-                parents.append("")  # Nivel raíz
-                values.append(row['DISTRITO'])
-
-            # Crear Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value",
-                textinfo="label+value",
-            ))
-
-            fig.update_layout(title='Cantidad de distritos en las que se desarrollan las divisiones seleccionadas. Total de distritos = 253')  
 
                 # Gráfico de barras apiladas
             df_divisiones2 = df_divisiones2.sort_values(by='DISTRITO', ascending=False)
             datos = df_divisiones2.head(20)
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 datos,
                 x='Division',
                 y='DISTRITO',
@@ -1472,69 +1272,16 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'DIVISION', 'id': 'Division'},
                 {'name': 'DISTRITOS', 'id': 'DISTRITO'},
             ]
-            
-#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------   
-    elif radio == 'Actividad_principal':
-        seleccionados = selected_options
-        dff = df.loc[df['Actividad_principal'].isin(seleccionados)]  
-        dff2 = df.copy()    
 
-    #------------------------------------------------------------------------------------------------------------------------------------------------------------- 
-    #        
+    elif radio == 'Actividad_principal':
         if selected_info == 'a':
+            df_actividades2 = cubo.agregado('actividades', ['Actividad_principal', 'DEPARTAMENTO', 'DISTRITO'], ['Cantidad_Empresas'])
 
-            children = descripciones.get('a')
-
-            # Agrupar y sumar las empresas por Actividad_principal, Departamento y Distrito
-            df_actividades = dff.groupby(['Actividad_principal', 'DEPARTAMENTO', 'DISTRITO'])['Cantidad_Empresas'].sum().reset_index()
-            df_actividades2 = dff2.groupby(['Actividad_principal', 'DEPARTAMENTO', 'DISTRITO'])['Cantidad_Empresas'].sum().reset_index()
-            # Crear una columna de código único para Actividad_principal
-            df_actividades['Codigo_Actividad'] = df_actividades['Actividad_principal'].astype('category').cat.codes
-
-            # Vincular el código de Actividad_principal a los Departamentos y Distritos
-            df_actividades['DEPARTAMENTO_COD'] = df_actividades['Codigo_Actividad'].astype(str) + " - " + df_actividades['DEPARTAMENTO']
-            df_actividades['DISTRITO_COD'] = df_actividades['DEPARTAMENTO_COD'] + " - " + df_actividades['DISTRITO']
-
-            # Inicializar listas para el Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 1️⃣ Agregar Actividad_principal (Nivel Abuelo)
-            for _, row in df_actividades[['Actividad_principal', 'Codigo_Actividad']].drop_duplicates().iterrows():
-                labels.append(row['Actividad_principal'])
-                parents.append('')  # No tiene padre, es la raíz
-                values.append(df_actividades[df_actividades['Actividad_principal'] == row['Actividad_principal']]['Cantidad_Empresas'].sum())
-
-            # 2️⃣ Agregar Departamentos (Nivel Padre)
-            for _, row in df_actividades[['DEPARTAMENTO_COD', 'Actividad_principal']].drop_duplicates().iterrows():
-                labels.append(row['DEPARTAMENTO_COD'])
-                parents.append(row['Actividad_principal'])  # El padre de cada departamento es la Actividad_principal
-                values.append(df_actividades[df_actividades['DEPARTAMENTO_COD'] == row['DEPARTAMENTO_COD']]['Cantidad_Empresas'].sum())
-
-            # 3️⃣ Agregar Distritos (Nivel Hijo)
-            for _, row in df_actividades[['DISTRITO_COD', 'DEPARTAMENTO_COD']].drop_duplicates().iterrows():
-                labels.append(row['DISTRITO_COD'])
-                parents.append(row['DEPARTAMENTO_COD'])  # El padre de cada distrito es el departamento
-                values.append(df_actividades[df_actividades['DISTRITO_COD'] == row['DISTRITO_COD']]['Cantidad_Empresas'].sum())
-
-            # Crear el gráfico Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value+percent entry",  # Información al pasar el mouse
-                textinfo="label+value+percent entry",  # Mostrar etiqueta + valor + porcentaje
-            ))
-
-            # Mostrar gráfico
-            fig.update_layout(title=f'Cantidad de empresas en cada territorio por actividad economicas')
-
-            df_actividades3 = dff2.groupby('Actividad_principal')['Cantidad_Empresas'].sum().reset_index()
+            df_actividades3 = cubo.agregado('actividades', 'Actividad_principal', ['Cantidad_Empresas'])
             df_actividades3 = df_actividades3.sort_values(by='Cantidad_Empresas', ascending=False)
             df_actividades3 = df_actividades3.head(20)
             datos = df_actividades3
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                             datos,
                             x='Actividad_principal',
                             y='Cantidad_Empresas',
@@ -1562,62 +1309,14 @@ def update_dashboard(radio, selected_options, selected_info):
                     )},       
             ]
 
-
-
-    #-------------------------------------------------------------------------------------------------------------------------------
-    #         
         elif selected_info == 'b':
-
-            children = descripciones.get('b')
-
-            df_actividades = dff.groupby(['Actividad_principal', 'DEPARTAMENTO', 'DISTRITO'])['PARTICIPACION'].sum().reset_index()
-            df_actividades2 = dff2.groupby(['Actividad_principal', 'DEPARTAMENTO', 'DISTRITO'])['PARTICIPACION'].sum().reset_index()
-
-            # Crear una columna de código único para Actividad_principal
-            df_actividades['Codigo_Actividad'] = df_actividades['Actividad_principal'].astype('category').cat.codes
-
-            # Vincular el código de Actividad_principal a los Departamentos y Distritos
-            df_actividades['DEPARTAMENTO_COD'] = df_actividades['Codigo_Actividad'].astype(str) + " - " + df_actividades['DEPARTAMENTO']
-            df_actividades['DISTRITO_COD'] = df_actividades['DEPARTAMENTO_COD'] + " - " + df_actividades['DISTRITO']
-
-            # Inicializar listas para el Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 1️⃣ Agregar Actividad_principal (Nivel Abuelo)
-            for _, row in df_actividades[['Actividad_principal', 'Codigo_Actividad']].drop_duplicates().iterrows():
-                labels.append(row['Actividad_principal'])
-                parents.append('')  # No tiene padre, es la raíz
-                values.append(df_actividades[df_actividades['Actividad_principal'] == row['Actividad_principal']]['PARTICIPACION'].sum())
-
-            # 2️⃣ Agregar Departamentos (Nivel Padre)
-            for _, row in df_actividades[['DEPARTAMENTO_COD', 'Actividad_principal']].drop_duplicates().iterrows():
-                labels.append(row['DEPARTAMENTO_COD'])
-                parents.append(row['Actividad_principal'])  # El padre de cada departamento es la actividad
-                values.append(df_actividades[df_actividades['DEPARTAMENTO_COD'] == row['DEPARTAMENTO_COD']]['PARTICIPACION'].sum())
-
-            # 3️⃣ Agregar Distritos (Nivel Hijo)
-            for _, row in df_actividades[['DISTRITO_COD', 'DEPARTAMENTO_COD']].drop_duplicates().iterrows():
-                labels.append(row['DISTRITO_COD'])
-                parents.append(row['DEPARTAMENTO_COD'])  # El padre de cada distrito es el departamento
-                values.append(df_actividades[df_actividades['DISTRITO_COD'] == row['DISTRITO_COD']]['PARTICIPACION'].sum())
-
-            # Crear el gráfico Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value+percent entry",  # Información al pasar el mouse
-                textinfo="label+value+percent entry",  # Mostrar etiqueta + valor + porcentaje
-            ))
-            fig.update_layout(title='Distribución de ganancias en cada territorio por actividades económicas')
+            df_actividades2 = cubo.agregado('actividades', ['Actividad_principal', 'DEPARTAMENTO', 'DISTRITO'], ['PARTICIPACION'])
 
             # Barras horizontales: principales actividades
-            df_actividades3 = df_actividades2.groupby('Actividad_principal')['PARTICIPACION'].sum().reset_index()
+            df_actividades3 = df_actividades2.groupby('Actividad_principal', observed=True)['PARTICIPACION'].sum().reset_index()
             df_actividades3 = df_actividades3.sort_values(by='PARTICIPACION', ascending=False).head(20)
             df_actividades3 = df_actividades3.sort_values(by='PARTICIPACION', ascending=False)
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 df_actividades3,
                 x='Actividad_principal',
                 y='PARTICIPACION',
@@ -1643,122 +1342,22 @@ def update_dashboard(radio, selected_options, selected_info):
                     )
                 },
             ]
-#-----------------------------------------------------------------------------------------------------------------------------------
-        elif selected_info == 'c':
-            children = descripciones.get('c')
 
+        elif selected_info == 'c':
             # Agrupar globalmente por Actividad_principal
-            act2 = dff2.groupby('Actividad_principal').agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            ).reset_index()
+            act2 = cubo.agregado('actividades', 'Actividad_principal', ['Cantidad_Empresas', 'PARTICIPACION'])
 
             # Total global de empresas (usado para el cálculo de porcentajes)
-            global_empresas = dff2['Cantidad_Empresas'].sum()
+            global_empresas = df['Cantidad_Empresas'].sum()
 
             # Calcular el porcentaje global de empresas para cada Actividad_principal
-            act2['porcentaje_empresas'] = act2['Cantidad_Empresas'] / global_empresas * 100
-            act2['rentabilidad_empresas'] = act2.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                            if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0)
-                            else 0,
-                axis=1
-            )
-            act2 = act2.fillna(0)
-
-         
-
-            # Nivel 1: Actividad_principal (agrupación a nivel top)
-            df_actividad = dff.groupby('Actividad_principal', as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            df_actividad['porcentaje_empresas'] = df_actividad['Cantidad_Empresas'] / global_empresas * 100
-            df_actividad['rentabilidad_empresas'] = df_actividad.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                            if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0)
-                            else 0,
-                axis=1
-            )
-            df_actividad = df_actividad.fillna(0)
-            # Usamos el propio campo como ID en este nivel
-            df_actividad['ACT_ID'] = df_actividad['Actividad_principal']
-
-            # Nivel 2: Departamento, agrupando por Actividad_principal y DEPARTAMENTO
-            df_dep = dff.groupby(['Actividad_principal','DEPARTAMENTO'], as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            df_dep['porcentaje_empresas'] = df_dep['Cantidad_Empresas'] / global_empresas * 100
-            df_dep['rentabilidad_empresas'] = df_dep.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                            if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0)
-                            else 0,
-                axis=1
-            )
-            df_dep = df_dep.fillna(0)
-            # Crear ID: concatenamos Actividad_principal y DEPARTAMENTO
-            df_dep['DEP_ID'] = df_dep['Actividad_principal'] + ' - ' + df_dep['DEPARTAMENTO']
-
-            # Nivel 3: Distrito, agrupando por Actividad_principal, DEPARTAMENTO y DISTRITO
-            df_dist = dff.groupby(['Actividad_principal','DEPARTAMENTO','DISTRITO'], as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            df_dist['porcentaje_empresas'] = df_dist['Cantidad_Empresas'] / global_empresas * 100
-            df_dist['rentabilidad_empresas'] = df_dist.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                            if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0)
-                            else 0,
-                axis=1
-            )
-            df_dist = df_dist.fillna(0)
-            # Crear ID: Concatenar Actividad_principal, DEPARTAMENTO y DISTRITO
-            df_dist['DIST_ID'] = df_dist['Actividad_principal'] + ' - ' + df_dist['DEPARTAMENTO'] + ' - ' + df_dist['DISTRITO']
-
-
-            ids = []
-            labels = []
-            parents = []
-            values = []
-
-            # Nivel 1: Actividad_principal
-            for _, row in df_actividad.iterrows():
-                ids.append(row['ACT_ID'])
-                labels.append(row['Actividad_principal'])
-                parents.append('')  # Nivel superior
-                values.append(row['rentabilidad_empresas'])
-
-            # Nivel 2: Departamento
-            for _, row in df_dep.iterrows():
-                ids.append(row['DEP_ID'])
-                labels.append(row['DEPARTAMENTO'])
-                # El padre es el valor de Actividad_principal (tal como aparece en row['Actividad_principal'])
-                parents.append(row['Actividad_principal'])
-                values.append(row['rentabilidad_empresas'])
-
-            # Nivel 3: Distrito
-            for _, row in df_dist.iterrows():
-                ids.append(row['DIST_ID'])
-                labels.append(row['DISTRITO'])
-                # El padre es la concatenación: Actividad_principal - DEPARTAMENTO (igual al DEP_ID)
-                padre = row['Actividad_principal'] + ' - ' + row['DEPARTAMENTO']
-                parents.append(padre)
-                values.append(row['rentabilidad_empresas'])
-
-            fig = go.Figure(go.Treemap(
-                ids=ids,
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value+percent entry",
-                textinfo="label+value+percent entry"
-            ))
-            fig.update_layout(title=f"Rentabilidad por sector economico (treemap): Actividad, Departamento y Distrito en {selected_options}")
+            act2['porcentaje_empresas'] = indicadores.participacion(act2['Cantidad_Empresas'], global_empresas)
+            act2['rentabilidad_empresas'] = indicadores.rentabilidad(act2['PARTICIPACION'], act2['porcentaje_empresas'])
+            act2 = act2.fillna({'porcentaje_empresas': 0, 'rentabilidad_empresas': 0})
 
             act2 = act2.sort_values(by='rentabilidad_empresas', ascending=False)
             act3 = act2.head(20)
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 act3,
                 x='Actividad_principal',
                 y='rentabilidad_empresas',
@@ -1773,49 +1372,15 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'RELACION', 'id': 'rentabilidad_empresas'}
             ]
 
-    #-----------------------------------------------------------------------------------------------------------------------------------
-
         elif selected_info == 'd':
-
-            children = descripciones.get('d')
-
-        # Cantidad de empresas por actividad economica
-
-           # Agrupar y sumar las empresas por Actividad Principal
-            df_actividades = dff.groupby(['Actividad_principal'])['Cantidad_Empresas'].sum().reset_index()
-            df_actividades2 = dff2.groupby(['Actividad_principal'])['Cantidad_Empresas'].sum().reset_index()
-            df_actividades = df_actividades.loc[df_actividades['Actividad_principal'] != 'Desconocido']
+            df_actividades2 = cubo.agregado('actividades', ['Actividad_principal'], ['Cantidad_Empresas'])
             df_actividades2 = df_actividades2.loc[df_actividades2['Actividad_principal'] != 'Desconocido']
-            # Crear una columna de código (si se quiere mantener para etiquetas únicas)
-            df_actividades['Codigo_Actividad'] = df_actividades['Actividad_principal'].astype('category').cat.codes.astype(str)
-
-            # Inicializar listas para el Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 1️⃣ Agregar Actividades principales (único nivel, raíz)
-            for _, row in df_actividades.iterrows():
-                labels.append(row['Actividad_principal'])
-                parents.append("")  # No hay jerarquía, todos están al mismo nivel
-                values.append(row['Cantidad_Empresas'])
-
-            # Crear el gráfico Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value+percent entry",
-                textinfo="label+value+percent entry"
-            ))
-
-            fig.update_layout(title='Cantidad de empresas según actividades económicas principales')
 
             # Gráfico de barras: top 20 actividades
             df_actividades3 = df_actividades2.sort_values(by='Cantidad_Empresas', ascending=False).head(20)
             df_actividades3 = df_actividades3.sort_values(by='Cantidad_Empresas', ascending=False)
 
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 df_actividades3,
                 x='Actividad_principal',
                 y='Cantidad_Empresas',
@@ -1840,85 +1405,27 @@ def update_dashboard(radio, selected_options, selected_info):
                     )},       
             ]
 
-
-    #----------------------------------------------------------------------------------------------------------------------------------------------------------       
         elif selected_info == 'e':
-
-            children = descripciones.get('e')
-
-
-            pd.set_option('display.float_format', '{:,.0f}'.format)
-
-            # Agrupar y calcular ganancia por Actividad Principal
-            df_actividades = dff.groupby(['Actividad_principal'])['Aporte'].sum().reset_index()
-            df_actividades2 = dff2.groupby(['Actividad_principal'])['Aporte'].sum().reset_index()
-            df_actividades = df_actividades.loc[df_actividades['Actividad_principal'] != 'Desconocido']
+            df_actividades2 = cubo.agregado('actividades', ['Actividad_principal'], ['Aporte'])
             df_actividades2 = df_actividades2.loc[df_actividades2['Actividad_principal'] != 'Desconocido']
-            # Calcular ganancia
-            df_actividades['GANANCIA'] = df_actividades['Aporte'] * 10
             df_actividades2['GANANCIA'] = df_actividades2['Aporte'] * 10
             df_actividades2['GANANCIA'] = df_actividades2['GANANCIA'].astype(float)
 
-            # Inicializar listas
-            labels = []
-            parents = []
-            values = []
-            text = []
-            hovertext = []
-
-            # Actividades (único nivel raíz)
-            for _, row in df_actividades.iterrows():
-                total = int(row['GANANCIA'])
-                labels.append(row['Actividad_principal'])
-                parents.append('')
-                values.append(total)
-                text.append(f"{row['Actividad_principal']}<br>{total:,.0f}")
-                hovertext.append(f"Actividad: {row['Actividad_principal']}<br>Ganancia: {total:,.0f}")
-
-            # Crear el gráfico Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                text=text,
-                hovertext=hovertext,
-                hoverinfo='text',
-                textinfo='text'
-            ))
-
-            fig.update_layout(
-                title='Ganancias por actividades económicas principales. Total País = G$ 53.682.677.926.130',
-                margin=dict(t=50, l=25, r=25, b=25)
-            )
-
             # Datos para gráfico de barras: top 20 actividades
             df_actividades3 = df_actividades2.sort_values(by='GANANCIA', ascending=False).head(20)
             df_actividades3 = df_actividades3.sort_values(by='GANANCIA', ascending=False)
-            totales = df_actividades3.groupby('Actividad_principal')['GANANCIA'].sum().reset_index()
+            totales = df_actividades3.groupby('Actividad_principal', observed=True)['GANANCIA'].sum().reset_index()
 
-            import numpy as np
 
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 df_actividades3,
                 x='Actividad_principal',
                 y='GANANCIA',
                 #color='Division',
                 title='Ganancias por secciones económicas',
-                color_discrete_sequence=px.colors.sequential.Viridis
+                color_discrete_sequence=px.colors.sequential.Viridis, total=totales, separador='.'
             )
 
-            # Agregar anotaciones con el total por Sección
-            for i, row in totales.iterrows():
-                fig2.add_annotation(
-                    x=row['Actividad_principal'],
-                    y=row['GANANCIA'],
-                    text=f"{int(row['GANANCIA']):,}".replace(",", "."),  # ✅ Separador de miles con punto
-                    showarrow=False,
-                    yshift=70,
-                    font=dict(color="black", size=12),
-                    textangle=90
-                )
-
             # Formatear eje Y en miles de millones de guaraníes (eje nomás, sin cambiar datos)
             max_val = df_actividades3['GANANCIA'].max()
             tick_vals = np.arange(0, max_val + 1e12, 1e12)
@@ -1934,7 +1441,7 @@ def update_dashboard(radio, selected_options, selected_info):
                 )
             )
             # Tabla de resumen por Actividad
-            df_actividades4 = df_actividades2.groupby('Actividad_principal')['GANANCIA'].sum().reset_index()
+            df_actividades4 = df_actividades2.groupby('Actividad_principal', observed=True)['GANANCIA'].sum().reset_index()
             
 
             # Convertir a lista de diccionarios para la DataTable
@@ -1957,45 +1464,14 @@ def update_dashboard(radio, selected_options, selected_info):
                 },
             ]
 
-
-    #----------------------------------------------------------------------------------------------------------------------------------------
-
-
         elif selected_info == 'f':
-
-            children = descripciones.get('f')
-
-            df_actividades = dff.groupby(['Actividad_principal'])['DISTRITO'].nunique().reset_index()
-            df_actividades2 = dff2.groupby(['Actividad_principal'])['DISTRITO'].nunique().reset_index()
-            df_actividades = df_actividades.loc[df_actividades['Actividad_principal'] != 'Desconocido']
+            df_actividades2 = cubo.agregado('actividades', ['Actividad_principal'], ['Cantidad_Distritos']).rename(columns={'Cantidad_Distritos': 'DISTRITO'})
             df_actividades2 = df_actividades2.loc[df_actividades2['Actividad_principal'] != 'Desconocido']
 
-            # Inicializar listas para Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 🔹 Agregar actividades como único nivel
-            for _, row in df_actividades.iterrows():
-                labels.append(row['Actividad_principal'])
-                parents.append("")  # Nivel raíz
-                values.append(row['DISTRITO'])
-
-            # Crear Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value",
-                textinfo="label+value",
-            ))
-
-            fig.update_layout(title='Cantidad de distritos en los que se desarrollan las actividades económicas principales. Total de distritos = 253')
-
             # Gráfico de barras
             df_actividades2 = df_actividades2.sort_values(by='DISTRITO', ascending=False)
             datos = df_actividades2.head(20)
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 datos,
                 x='Actividad_principal',
                 y='DISTRITO',
@@ -2013,6 +1489,49 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'ACTIVIDAD PRINCIPAL', 'id': 'Actividad_principal'},
                 {'name': 'DISTRITOS', 'id': 'DISTRITO'},
             ]
-#-----------------------------------------------------------------------------------------------------------------------------------------------------------
 
-    return fig, fig2, columns, data, children
\ No newline at end of file
+    return fig2, columns, data
+
+
+@dash.callback(
+    [Output('plot2c', 'figure'),
+     Output('tablec', 'columns'),
+     Output('tablec', 'page_current')],
+    [Input('radioc', 'value'),
+     Input('infoc', 'value')]
+)
+def update_nacional(radio, selected_info):
+    # Las filas de la tabla las envía update_tabla, una página por vez; al
+    # cambiar de vista se vuelve a la primera página
+    fig2, columns, _ = nacional(radio, selected_info)
+    return fig2, columns, 0
+
+
+@dash.callback(
+    [Output('tablec', 'data'),
+     Output('tablec', 'page_count')],
+    [Input('radioc', 'value'),
+     Input('infoc', 'value'),
+     Input('tablec', 'page_current'),
+     Input('tablec', 'page_size'),
+     Input('tablec', 'sort_by'),
+     Input('tablec', 'filter_query')]
+)
+def update_tabla(radio, selected_info, page_current, page_size, sort_by, filter_query):
+    # Filtrado, orden y paginación en el servidor sobre la tabla nacional completa
+    registros = nacional(radio, selected_info)[2]
+    datos = paginacion.marco(('actividades', radio, selected_info, almacen.version('actividades')), registros)
+    return paginacion.pagina(datos, page_current, page_size, sort_by, filter_query)
+
+
+@cache.precalentamiento
+def precalentar():
+    # Cada sección sola, con todas las métricas
+    vistas = 0
+    for seccion in sorted(df['Seccion'].unique()):
+        for metrica in descripciones:
+            update_dashboard('Seccion', [seccion], metrica)
+            vistas += 1
+    for metrica in descripciones:
+        nacional('Seccion', metrica)
+    return vistas
@@ -1,22 +1,19 @@
-import pandas as pd
 import dash
 from dash import dcc, html, Input, Output, dash_table
 import dash_bootstrap_components as dbc
-import plotly.express as px
-import json
-import os
+from utils import almacen, cache, figuras, geometria, memo
 # Inicialización de la app (si es standalone, si estás usando multipágina no la dupliques)
 dash.register_page(__name__, path="/")
 
-df = pd.read_csv('empresas.csv', encoding='utf-8')
+df = almacen.obtener('empresas')
 
 df['Ganancias'] = df['Ganancias'] * 10
 #df['Ganancias'] = df['Ganancias'].astype(float).round(0).astype(int)
 #df['Ganancias'] = df['Ganancias'].fillna(0)
 
 
-with open("assets/DEPARTAMENTOS_PY_CNPV2022.geojson", encoding='utf-8') as f:
-    geojson_data = json.load(f)
+# Zoom inicial del mapa: define el detalle de la geometría que se envía
+ZOOM_MAPA = 5.5
 
 # Layout
 layout = html.Div([
@@ -214,9 +211,49 @@ Con un total de 188.905 empresas en nuestro registro, cada decil representa a 18
 
 ])
 
+def _solo_departamento(clickData):
+    # Del click solo importa el departamento: el resto (coordenadas, índices)
+    # no cambia el resultado y no debe formar parte de la clave de la cache
+    if not clickData:
+        return None
+    return {'points': [{'location': clickData['points'][0]['location']}]}
+
+
 @dash.callback(
-    [Output('plot-paraguay', 'figure'),
-     Output('bar1a', 'figure'),
+    Output('plot-paraguay', 'figure'),
+    Input('radio', 'value')
+)
+def update_mapa(radio):
+    # El mapa depende solo de la opción elegida: se arma una vez por versión
+    # de los datos y un click en el mapa no lo vuelve a enviar al navegador
+    return _mapa(radio, geometria.version(ZOOM_MAPA))
+
+
+@memo.por_version('empresas')
+def _mapa(radio, version_geometria):
+    if radio == 'Cantidad':
+        columna, escala = 'Cantidad_Empresas', 'Blues'
+    elif radio == 'Ganancias':
+        columna, escala = 'Ganancias', 'OrRd'
+    df_agg = df.groupby('DPTO_DESC', observed=True)[columna].sum().reset_index()
+    fig_map = figuras.coropletico(
+        df_agg,
+        geojson=geometria.obtener(ZOOM_MAPA),
+        locations='DPTO_DESC',
+        featureidkey="properties.DPTO_DESC",
+        color=columna,
+        mapbox_style="carto-positron",
+        center={"lat": -23.4, "lon": -58.4},
+        zoom=ZOOM_MAPA,
+        opacity=0.9,
+        color_continuous_scale=escala,
+    )
+    fig_map.update_layout(margin={"r":0,"t":0,"l":0,"b":0})
+    return fig_map
+
+
+@dash.callback(
+    [Output('bar1a', 'figure'),
      Output('bar2a', 'figure'),
      Output('table1a', 'data'),
      Output('table1a', 'columns'),
@@ -225,37 +262,22 @@ Con un total de 188.905 empresas en nuestro registro, cada decil representa a 18
     [Input('radio', 'value'),
      Input('plot-paraguay', 'clickData')]
 )
-def update_figures(radio, clickData):
+@cache.memorizar('empresas', lambda radio, clickData: (radio, _solo_departamento(clickData)))
+def update_detalle(radio, clickData):
     if radio == 'Cantidad':
-        # Mapa
-        df_agg = df.groupby('DPTO_DESC')['Cantidad_Empresas'].sum().reset_index()
-        fig_map = px.choropleth_mapbox(
-            df_agg,
-            geojson=geojson_data,
-            locations='DPTO_DESC',
-            featureidkey="properties.DPTO_DESC",
-            color='Cantidad_Empresas',
-            mapbox_style="carto-positron",
-            center={"lat": -23.4, "lon": -58.4},
-            zoom= 5.5,
-            opacity=0.9,
-            color_continuous_scale='Blues',
-        )
-        fig_map.update_layout(margin={"r":0,"t":0,"l":0,"b":0})
-
         # Filtro por click
         if clickData:
             departamento = clickData['points'][0]['location']
-            df_filtered = df[df['DPTO_DESC'] == departamento]
+            df_filtered = almacen.seleccionar('empresas', 'DPTO_DESC', [departamento], vista=df)
         else:
             df_filtered = df.iloc[0:0]
 
         # Gráficos de barra
-        distritos = df_filtered.groupby('DISTRITO')['Cantidad_Empresas'].sum().reset_index().sort_values(by='Cantidad_Empresas', ascending=False)
-        secciones = df_filtered.groupby('Seccion')['Cantidad_Empresas'].sum().reset_index().sort_values(by='Cantidad_Empresas', ascending=False)
+        distritos = df_filtered.groupby('DISTRITO', observed=True)['Cantidad_Empresas'].sum().reset_index().sort_values(by='Cantidad_Empresas', ascending=False)
+        secciones = df_filtered.groupby('Seccion', observed=True)['Cantidad_Empresas'].sum().reset_index().sort_values(by='Cantidad_Empresas', ascending=False)
 
-        bar1 = px.bar(distritos, x='DISTRITO', y='Cantidad_Empresas', title="Cantidad por Distrito")
-        bar2 = px.bar(secciones, x='Seccion', y='Cantidad_Empresas', title="Cantidad por Sección")
+        bar1 = figuras.barras(distritos, x='DISTRITO', y='Cantidad_Empresas', title="Cantidad por Distrito")
+        bar2 = figuras.barras(secciones, x='Seccion', y='Cantidad_Empresas', title="Cantidad por Sección")
 
         # Tablas
         table1_data = distritos.to_dict('records')
@@ -264,41 +286,25 @@ def update_figures(radio, clickData):
         table2_columns = [{"name": i, "id": i} for i in secciones.columns]
 
     elif radio == 'Ganancias':
-        # Mapa
-        df_agg = df.groupby('DPTO_DESC')['Ganancias'].sum().reset_index()
-        fig_map = px.choropleth_mapbox(
-            df_agg,
-            geojson=geojson_data,
-            locations='DPTO_DESC',  
-            featureidkey="properties.DPTO_DESC",
-            color='Ganancias',
-            mapbox_style="carto-positron",
-            center={"lat": -23.4, "lon": -58.4},
-            zoom=5.5,
-            opacity=0.9,
-            color_continuous_scale='OrRd',
-        )
-        fig_map.update_layout(margin={"r":0,"t":0,"l":0,"b":0})
-
         # Filtro por click
         if clickData:
             departamento = clickData['points'][0]['location']
-            df_filtered = df[df['DPTO_DESC'] == departamento]
+            df_filtered = almacen.seleccionar('empresas', 'DPTO_DESC', [departamento], vista=df)
         else:
             df_filtered = df.iloc[0:0]
 
         # Gráficos de barra
         # Agrupaciones y orden
-        distritos = df_filtered.groupby('DISTRITO')['Ganancias'].sum().reset_index().sort_values(by='Ganancias', ascending=False)
-        secciones = df_filtered.groupby('Seccion')['Ganancias'].sum().reset_index().sort_values(by='Ganancias', ascending=False)
+        distritos = df_filtered.groupby('DISTRITO', observed=True)['Ganancias'].sum().reset_index().sort_values(by='Ganancias', ascending=False)
+        secciones = df_filtered.groupby('Seccion', observed=True)['Ganancias'].sum().reset_index().sort_values(by='Ganancias', ascending=False)
 
         # Copias numéricas para el gráfico (mantienen los valores como numéricos)
         distritos_numeric = distritos.copy()
         secciones_numeric = secciones.copy()
 
         # Gráficos de barra con color rojo
-        bar1 = px.bar(distritos_numeric, x='DISTRITO', y='Ganancias', title="Ganancias por Distrito", color_discrete_sequence=['red'])
-        bar2 = px.bar(secciones_numeric, x='Seccion', y='Ganancias', title="Ganancias por Sección", color_discrete_sequence=['red'])
+        bar1 = figuras.barras(distritos_numeric, x='DISTRITO', y='Ganancias', title="Ganancias por Distrito", color_discrete_sequence=['red'])
+        bar2 = figuras.barras(secciones_numeric, x='Seccion', y='Ganancias', title="Ganancias por Sección", color_discrete_sequence=['red'])
 
 
         if not distritos_numeric.empty and not secciones_numeric.empty:
@@ -319,8 +325,8 @@ def update_figures(radio, clickData):
             )
         else:
             # Gráficos vacíos por defecto si no hay datos
-            bar1 = px.bar(title="Ganancias por Distrito")
-            bar2 = px.bar(title="Ganancias por Sección")
+            bar1 = figuras.barras(title="Ganancias por Distrito")
+            bar2 = figuras.barras(title="Ganancias por Sección")
 
         # Formateo de columnas para las tablas (solo string con puntos como separador de miles)
         distritos['Ganancias'] = distritos['Ganancias'].apply(lambda x: f"{int(x):,}".replace(",", "."))
@@ -334,4 +340,13 @@ def update_figures(radio, clickData):
         table2_columns = [{"name": i, "id": i} for i in secciones.columns]
 
 
-    return fig_map, bar1, bar2, table1_data, table1_columns, table2_data, table2_columns
+    return bar1, bar2, table1_data, table1_columns, table2_data, table2_columns
+
+
+@cache.precalentamiento
+def precalentar():
+    # Vista inicial (sin click en el mapa) de las dos opciones
+    for radio in ['Cantidad', 'Ganancias']:
+        update_mapa(radio)
+        update_detalle(radio, None)
+    return 2
@@ -1,14 +1,18 @@
-import pandas as pd
+import functools
 import numpy as np
 import dash
 from dash import dcc, html, Input, Output, dash_table, State
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
-import plotly.express as px
+from utils import almacen, bitsets, cache, cubo, figuras, indicadores, memo, paginacion
+from utils.treemap import construir_treemap, rollup, rutas, subarbol
 
 
-# Cargar el archivo CSV
-df = pd.read_csv('empresas.csv', encoding='utf-8')
+# Dataset compartido y su cubo de agregados (se calculan una sola vez por proceso)
+df = almacen.obtener('empresas')
+cubo.precalcular('empresas')
+bitsets.precalcular('empresas', 'DEPARTAMENTO', 'Actividad_principal')
+bitsets.precalcular('empresas', 'DISTRITO', 'Actividad_principal')
 
 explicaciones = {
     'a': """
@@ -58,11 +62,34 @@ Este análisis muestra cuántas actividades económicas distintas se desarrollan
 Los territorios con mayor cantidad de actividades presentan economías más diversificadas, lo que suele asociarse a una mayor capacidad de adaptación frente a cambios en el entorno, menor dependencia de un único sector y, en general, una estructura más sólida. Una mayor diversidad también puede reflejar un ecosistema económico más dinámico, capaz de generar oportunidades para distintos perfiles productivos y laborales.
 
 Aunque no se evalúa el tamaño ni el peso de cada actividad, esta métrica ofrece una primera aproximación para identificar territorios con mayor variedad económica, lo que puede ser un factor relevante al analizar el potencial de desarrollo de una región.
+""",
+    'g': """
+**Actividades compartidas por los territorios seleccionados**
+
+Este análisis muestra las actividades económicas que se desarrollan en todos los territorios seleccionados a la vez, organizadas por sector, división y actividad, con la cantidad de empresas que las realizan en el conjunto de esos territorios.
+
+Mientras la cantidad de actividades mide la diversidad de cada territorio por separado, esta vista muestra lo que tienen en común: la base productiva compartida entre zonas. Pocas actividades compartidas indican economías especializadas en rubros distintos; muchas, estructuras productivas similares que pueden competir entre sí o complementarse.
 """
 }
 # Registrar la página en Dash multipágina
 dash.register_page(__name__, path="/territorial")
 
+def dropdown(radio):
+    if radio == 'Departamentos':   
+        valores = df['DEPARTAMENTO'].unique()  # Obtener valores únicos
+        options = [{"label": departamento, "value": departamento} for departamento in valores]
+        value = ['Alto Parana.', 'Asuncion.', 'Central.', 'Itapua.']
+    elif radio == 'Distritos':
+        valores = df['DISTRITO'].unique()  # Obtener valores únicos
+        options = [{"label": distrito, "value": distrito} for distrito in valores]
+        value = ['Ciudad Del Este', 'Presidente Franco', 'Hernandarias', 'Minga Guazu']
+    return options, value
+
+
+# Opciones y selección por defecto de cada modo del radio: se calculan una vez
+# y viajan con el layout, así el cambio de modo se resuelve en el navegador
+CATALOGOS = {radio: dict(zip(['options', 'value'], dropdown(radio))) for radio in ['Departamentos', 'Distritos']}
+
 # Inicializar la figura vacía para evitar errores
 fig= go.Figure()
 fig2= go.Figure()
@@ -70,6 +97,10 @@ fig2= go.Figure()
 # Layout de la página principal
 layout = dbc.Container([
 
+    dcc.Store(id='catalogosb', data=CATALOGOS),
+    # Ruta del nodo que es raíz del treemap (vacía: primeros niveles)
+    dcc.Store(id='rutab', data=[]),
+
     dbc.Row([
         dbc.Col(
             html.H2("Análisis de características económicas del Paraguay", 
@@ -125,6 +156,7 @@ layout = dbc.Container([
                     {'label': 'Cantidad de empresas/población en cada territorio', 'value': 'd'},
                     {'label': 'Participación de ganancias/población en cada territorio', 'value': 'e'},
                     {'label': 'Cantidad de actividades por cada territorio', 'value': 'f'},
+                    {'label': 'Actividades compartidas por los territorios seleccionados', 'value': 'g'},
 
                 ],
                 value='a',
@@ -198,8 +230,13 @@ layout = dbc.Container([
                     'lineHeight': '15px',    # Controla el espaciado de línea si querés que sea más compacto
                 },
                 data=[],
-                filter_action='native',
-                sort_action='native',
+                page_action='custom',
+                page_current=0,
+                page_size=paginacion.TAMANO_PAGINA,
+                filter_action='custom',
+                filter_query='',
+                sort_action='custom',
+                sort_by=[],
             ),
             width=8,
             className='mx-auto'
@@ -232,28 +269,137 @@ layout = dbc.Container([
 
 ], fluid=True)
 
-@dash.callback(
+
+dash.clientside_callback(
+    """
+    function(radio, catalogos) {
+        var catalogo = catalogos[radio];
+        return [catalogo.options, catalogo.value];
+    }
+    """,
     Output('dropdown-optionsb', 'options'),
     Output('dropdown-optionsb', 'value'),
-    Input('radiob', 'value')
+    Input('radiob', 'value'),
+    State('catalogosb', 'data')
 )
-def dropdown(radio):
-    if radio == 'Departamentos':   
-        valores = df['DEPARTAMENTO'].unique()  # Obtener valores únicos
-        options = [{"label": departamento, "value": departamento} for departamento in valores]
-        value = ['Alto Parana.', 'Asuncion.', 'Central.', 'Itapua.']
-    elif radio == 'Distritos':
-        valores = df['DISTRITO'].unique()  # Obtener valores únicos
-        options = [{"label": distrito, "value": distrito} for distrito in valores]
-        value = ['Ciudad Del Este', 'Presidente Franco', 'Hernandarias', 'Minga Guazu']
-    return options, value
+
+
+def actividades_compartidas(columna, seleccionados, titulo):
+    # Actividades presentes en todos los territorios seleccionados (AND de sus
+    # filas de bits), con la cantidad de empresas del conjunto en cada una
+    compartidas = bitsets.compartidos('empresas', columna, 'Actividad_principal', seleccionados)
+    actividades = cubo.agregado('empresas', [columna, 'Seccion', 'Division', 'Actividad_principal'], ['Cantidad_Empresas'], seleccion={columna: seleccionados, 'Actividad_principal': compartidas})
+    arbol = construir_treemap(actividades, ['Seccion', 'Division', 'Actividad_principal'], 'Cantidad_Empresas')
+
+    fig = figuras.treemap(
+        **arbol,
+        textinfo="label+value",
+    )
+    fig.update_layout(title=f'{len(compartidas)} actividades economicas compartidas por {titulo}')
+    return fig
+
+
+# Treemaps a/b/c (territorio → sección → división → actividad): se envían
+# PROFUNDIDAD niveles debajo de la raíz y al hacer click en un nodo se envía
+# solo su subárbol, así la figura no crece con la cantidad de territorios.
+PROFUNDIDAD = 2
+
+# Niveles debajo del territorio
+ACTIVIDADES = ['Seccion', 'Division', 'Actividad_principal']
+
+TITULOS_TREEMAP = {
+    'a': 'Cantidad de empresas por sector en {}',
+    'b': 'Participación de ganancias por sector en {}',
+    'c': 'Rentabilidad relativa por actividad y territorio en {}',
+}
+
+
+def _rentabilidades(tabla, cantidad_empresas):
+    # Columnas derivadas del treemap 'c' a partir de las sumas de la tabla
+    tabla['porcentaje_empresas'] = indicadores.participacion(tabla['Cantidad_Empresas'], cantidad_empresas)
+    tabla['rentabilidad_empresas'] = indicadores.rentabilidad(tabla['PARTICIPACION'], tabla['porcentaje_empresas'])
+    return tabla
+
+
+def jerarquia(columna, seleccionados, selected_info):
+    # Tablas por nivel del treemap `selected_info`, la columna de valores y,
+    # si no es una suma, la función que la recalcula (ver treemap_de_niveles)
+    niveles = [columna] + ACTIVIDADES
+    if selected_info == 'a':
+        hojas = cubo.agregado('empresas', niveles, ['Cantidad_Empresas'], seleccion={columna: seleccionados})
+        return rollup(hojas, niveles, ['Cantidad_Empresas']), niveles, 'Cantidad_Empresas', None
+    if selected_info == 'b':
+        hojas = cubo.agregado('empresas', niveles, ['PARTICIPACION'], seleccion={columna: seleccionados})
+        return rollup(hojas, niveles, ['PARTICIPACION']), niveles, 'PARTICIPACION', None
+
+    # Total nacional de empresas (sin filtro) para los porcentajes
+    cantidad_empresas = cubo.agregado('empresas', columna, ['Cantidad_Empresas'])['Cantidad_Empresas'].sum()
+    hojas = cubo.agregado('empresas', niveles, ['Cantidad_Empresas', 'PARTICIPACION'], seleccion={columna: seleccionados})
+    tablas = rollup(hojas, niveles, ['Cantidad_Empresas', 'PARTICIPACION'])
+    derivar = functools.partial(_rentabilidades, cantidad_empresas=cantidad_empresas)
+    return [derivar(tabla) for tabla in tablas], niveles, 'rentabilidad_empresas', derivar
+
+
+def _columna(radio):
+    return 'DEPARTAMENTO' if radio == 'Departamentos' else 'DISTRITO'
+
+
+@cache.memorizar('empresas', cache.seleccion_y_ruta)
+def treemap_perezoso(radio, seleccionados, selected_info, ruta):
+    # Figura del nodo `ruta` y la ruta de cada uno de sus nodos, para
+    # resolver los clicks sin volver a armar las tablas
+    tablas, niveles, valor, derivar = jerarquia(_columna(radio), seleccionados, selected_info)
+    arbol = subarbol(tablas, niveles, valor, ruta, PROFUNDIDAD, derivar=derivar)
+
+    fig = figuras.treemap(
+        **arbol,
+        hoverinfo="label+value+percent entry",
+        textinfo="label+value+percent entry",
+    )
+    titulo = TITULOS_TREEMAP[selected_info].format(seleccionados)
+    if ruta:
+        titulo = f"{titulo}: {' / '.join(map(str, ruta))}"
+    fig.update_layout(title=titulo)
+    return fig, rutas(tablas, niveles, valor, ruta, PROFUNDIDAD, derivar=derivar)
+
+
+@dash.callback(
+    [Output('plot1b', 'figure', allow_duplicate=True),
+     Output('rutab', 'data', allow_duplicate=True)],
+    Input('plot1b', 'clickData'),
+    [State('radiob', 'value'),
+     State('dropdown-optionsb', 'value'),
+     State('infob', 'value'),
+     State('rutab', 'data')],
+    prevent_initial_call=True
+)
+def explorar_treemap(click, radio, selected_options, selected_info, ruta):
+    if not click or selected_info not in TITULOS_TREEMAP:
+        return dash.no_update, dash.no_update
+    # Los clicks en la barra de ruta o en la raíz no traen pointNumber
+    id_ = click['points'][0].get('pointNumber')
+    # La vista que se está mostrando ya está en la cache, con la ruta de cada nodo
+    _, nodos = treemap_perezoso(radio, selected_options, selected_info, ruta)
+    if id_ is None or not 0 <= int(id_) < len(nodos):
+        return dash.no_update, dash.no_update
+    nodo = nodos[int(id_)]
+    if nodo is None:
+        # Los nodos 'Otros (n)' juntan varias hojas y no tienen subárbol propio
+        return dash.no_update, dash.no_update
+    elif nodo == ruta:
+        # Click en la raíz: se vuelve al nivel de arriba
+        nodo = ruta[:-1]
+    elif len(nodo) == 1 + len(ACTIVIDADES):
+        # Las actividades no tienen subárbol
+        return dash.no_update, dash.no_update
+    figura, _ = treemap_perezoso(radio, selected_options, selected_info, nodo)
+    return figura, nodo
+
 
 @dash.callback(
     [Output('plot1b', 'figure'),
-     Output('plot2b', 'figure'),
-     Output('tableb', 'columns'),
-     Output('tableb', 'data'),
-     Output('explicacion-container', 'children')],  
+     Output('explicacion-container', 'children'),
+     Output('rutab', 'data')],
     [State('radiob', 'value'),
      Input('dropdown-optionsb', 'value'),
      Input('infob', 'value'),]
@@ -262,6 +408,7 @@ def dropdown(radio):
 #+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 
+@cache.memorizar('empresas', cache.seleccion)
 def update_dashboard(radio, selected_options, selected_info):
     
 #----------------------------------------------------------------------------------------------
@@ -270,82 +417,232 @@ def update_dashboard(radio, selected_options, selected_info):
     if radio == 'Departamentos':
         
         seleccionados = selected_options
-        dff = df.loc[df['DEPARTAMENTO'].isin(seleccionados)]
-        dff2 = df.copy()
 #------------------------------------------------------------------------------------------------
 #------------------------------------------------------------------------------------------------------------------------------------------------------------- 
 #        
-        if selected_info == 'a':
-            children = explicaciones.get('a') 
-            # Agrupación
-            df_departamentos = dff.groupby(['DEPARTAMENTO', 'Seccion', 'Division', 'Actividad_principal'])['Cantidad_Empresas'].sum().reset_index()
-            df_departamentos.fillna("Desconocido", inplace=True)
+        if selected_info in ('a', 'b', 'c'):
+            children = explicaciones.get(selected_info)
+            # Treemap de los primeros niveles; el resto se carga con explorar_treemap
+            fig, _ = treemap_perezoso(radio, seleccionados, selected_info, [])
+
+
+        elif selected_info == 'd':
+            children = explicaciones.get('d') 
+# Cantidad de empresas por cada habitante 
+#+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+            # 1 País, departamentos y distritos desde la tabla distrital: la
+            # población de un departamento es la suma de la de sus distritos
+            niveles = ['PAIS', 'DEPARTAMENTO', 'DISTRITO']
+            hojas = cubo.agregado('empresas', niveles, ['Cantidad_Empresas', 'Poblacion'], seleccion={'DEPARTAMENTO': seleccionados})
+            pais, departamentos2, departamentos = rollup(hojas, niveles, ['Cantidad_Empresas', 'Poblacion'])
+            for tabla in (pais, departamentos2, departamentos):
+                tabla['empresas_habitantes'] = indicadores.por_habitante(tabla['Cantidad_Empresas'], tabla['Poblacion'])
+
+            # 2️⃣ Treemap: PARAGUAY -> departamentos -> distritos
+            labels = ['PARAGUAY'] + departamentos2['DEPARTAMENTO'].astype(str).tolist() + departamentos['DISTRITO'].astype(str).tolist()
+            parents = [''] + ['PARAGUAY'] * len(departamentos2) + departamentos['DEPARTAMENTO'].astype(str).tolist()
+            # El país es una sola fila (ninguna si no hay selección)
+            values = np.concatenate([[pais['empresas_habitantes'].sum()], departamentos2['empresas_habitantes'], departamentos['empresas_habitantes']])
+
+            # 3️⃣ Crear Treemap
+            fig = figuras.treemap(
+                labels=labels,
+                parents=parents,
+                values=values,
+                hoverinfo="label+value",
+                textinfo="label+value",
+            )
             
-            # Crear IDs únicos para cada nivel
-            df_departamentos['DEP_ID'] = df_departamentos['DEPARTAMENTO']
-            df_departamentos['SEC_ID'] = df_departamentos['DEP_ID'] + ' - ' + df_departamentos['Seccion']
-            df_departamentos['DIV_ID'] = df_departamentos['SEC_ID'] + ' - ' + df_departamentos['Division']
-            df_departamentos['ACT_ID'] = df_departamentos['DIV_ID'] + ' - ' + df_departamentos['Actividad_principal']
-
-            # Inicializar listas
-            ids = []
-            labels = []
-            parents = []
-            values = []
-
-            # 1️⃣ Departamentos
-            for _, row in df_departamentos[['DEP_ID', 'DEPARTAMENTO']].drop_duplicates().iterrows():
-                ids.append(row['DEP_ID'])
-                labels.append(row['DEPARTAMENTO'])  # solo nombre limpio
-                parents.append('')
-                values.append(df_departamentos[df_departamentos['DEP_ID'] == row['DEP_ID']]['Cantidad_Empresas'].sum())
-
-            # 2️⃣ Secciones
-            for _, row in df_departamentos[['SEC_ID', 'Seccion', 'DEP_ID']].drop_duplicates().iterrows():
-                ids.append(row['SEC_ID'])
-                labels.append(row['Seccion'])  # nombre simple
-                parents.append(row['DEP_ID'])
-                values.append(df_departamentos[df_departamentos['SEC_ID'] == row['SEC_ID']]['Cantidad_Empresas'].sum())
-
-            # 3️⃣ Divisiones
-            for _, row in df_departamentos[['DIV_ID', 'Division', 'SEC_ID']].drop_duplicates().iterrows():
-                ids.append(row['DIV_ID'])
-                labels.append(row['Division'])  # nombre simple
-                parents.append(row['SEC_ID'])
-                values.append(df_departamentos[df_departamentos['DIV_ID'] == row['DIV_ID']]['Cantidad_Empresas'].sum())
-
-            # 4️⃣ Actividades
-            for _, row in df_departamentos[['ACT_ID', 'Actividad_principal', 'DIV_ID']].drop_duplicates().iterrows():
-                ids.append(row['ACT_ID'])
-                labels.append(row['Actividad_principal'])  # solo nombre, no concatenado
-                parents.append(row['DIV_ID'])
-                values.append(df_departamentos[df_departamentos['ACT_ID'] == row['ACT_ID']]['Cantidad_Empresas'].sum())
+            # Mostrar gráfico
+            fig.update_layout(title=f'Cantidad de empresas por cada habitante en {selected_options}')
+ #----------------------------------------------------------------------------------------------------------------------------------------------------------       
+        elif selected_info == 'e':
+            children = explicaciones.get('e') 
+# Cantidad de empresas por cada habitante 
+#+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+            # 1 País, departamentos y distritos desde la tabla distrital: la
+            # población de un departamento es la suma de la de sus distritos
+            niveles = ['PAIS', 'DEPARTAMENTO', 'DISTRITO']
+            hojas = cubo.agregado('empresas', niveles, ['PARTICIPACION', 'Poblacion'], seleccion={'DEPARTAMENTO': seleccionados})
+            pais, departamentos2, departamentos = rollup(hojas, niveles, ['PARTICIPACION', 'Poblacion'])
+            for tabla in (pais, departamentos2, departamentos):
+                tabla['ganancias_habitantes'] = indicadores.por_habitante(tabla['PARTICIPACION'], tabla['Poblacion'])
+
+            # 2️⃣ Treemap: PARAGUAY -> departamentos -> distritos
+            labels = ['PARAGUAY'] + departamentos2['DEPARTAMENTO'].astype(str).tolist() + departamentos['DISTRITO'].astype(str).tolist()
+            parents = [''] + ['PARAGUAY'] * len(departamentos2) + departamentos['DEPARTAMENTO'].astype(str).tolist()
+            # El país es una sola fila (ninguna si no hay selección)
+            values = np.concatenate([[pais['ganancias_habitantes'].sum()], departamentos2['ganancias_habitantes'], departamentos['ganancias_habitantes']])
+
+            # 3️⃣ Crear Treemap
+            fig = figuras.treemap(
+                labels=labels,
+                parents=parents,
+                values=values,
+                hoverinfo="label+value",
+                textinfo="label+value",
+            )
+            
+            # Mostrar gráfico
+            fig.update_layout(title=f'Cantidad de empresas por cada habitante en {selected_options}')
+ #----------------------------------------------------------------------------------------------------------------------------------------
+
+
+        elif selected_info == 'f':
+            children = explicaciones.get('f') 
+# Cantidad de actividades por cada territorio
+#+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+            # 1 Calcular el coeficiente distrital 
+
+            # Los distintos del conjunto seleccionado no se pueden sumar desde el
+            # cubo: salen del OR de las filas de bits de cada departamento
+            total = bitsets.distintos('empresas', 'DEPARTAMENTO', 'Actividad_principal', seleccionados)
+            departamentos2 = cubo.agregado('empresas', ['PAIS', 'DEPARTAMENTO'], ['Cantidad_Actividades'], seleccion={'DEPARTAMENTO': seleccionados}).rename(columns={'Cantidad_Actividades': 'Actividad_principal'})
+            departamentos3 = cubo.agregado('empresas', ['PAIS', 'DEPARTAMENTO', 'DISTRITO'], ['Cantidad_Actividades'], seleccion={'DEPARTAMENTO': seleccionados}).rename(columns={'Cantidad_Actividades': 'Actividad_principal'})
+
+            # 5️⃣ Listas para Treemap: país, departamentos y distritos
+            labels = ["PARAGUAY"] + departamentos2['DEPARTAMENTO'].astype(str).tolist() + departamentos3['DISTRITO'].astype(str).tolist()
+            parents = [""] + ["PARAGUAY"] * len(departamentos2) + departamentos3['DEPARTAMENTO'].astype(str).tolist()
+            values = np.concatenate([[total], departamentos2['Actividad_principal'], departamentos3['Actividad_principal']])
+
+            # 6️⃣ Crear Treemap
+            fig = figuras.treemap(
+                labels=labels,
+                parents=parents,
+                values=values,
+                hoverinfo="label+value",
+                textinfo="label+value",
+            )
+
+            # Mostrar gráfico
+            fig.update_layout(title=f'Cantidad de actividades economicas desarrolladas en {selected_options}')
+
+        elif selected_info == 'g':
+            children = explicaciones.get('g')
+            fig = actividades_compartidas('DEPARTAMENTO', seleccionados, selected_options)
+
+
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------       
+#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------   
+    elif radio == 'Distritos':
+        seleccionados = selected_options
+    #------------------------------------------------------------------------------------------------------------------------------------------------------------- 
+    #        
+        if selected_info in ('a', 'b', 'c'):
+            children = explicaciones.get(selected_info)
+            # Treemap de los primeros niveles; el resto se carga con explorar_treemap
+            fig, _ = treemap_perezoso(radio, seleccionados, selected_info, [])
+
+
+        elif selected_info == 'd':
+            children = explicaciones.get('d') 
+            # 1 Calcular el coeficiente distrital 
+
+            # 1️⃣ Calcular el coeficiente distrital (Empresas por habitante)
+            distritos = cubo.agregado('empresas', 'DISTRITO', ['Cantidad_Empresas', 'Poblacion'], seleccion={'DISTRITO': seleccionados})
+
+            distritos['empresas_habitantes'] = indicadores.por_habitante(distritos['Cantidad_Empresas'], distritos['Poblacion'])
+
+            # Un solo nivel, sin raíz: columnas completas y los valores como array
+            labels = distritos['DISTRITO'].astype(str).tolist()
+            parents = [''] * len(distritos)
+            values = distritos['empresas_habitantes'].to_numpy()
+
+            # 3️⃣ Crear Treemap
+            fig = figuras.treemap(
+                labels=labels,
+                parents=parents,
+                values=values,
+                hoverinfo="label+value",
+                textinfo="label+value",
+            )
+
+            # 4️⃣ Mostrar gráfico
+            fig.update_layout(title=f'Cantidad de empresas por cada habitante a nivel distrital en {selected_options}')
+
+
+
+    #-------------------------------------------------------------------------------------------------------------------------------------
+
+    
+        elif selected_info == 'e':
+            children = explicaciones.get('e') 
+
+            distritos = cubo.agregado('empresas', 'DISTRITO', ['PARTICIPACION', 'Porcentaje_poblacion'], seleccion={'DISTRITO': seleccionados})
+
+            # Calcular la relación de ganancias por población a nivel distrital
+            distritos['ganancias_por_poblacion_distrital'] = indicadores.por_poblacion(distritos['PARTICIPACION'], distritos['Porcentaje_poblacion'])
+
+            # Un solo nivel, sin raíz: columnas completas y los valores como array
+            labels = distritos['DISTRITO'].astype(str).tolist()
+            parents = [''] * len(distritos)
+            values = distritos['ganancias_por_poblacion_distrital'].to_numpy()
 
             # Crear Treemap
-            fig = go.Figure(go.Treemap(
-                ids=ids,
+            fig = figuras.treemap(
                 labels=labels,
                 parents=parents,
                 values=values,
-                hoverinfo="label+value+percent entry",
-                textinfo="label+value+percent entry",
-            ))
+                hoverinfo="label+value",
+                textinfo="label+value",
+            )
 
+            fig.update_layout(title=f'Relación entre el porcentaje de ganancia y el porcentaje de población a nivel distrital en {selected_options}')
+
+#-----------------------------------------------------------------------------------------------------------------------------------
+
+        elif selected_info == 'f':
+            children = explicaciones.get('f') 
+ 
+            distritos = cubo.agregado('empresas', ['DISTRITO'], ['Cantidad_Actividades'], seleccion={'DISTRITO': seleccionados}).rename(columns={'Cantidad_Actividades': 'Actividad_principal'})
+            total = bitsets.distintos('empresas', 'DISTRITO', 'Actividad_principal', seleccionados)
+
+            # Un solo nivel, sin raíz: columnas completas y los valores como array
+            labels = distritos['DISTRITO'].astype(str).tolist()
+            parents = [''] * len(distritos)
+            values = distritos['Actividad_principal'].to_numpy()
+
+            # 3️⃣ Crear Treemap
+            fig = figuras.treemap(
+                labels=labels,
+                parents=parents,
+                values=values,
+                hoverinfo="label+value",
+                textinfo="label+value",
+            )
+
+            
             # Mostrar gráfico
-            fig.update_layout(title=f'Cantidad de empresas por sector en {selected_options}')
+            fig.update_layout(title=f'Cantidad de actividades economicas desarrolladas en {selected_options} ({total} en total)')
+
+        elif selected_info == 'g':
+            children = explicaciones.get('g')
+            fig = actividades_compartidas('DISTRITO', seleccionados, selected_options)
+
 
-            df_departamentos2 = dff2.groupby(['DEPARTAMENTO', 'Seccion', 'Division', 'Actividad_principal'])['Cantidad_Empresas'].sum().reset_index()
+
+
+    return fig, children, []
+
+
+@memo.por_version('empresas')
+def nacional(radio, selected_info):
+    # Gráfico y tabla a nivel nacional: no dependen de la selección del dropdown,
+    # así que se calculan una sola vez por versión del dataset
+
+    if radio == 'Departamentos':
+        if selected_info == 'a':
+            df_departamentos2 = cubo.agregado('empresas', ['DEPARTAMENTO', 'Seccion', 'Division', 'Actividad_principal'], ['Cantidad_Empresas'])
             df_departamentos2 = df_departamentos2.sort_values(by='Cantidad_Empresas', ascending=False)
-            df_departamentos3 = df_departamentos2.groupby(['DEPARTAMENTO', 'Seccion'])['Cantidad_Empresas'].sum().reset_index()
-            df_departamentos4 = df_departamentos2.groupby('DEPARTAMENTO')['Cantidad_Empresas'].sum().reset_index()
+            df_departamentos3 = df_departamentos2.groupby(['DEPARTAMENTO', 'Seccion'], observed=True)['Cantidad_Empresas'].sum().reset_index()
+            df_departamentos4 = df_departamentos2.groupby('DEPARTAMENTO', observed=True)['Cantidad_Empresas'].sum().reset_index()
             datos = df_departamentos3.sort_values(by='Cantidad_Empresas', ascending=False)
 
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 datos,
                 x='DEPARTAMENTO',
                 y='Cantidad_Empresas',
                 color='Seccion',  # Se mantiene la categorización por 'Seccion'
-                color_continuous_scale='Viridis',  # Aplica el mismo esquema de colores
                 title='Cantidad de empresas por sector a nivel nacional')
             fig2.update_layout(
                 legend=dict(
@@ -367,81 +664,18 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'CANTIDAD', 'id': 'Cantidad_Empresas'}
             ]
 
-
-
-#-------------------------------------------------------------------------------------------------------------------------------
-#         
         elif selected_info == 'b':
-            children = explicaciones.get('b') 
-            # Agrupación
-            df_departamentos = dff.groupby(['DEPARTAMENTO', 'Seccion', 'Division', 'Actividad_principal'])['PARTICIPACION'].sum().reset_index()
-            df_departamentos.fillna("Desconocido", inplace=True)
-
-            # Crear IDs únicos para cada nivel
-            df_departamentos['DEP_ID'] = df_departamentos['DEPARTAMENTO']
-            df_departamentos['SEC_ID'] = df_departamentos['DEP_ID'] + ' - ' + df_departamentos['Seccion']
-            df_departamentos['DIV_ID'] = df_departamentos['SEC_ID'] + ' - ' + df_departamentos['Division']
-            df_departamentos['ACT_ID'] = df_departamentos['DIV_ID'] + ' - ' + df_departamentos['Actividad_principal']
-
-            # Inicializar listas
-            ids = []
-            labels = []
-            parents = []
-            values = []
-
-            # 1️⃣ Departamentos
-            for _, row in df_departamentos[['DEP_ID', 'DEPARTAMENTO']].drop_duplicates().iterrows():
-                ids.append(row['DEP_ID'])
-                labels.append(row['DEPARTAMENTO'])
-                parents.append('')
-                values.append(df_departamentos[df_departamentos['DEP_ID'] == row['DEP_ID']]['PARTICIPACION'].sum())
-
-            # 2️⃣ Secciones
-            for _, row in df_departamentos[['SEC_ID', 'Seccion', 'DEP_ID']].drop_duplicates().iterrows():
-                ids.append(row['SEC_ID'])
-                labels.append(row['Seccion'])
-                parents.append(row['DEP_ID'])
-                values.append(df_departamentos[df_departamentos['SEC_ID'] == row['SEC_ID']]['PARTICIPACION'].sum())
-
-            # 3️⃣ Divisiones
-            for _, row in df_departamentos[['DIV_ID', 'Division', 'SEC_ID']].drop_duplicates().iterrows():
-                ids.append(row['DIV_ID'])
-                labels.append(row['Division'])
-                parents.append(row['SEC_ID'])
-                values.append(df_departamentos[df_departamentos['DIV_ID'] == row['DIV_ID']]['PARTICIPACION'].sum())
-
-            # 4️⃣ Actividades
-            for _, row in df_departamentos[['ACT_ID', 'Actividad_principal', 'DIV_ID']].drop_duplicates().iterrows():
-                ids.append(row['ACT_ID'])
-                labels.append(row['Actividad_principal'])
-                parents.append(row['DIV_ID'])
-                values.append(df_departamentos[df_departamentos['ACT_ID'] == row['ACT_ID']]['PARTICIPACION'].sum())
-
-            # Crear Treemap
-            fig = go.Figure(go.Treemap(
-                ids=ids,
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value+percent entry",
-                textinfo="label+value+percent entry",
-            ))
-
-            # Mostrar gráfico
-            fig.update_layout(title=f'Participación de ganancias por sector en {selected_options}')
-
-            df_departamentos2 = dff2.groupby(['DEPARTAMENTO', 'Seccion', 'Division', 'Actividad_principal'])['PARTICIPACION'].sum().reset_index()
+            df_departamentos2 = cubo.agregado('empresas', ['DEPARTAMENTO', 'Seccion', 'Division', 'Actividad_principal'], ['PARTICIPACION'])
             df_departamentos2 = df_departamentos2.sort_values(by='PARTICIPACION', ascending=False)
-            df_departamentos3 = df_departamentos2.groupby(['DEPARTAMENTO', 'Seccion'])['PARTICIPACION'].sum().reset_index()
-            df_departamentos4 = df_departamentos2.groupby('DEPARTAMENTO')['PARTICIPACION'].sum().reset_index()
+            df_departamentos3 = df_departamentos2.groupby(['DEPARTAMENTO', 'Seccion'], observed=True)['PARTICIPACION'].sum().reset_index()
+            df_departamentos4 = df_departamentos2.groupby('DEPARTAMENTO', observed=True)['PARTICIPACION'].sum().reset_index()
             datos = df_departamentos3.sort_values(by='PARTICIPACION', ascending=False)
 
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 datos,
                 x='DEPARTAMENTO',
                 y='PARTICIPACION',
                 color='Seccion',  # Se mantiene la categorización por 'Seccion'
-                color_continuous_scale='Viridis',  # Aplica el mismo esquema de colores
                 title='Participación de ganancias de cada departamento por sector a nivel nacional')
             fig2.update_layout(
                 legend=dict(
@@ -461,153 +695,14 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'GANANCIAS (%)', 'id': 'PARTICIPACION'}
             ]
 
-
-#---------------------------------------------------------------------------------------------------------------------------------------------------------
         elif selected_info == 'c':
-            children = explicaciones.get('c') 
-
-            # --- Paso preliminar: Cálculo global basado en dff2 (sin filtro) ---
+            # --- Paso preliminar: Cálculo global (sin filtro) ---
             # Agrupar globalmente por DEPARTAMENTO (global: sin filtro)
-            departamentos2 = dff2.groupby('DEPARTAMENTO').agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            ).reset_index()
+            departamentos2 = cubo.agregado('empresas', 'DEPARTAMENTO', ['Cantidad_Empresas', 'PARTICIPACION'])
 
             # Calcular el porcentaje global y la rentabilidad base para departamentos
-            departamentos2['porcentaje_empresas'] = departamentos2['Cantidad_Empresas'] / departamentos2['Cantidad_Empresas'].sum() * 100
-            departamentos2['rentabilidad_empresas'] = departamentos2['PARTICIPACION'] / departamentos2['porcentaje_empresas'] * 100
-
-            # Extraer los totales globales (para usar en los cálculos con dff, datos filtrados)
-            cantidad_empresas = departamentos2['Cantidad_Empresas'].sum()
-            participacion_total = departamentos2['PARTICIPACION'].sum()
-
-            # --- Paso 1: Crear el DataFrame de departamentos a partir de dff (Datos filtrados) ---
-            df_departamentos = dff.groupby(['DEPARTAMENTO', 'Seccion', 'Division', 'Actividad_principal'], as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            # Usar los totales globales para calcular el porcentaje a este nivel
-            df_departamentos['porcentaje_empresas'] = df_departamentos['Cantidad_Empresas'] / cantidad_empresas * 100
-            df_departamentos = df_departamentos.fillna(0)
-
-            # --- Paso 2: Nivel Departamentos ---
-            # Agrupar los datos filtrados a nivel DEPARTAMENTO para calcular la rentabilidad a ese nivel
-            df_departamentos_rentabilidad = df_departamentos.groupby('DEPARTAMENTO', as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            # Calcular el porcentaje usando el total global (cantidad_empresas)
-            df_departamentos_rentabilidad['porcentaje_empresas'] = df_departamentos_rentabilidad['Cantidad_Empresas'] / cantidad_empresas * 100
-            df_departamentos_rentabilidad['rentabilidad_empresas'] = df_departamentos_rentabilidad.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100) 
-                            if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0) else 0,
-                axis=1
-            )
-            df_departamentos_rentabilidad = df_departamentos_rentabilidad.fillna(0)
-
-            # --- Paso 3: Nivel Secciones ---
-            df_secciones = dff.groupby(['DEPARTAMENTO', 'Seccion'], as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            # Calcular porcentaje usando el total global
-            df_secciones['porcentaje_empresas'] = df_secciones['Cantidad_Empresas'] / cantidad_empresas * 100
-            df_secciones['rentabilidad_empresas'] = df_secciones.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                            if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0) else 0,
-                axis=1
-            )
-            df_secciones = df_secciones.fillna(0)
-
-            # --- Paso 4: Nivel Divisiones ---
-            df_divisiones = dff.groupby(['DEPARTAMENTO', 'Seccion', 'Division'], as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            df_divisiones['porcentaje_empresas'] = df_divisiones['Cantidad_Empresas'] / cantidad_empresas * 100
-            df_divisiones['rentabilidad_empresas'] = df_divisiones.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                            if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0) else 0,
-                axis=1
-            )
-            df_divisiones = df_divisiones.fillna(0)
-
-            # --- Paso 5: Nivel Actividades ---
-            df_actividades = dff.groupby(['DEPARTAMENTO', 'Seccion', 'Division', 'Actividad_principal'], as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            df_actividades['porcentaje_empresas'] = df_actividades['Cantidad_Empresas'] / cantidad_empresas * 100
-            df_actividades['rentabilidad_empresas'] = df_actividades.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                            if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0) else 0,
-                axis=1
-            )
-            df_actividades = df_actividades.fillna(0)
-
-            # --- Paso 6: Crear IDs únicos para cada nivel ---
-            df_departamentos['DEP_ID'] = df_departamentos['DEPARTAMENTO']
-            df_secciones['SEC_ID'] = df_secciones['DEPARTAMENTO'] + ' - ' + df_secciones['Seccion']
-            df_divisiones['DIV_ID'] = df_divisiones['DEPARTAMENTO'] + ' - ' + df_divisiones['Seccion'] + ' - ' + df_divisiones['Division']
-            df_actividades['ACT_ID'] = (
-                df_actividades['DEPARTAMENTO'] + ' - ' +
-                df_actividades['Seccion'] + ' - ' +
-                df_actividades['Division'] + ' - ' +
-                df_actividades['Actividad_principal']
-            )
-
-            # --- Paso 7: Inicializar las listas para el treemap ---
-            ids = []
-            labels = []
-            parents = []
-            values = []
-
-            # Nivel Departamentos (usando df_departamentos_rentabilidad)
-            for _, row in df_departamentos_rentabilidad.iterrows():
-                ids.append(row['DEPARTAMENTO'])  # Cada departamento como identificador único
-                labels.append(row['DEPARTAMENTO'])
-                parents.append('')
-                values.append(row['rentabilidad_empresas'])
-
-            # Nivel Secciones
-            for _, row in df_secciones.iterrows():
-                sec_id = row['DEPARTAMENTO'] + ' - ' + row['Seccion']
-                ids.append(sec_id)
-                labels.append(row['Seccion'])
-                parents.append(row['DEPARTAMENTO'])
-                values.append(row['rentabilidad_empresas'])
-
-            # Nivel Divisiones
-            for _, row in df_divisiones.iterrows():
-                div_id = row['DEPARTAMENTO'] + ' - ' + row['Seccion'] + ' - ' + row['Division']
-                sec_id = row['DEPARTAMENTO'] + ' - ' + row['Seccion']
-                ids.append(div_id)
-                labels.append(row['Division'])
-                parents.append(sec_id)
-                values.append(row['rentabilidad_empresas'])
-
-            # Nivel Actividades
-            for _, row in df_actividades.iterrows():
-                act_id = row['DEPARTAMENTO'] + ' - ' + row['Seccion'] + ' - ' + row['Division'] + ' - ' + row['Actividad_principal']
-                div_id = row['DEPARTAMENTO'] + ' - ' + row['Seccion'] + ' - ' + row['Division']
-                ids.append(act_id)
-                labels.append(row['Actividad_principal'])
-                parents.append(div_id)
-                values.append(row['rentabilidad_empresas'])
-
-            # --- Paso 8: Crear el treemap usando Plotly ---
-            fig = go.Figure(go.Treemap(
-                ids=ids,
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value+percent entry",
-                textinfo="label+value+percent entry",
-                # marker=dict(colors=values, colorscale='RdBu', cmid=100)  # Opcional: ajustar la escala de colores
-            ))
-
-            # --- Paso 9: Actualizar el layout del gráfico ---
-            fig.update_layout(title=f"Rentabilidad relativa por actividad y territorio en {selected_options}")
+            departamentos2['porcentaje_empresas'] = indicadores.participacion(departamentos2['Cantidad_Empresas'])
+            departamentos2['rentabilidad_empresas'] = indicadores.rentabilidad(departamentos2['PARTICIPACION'], departamentos2['porcentaje_empresas'])
 
             # --- Opcional: Para la gráfica de barras y la tabla ---
             departamentos2 = departamentos2.sort_values(by='rentabilidad_empresas', ascending=False)
@@ -615,7 +710,7 @@ def update_dashboard(radio, selected_options, selected_info):
             departamentos3 = departamentos2.head(20)
 
             datos = departamentos3
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 datos,
                 x='DEPARTAMENTO',
                 y='rentabilidad_empresas',
@@ -630,101 +725,17 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'RELACION', 'id': 'rentabilidad_empresas'},
             ]
 
-# Finalmente, en tu callback de Dash retornarías fig, fig2, columns y data (junto con la explicación, si se requiere)
-
-
- #----------------------------------------------------------------------------------------------------------------------------------------------------------       
         elif selected_info == 'd':
-            children = explicaciones.get('d') 
-# Cantidad de empresas por cada habitante 
-#+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-            # 1 Calcular el coeficiente distrital 
-
-            departamentos = dff.groupby(['PAIS', 'DEPARTAMENTO', 'DISTRITO']).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                Poblacion=('Poblacion', 'max'),
-                ).reset_index().reset_index()
-            departamentos['empresas_habitantes'] = (
-                departamentos['Cantidad_Empresas'] / departamentos['Poblacion']
-            )
-
-            # 2️⃣ Calcular el coeficiente departamental
-            departamentos2 = dff.groupby(['PAIS', 'DEPARTAMENTO', 'DISTRITO']).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                Poblacion=('Poblacion', 'max'),
-                ).reset_index().reset_index()
-            departamentos2 = departamentos2.groupby(['PAIS', 'DEPARTAMENTO']).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                Poblacion=('Poblacion', 'sum'),
-                ).reset_index()
-            departamentos2['empresas_habitantes'] = (
-                departamentos2['Cantidad_Empresas'] / departamentos2['Poblacion']
-            )
-
-            # 3️⃣ Agregar nivel PAÍS con coeficiente 
-
-            departamentos3 = departamentos2.groupby(['PAIS']).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                Poblacion=('Poblacion', 'sum'))
-
-            departamentos3['empresas_habitantes'] = (
-                departamentos3['Cantidad_Empresas'] / departamentos3['Poblacion']
-            )
-
-
-            # 5️⃣ Inicializar listas para Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 🔹 Agregar país (nivel superior)
-            labels.append("PARAGUAY")
-            parents.append("")
-            values.append(departamentos3['empresas_habitantes'])
-
-            # 🔹 Agregar departamentos
-            for _, row in departamentos2.iterrows():
-                labels.append(row['DEPARTAMENTO'])
-                parents.append("PARAGUAY")  # Conectar los departamentos al país
-                values.append(row['empresas_habitantes'])
-
-            # 🔹 Agregar distritos
-            for _, row in departamentos.iterrows():
-                labels.append(row['DISTRITO'])
-                parents.append(row['DEPARTAMENTO'])  # Conectar distritos a departamentos
-                values.append(row['empresas_habitantes'])
-
-            # 6️⃣ Crear Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value",
-                textinfo="label+value",
-            ))
-            
-            # Mostrar gráfico
-            fig.update_layout(title=f'Cantidad de empresas por cada habitante en {selected_options}')
-
-
-            departamentos5 = dff2.groupby(['DEPARTAMENTO', 'DISTRITO']).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                Poblacion=('Poblacion', 'max')
-                ).reset_index()
-            departamentos5 = departamentos5.groupby(['DEPARTAMENTO']).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                Poblacion=('Poblacion', 'sum'),
-                ).reset_index()
-            departamentos5['empresas_habitantes'] = (
-                departamentos5['Cantidad_Empresas'] / departamentos5['Poblacion']
-                        )
+            # La población del departamento viene de la dimensión de territorios
+            departamentos5 = cubo.agregado('empresas', ['DEPARTAMENTO'], ['Cantidad_Empresas', 'Poblacion'])
+            departamentos5['empresas_habitantes'] = indicadores.por_habitante(departamentos5['Cantidad_Empresas'], departamentos5['Poblacion'])
             datos = departamentos5.sort_values(by='empresas_habitantes', ascending=False)
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 datos,
                 x='DEPARTAMENTO',
                 y='empresas_habitantes',
                 #color='Seccion',  # Se mantiene la categorización por 'Seccion'
-                #color_continuous_scale='Viridis',  # Aplica el mismo esquema de colores
+                #
                 title='Cantidad de empresas por cada habitante a nivel nacional')
             
             data = datos.to_dict('records')
@@ -734,98 +745,18 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'POBLACION', 'id': 'Poblacion'},
                 {'name': 'RELACION', 'id': 'empresas_habitantes'},
             ]
- #----------------------------------------------------------------------------------------------------------------------------------------------------------       
-        elif selected_info == 'e':
-            children = explicaciones.get('e') 
-# Cantidad de empresas por cada habitante 
-#+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-            # 1 Calcular el coeficiente distrital 
-
-            departamentos = dff.groupby(['PAIS', 'DEPARTAMENTO', 'DISTRITO']).agg(
-                PARTICIPACION =('PARTICIPACION', 'sum'),
-                Poblacion=('Poblacion', 'max'),
-                ).reset_index().reset_index()
-            departamentos['ganancias_habitantes'] = (
-                departamentos['PARTICIPACION'] / departamentos['Poblacion']
-            )
-
-            # 2️⃣ Calcular el coeficiente departamental
-            departamentos2 = dff.groupby(['PAIS', 'DEPARTAMENTO', 'DISTRITO']).agg(
-                PARTICIPACION=('PARTICIPACION', 'sum'),
-                Poblacion=('Poblacion', 'max'),
-                ).reset_index().reset_index()
-            departamentos2 = departamentos2.groupby(['PAIS', 'DEPARTAMENTO']).agg(
-                PARTICIPACION=('PARTICIPACION', 'sum'),
-                Poblacion=('Poblacion', 'sum'),
-                ).reset_index()
-            departamentos2['ganancias_habitantes'] = (
-                departamentos2['PARTICIPACION'] / departamentos2['Poblacion']
-            )
-
-            # 3️⃣ Agregar nivel PAÍS con coeficiente 
 
-            departamentos3 = departamentos2.groupby(['PAIS']).agg(
-                PARTICIPACION=('PARTICIPACION', 'sum'),
-                Poblacion=('Poblacion', 'sum'))
-
-            departamentos3['ganancias_habitantes'] = (
-                departamentos3['PARTICIPACION'] / departamentos3['Poblacion']
-            )
-
-
-            # 5️⃣ Inicializar listas para Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 🔹 Agregar país (nivel superior)
-            labels.append("PARAGUAY")
-            parents.append("")
-            values.append(departamentos3['ganancias_habitantes'])
-
-            # 🔹 Agregar departamentos
-            for _, row in departamentos2.iterrows():
-                labels.append(row['DEPARTAMENTO'])
-                parents.append("PARAGUAY")  # Conectar los departamentos al país
-                values.append(row['ganancias_habitantes'])
-
-            # 🔹 Agregar distritos
-            for _, row in departamentos.iterrows():
-                labels.append(row['DISTRITO'])
-                parents.append(row['DEPARTAMENTO'])  # Conectar distritos a departamentos
-                values.append(row['ganancias_habitantes'])
-
-            # 6️⃣ Crear Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value",
-                textinfo="label+value",
-            ))
-            
-            # Mostrar gráfico
-            fig.update_layout(title=f'Cantidad de empresas por cada habitante en {selected_options}')
-
-
-            departamentos5 = dff2.groupby(['DEPARTAMENTO', 'DISTRITO']).agg(
-                PARTICIPACION=('PARTICIPACION', 'sum'),
-                Poblacion=('Poblacion', 'max')
-                ).reset_index()
-            departamentos5 = departamentos5.groupby(['DEPARTAMENTO']).agg(
-                PARTICIPACION=('PARTICIPACION', 'sum'),
-                Poblacion=('Poblacion', 'sum'),
-                ).reset_index()
-            departamentos5['ganancias_habitantes'] = (
-                departamentos5['PARTICIPACION'] / departamentos5['Poblacion']
-                        )
+        elif selected_info == 'e':
+            # La población del departamento viene de la dimensión de territorios
+            departamentos5 = cubo.agregado('empresas', ['DEPARTAMENTO'], ['PARTICIPACION', 'Poblacion'])
+            departamentos5['ganancias_habitantes'] = indicadores.por_habitante(departamentos5['PARTICIPACION'], departamentos5['Poblacion'])
             datos = departamentos5.sort_values(by='ganancias_habitantes', ascending=False)
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 datos,
                 x='DEPARTAMENTO',
                 y='ganancias_habitantes',
                 #color='Seccion',  # Se mantiene la categorización por 'Seccion'
-                #color_continuous_scale='Viridis',  # Aplica el mismo esquema de colores
+                #
                 title='Cantidad de empresas por cada habitante a nivel nacional')
             
             data = datos.to_dict('records')
@@ -834,62 +765,17 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'GANANCIAS (%)', 'id': 'PARTICIPACION'},
                 {'name': 'POBLACION', 'id': 'Poblacion'},
                 {'name': 'RELACION', 'id': 'ganancias_habitantes'},]
- #----------------------------------------------------------------------------------------------------------------------------------------
-
-
-        elif selected_info == 'f':
-            children = explicaciones.get('f') 
-# Cantidad de actividades por cada territorio
-#+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-            # 1 Calcular el coeficiente distrital 
-
-            departamentos = dff.groupby('PAIS')['Actividad_principal'].nunique().reset_index()
-            departamentos2 = dff.groupby(['PAIS', 'DEPARTAMENTO'])['Actividad_principal'].nunique().reset_index()
-            departamentos3 = dff.groupby(['PAIS', 'DEPARTAMENTO', 'DISTRITO'])['Actividad_principal'].nunique().reset_index()
-
-            # 5️⃣ Inicializar listas para Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 🔹 Agregar país (nivel superior)
-            labels.append("PARAGUAY")
-            parents.append("")
-            values.append(departamentos['Actividad_principal'])
-
-            # 🔹 Agregar departamentos
-            for _, row in departamentos2.iterrows():
-                labels.append(row['DEPARTAMENTO'])
-                parents.append("PARAGUAY")  # Conectar los departamentos al país
-                values.append(row['Actividad_principal'])
 
-            # 🔹 Agregar distritos
-            for _, row in departamentos3.iterrows():
-                labels.append(row['DISTRITO'])
-                parents.append(row['DEPARTAMENTO'])  # Conectar distritos a departamentos
-                values.append(row['Actividad_principal'])
-
-            # 6️⃣ Crear Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value",
-                textinfo="label+value",
-            ))
-
-            # Mostrar gráfico
-            fig.update_layout(title=f'Cantidad de actividades economicas desarrolladas en {selected_options}')
-
-            departamentos5 = dff2.groupby(['DEPARTAMENTO'])['Actividad_principal'].nunique().reset_index()
+        elif selected_info in ('f', 'g'):
+            departamentos5 = cubo.agregado('empresas', ['DEPARTAMENTO'], ['Cantidad_Actividades']).rename(columns={'Cantidad_Actividades': 'Actividad_principal'})
             datos = departamentos5.sort_values(by='Actividad_principal', ascending=False)
 
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 datos,
                 x='DEPARTAMENTO',
                 y='Actividad_principal',
                 #color='Seccion',  # Se mantiene la categorización por 'Seccion'
-                #color_continuous_scale='Viridis',  # Aplica el mismo esquema de colores
+                #
                 title='Cantidad de actividades economicas desarrolladas en cada Departamento')
           
             
@@ -899,78 +785,20 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'CANTIDAD DE ACTIVIDADES', 'id': 'Actividad_principal'}
             ]
 
-
-#-----------------------------------------------------------------------------------------------------------------------------------------------------------       
-#----------------------------------------------------------------------------------------------------------------------------------------------------------------------------   
     elif radio == 'Distritos':
-        seleccionados = selected_options
-        dff = df.loc[df['DISTRITO'].isin(seleccionados)]      
-        dff2 = df.copy()
-    #------------------------------------------------------------------------------------------------------------------------------------------------------------- 
-    #        
         if selected_info == 'a':
-            children = explicaciones.get('a') 
-
-            df_distritos = dff.groupby(['DISTRITO', 'Seccion', 'Division', 'Actividad_principal'])['Cantidad_Empresas'].sum().reset_index()
-            df_distritos.fillna("Desconocido", inplace=True)
-            df_distritos['Seccion'] = df_distritos['DISTRITO'] + " - " + df_distritos['Seccion']
-            df_distritos['Division'] = df_distritos['Seccion'] + " - " + df_distritos['Division']
-            df_distritos['Actividad_principal'] = df_distritos['Division'] + " - " + df_distritos['Actividad_principal']
-
-            # Inicializar listas
-            labels = []
-            parents = []
-            values = []
-
-            # 1️⃣ Agregar departamentos (Nivel Superior - Bisabuelo)
-            for distrito in df_distritos['DISTRITO'].unique():
-                labels.append(distrito)
-                parents.append('')  
-                values.append(df_distritos[df_distritos['DISTRITO'] == distrito]['Cantidad_Empresas'].sum())
-
-            # 2️⃣ Agregar Secciones (Nivel Abuelo)
-            for _, row in df_distritos[['DISTRITO', 'Seccion']].drop_duplicates().iterrows():
-                labels.append(row['Seccion'])
-                parents.append(row['DISTRITO'])  
-                values.append(df_distritos[df_distritos['Seccion'] == row['Seccion']]['Cantidad_Empresas'].sum())
-
-            # 3️⃣ Agregar Divisiones (Nivel Padre)
-            for _, row in df_distritos[['Seccion', 'Division']].drop_duplicates().iterrows():
-                labels.append(row['Division'])
-                parents.append(row['Seccion'])  
-                values.append(df_distritos[df_distritos['Division'] == row['Division']]['Cantidad_Empresas'].sum())
-
-            # 4️⃣ Agregar Actividades Principales (Nivel Hijo)
-            for _, row in df_distritos[['Division', 'Actividad_principal']].drop_duplicates().iterrows():
-                labels.append(row['Actividad_principal'])
-                parents.append(row['Division'])  
-                values.append(df_distritos[df_distritos['Actividad_principal'] == row['Actividad_principal']]['Cantidad_Empresas'].sum())
-
-            # Crear Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value+percent entry",
-                textinfo="label+value+percent entry",
-            ))
-
-            fig.update_layout(title=f'Cantidad de empresas por sector en {selected_options}')
-
-            df_distritos2 = dff2.groupby('DISTRITO')['Cantidad_Empresas'].sum().reset_index()
+            df_distritos2 = cubo.agregado('empresas', 'DISTRITO', ['Cantidad_Empresas'])
             top2 = df_distritos2.sort_values(by='Cantidad_Empresas', ascending=False).head(20)
-            dff3 = dff2.loc[dff2['DISTRITO'].isin(top2['DISTRITO'])]
-            df_distritos3 = dff3.groupby(['DISTRITO', 'Seccion'])['Cantidad_Empresas'].sum().reset_index()
+            df_distritos3 = cubo.agregado('empresas', ['DISTRITO', 'Seccion'], ['Cantidad_Empresas'], seleccion={'DISTRITO': top2['DISTRITO']})
             df_distritos3 = df_distritos3.sort_values(by='Cantidad_Empresas', ascending=False).head(20)
 
             # Crear el gráfico con los datos corregidos
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 df_distritos3,
                 x='DISTRITO',
                 y='Cantidad_Empresas',
                 color='Seccion',
                 title='Cantidad de empresas por sector en los 20 principales distritos',
-                color_continuous_scale='Viridis',
             )
 
             # Ajustar la leyenda para que aparezca abajo
@@ -991,71 +819,19 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'DISTRITOS', 'id': 'DISTRITO'},
                 {'name': 'EMPRESAS', 'id': 'Cantidad_Empresas'}]
 
-
-    #-------------------------------------------------------------------------------------------------------------------------------
-    #         
         elif selected_info == 'b':
-            children = explicaciones.get('b') 
-
-            df_distritos = dff.groupby(['DISTRITO', 'Seccion', 'Division', 'Actividad_principal'])['PARTICIPACION'].sum().reset_index()
-            df_distritos.fillna("Desconocido", inplace=True)
-            df_distritos['Seccion'] = df_distritos['DISTRITO'] + " - " + df_distritos['Seccion']
-            df_distritos['Division'] = df_distritos['Seccion'] + " - " + df_distritos['Division']
-            df_distritos['Actividad_principal'] = df_distritos['Division'] + " - " + df_distritos['Actividad_principal']
-
-            labels = []
-            parents = []
-            values = []
-
-            # 1️⃣ Agregar distritos (Nivel Superior - Bisabuelo)
-            for distrito in df_distritos['DISTRITO'].unique():
-                labels.append(distrito)
-                parents.append('')
-                values.append(df_distritos[df_distritos['DISTRITO'] == distrito]['PARTICIPACION'].sum())
-
-            # 2️⃣ Agregar Secciones (Nivel Abuelo)
-            for _, row in df_distritos[['DISTRITO', 'Seccion']].drop_duplicates().iterrows():
-                labels.append(row['Seccion'])
-                parents.append(row['DISTRITO'])
-                values.append(df_distritos[df_distritos['Seccion'] == row['Seccion']]['PARTICIPACION'].sum())
-
-            # 3️⃣ Agregar Divisiones (Nivel Padre)
-            for _, row in df_distritos[['Seccion', 'Division']].drop_duplicates().iterrows():
-                labels.append(row['Division'])
-                parents.append(row['Seccion'])
-                values.append(df_distritos[df_distritos['Division'] == row['Division']]['PARTICIPACION'].sum())
-
-            # 4️⃣ Agregar Actividades Principales (Nivel Hijo)
-            for _, row in df_distritos[['Division', 'Actividad_principal']].drop_duplicates().iterrows():
-                labels.append(row['Actividad_principal'])
-                parents.append(row['Division'])
-                values.append(df_distritos[df_distritos['Actividad_principal'] == row['Actividad_principal']]['PARTICIPACION'].sum())
-
-            # Crear Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value+percent entry",
-                textinfo="label+value+percent entry",
-            ))
-
-            fig.update_layout(title=f'Participación de ganancias por sector en {selected_options}')
-
-            df_distritos2 = dff2.groupby('DISTRITO')['PARTICIPACION'].sum().reset_index()
+            df_distritos2 = cubo.agregado('empresas', 'DISTRITO', ['PARTICIPACION'])
             top2 = df_distritos2.sort_values(by='PARTICIPACION', ascending=False).head(20)
-            dff3 = dff2.loc[dff2['DISTRITO'].isin(top2['DISTRITO'])]
-            df_distritos3 = dff3.groupby(['DISTRITO', 'Seccion'])['PARTICIPACION'].sum().reset_index()
+            df_distritos3 = cubo.agregado('empresas', ['DISTRITO', 'Seccion'], ['PARTICIPACION'], seleccion={'DISTRITO': top2['DISTRITO']})
             df_distritos3 = df_distritos3.sort_values(by='PARTICIPACION', ascending=False).head(20)
 
             # Crear el gráfico con los datos corregidos
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 df_distritos3,
                 x='DISTRITO',
                 y='PARTICIPACION',
                 color='Seccion',
                 title='Participacion de ganancias por sector en los 20 principales distritos',
-                color_continuous_scale='Viridis',
             )
 
             # Ajustar la leyenda para que aparezca abajo
@@ -1075,150 +851,15 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'DISTRITOS', 'id': 'DISTRITO'},
                 {'name': 'GANANCIAS (%)', 'id': 'PARTICIPACION'}]
 
-    #-----------------------------------------------------------------------------------------------------------------------------------
         elif selected_info == 'c':
-            children = explicaciones.get('c') 
-
-            # --- Paso preliminar: Cálculo global basado en dff2 (sin filtro) ---
+            # --- Paso preliminar: Cálculo global (sin filtro) ---
 
             # Agrupar globalmente por DISTRITO
-            distritos2 = dff2.groupby('DISTRITO').agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            ).reset_index()
+            distritos2 = cubo.agregado('empresas', 'DISTRITO', ['Cantidad_Empresas', 'PARTICIPACION'])
 
             # Calcular el porcentaje global de empresas y la "rentabilidad" (cálculo base)
-            distritos2['porcentaje_empresas'] = distritos2['Cantidad_Empresas'] / distritos2['Cantidad_Empresas'].sum() * 100
-            distritos2['rentabilidad_empresas'] = distritos2['PARTICIPACION'] / distritos2['porcentaje_empresas'] * 100
-
-            # Extraer los totales globales (estos se usarán para el cálculo de porcentajes a nivel filtrado)
-            cantidad_empresas = distritos2['Cantidad_Empresas'].sum()
-            participacion_total = distritos2['PARTICIPACION'].sum()
-            
-
-            # --- Paso 1: Crear el DataFrame de distritos a partir de dff (Datos filtrados) ---
-            df_distritos = dff.groupby(['DISTRITO', 'Seccion', 'Division', 'Actividad_principal'], as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            # Usar los totales globales para el porcentaje
-            df_distritos['porcentaje_empresas'] = df_distritos['Cantidad_Empresas'] / cantidad_empresas * 100
-            df_distritos = df_distritos.fillna(0)
-
-            # --- Paso 2: Nivel Distritos ---
-            # Agrupar los datos filtrados a nivel distrito para calcular la rentabilidad
-            df_distritos_rentabilidad = df_distritos.groupby('DISTRITO', as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            # Aquí usamos el total de empresas de este groupby para el cálculo del porcentaje en este nivel
-            df_distritos_rentabilidad['porcentaje_empresas'] = df_distritos_rentabilidad['Cantidad_Empresas'] / cantidad_empresas * 100
-            df_distritos_rentabilidad['rentabilidad_empresas'] = df_distritos_rentabilidad.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0) else 0,
-                axis=1
-            )
-            df_distritos_rentabilidad = df_distritos_rentabilidad.fillna(0)
-
-            # --- Paso 3: Nivel Secciones ---
-            df_secciones = dff.groupby(['DISTRITO', 'Seccion'], as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            # Usar el total global (cantidad_empresas) para calcular este porcentaje
-            df_secciones['porcentaje_empresas'] = df_secciones['Cantidad_Empresas'] / cantidad_empresas * 100
-            df_secciones['rentabilidad_empresas'] = df_secciones.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0) else 0,
-                axis=1
-            )
-            df_secciones = df_secciones.fillna(0)
-
-            # --- Paso 4: Nivel Divisiones ---
-            df_divisiones = dff.groupby(['DISTRITO', 'Seccion', 'Division'], as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            df_divisiones['porcentaje_empresas'] = df_divisiones['Cantidad_Empresas'] / cantidad_empresas * 100
-            df_divisiones['rentabilidad_empresas'] = df_divisiones.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0) else 0,
-                axis=1
-            )
-            df_divisiones = df_divisiones.fillna(0)
-
-            # --- Paso 5: Nivel Actividades ---
-            df_actividades = dff.groupby(['DISTRITO', 'Seccion', 'Division', 'Actividad_principal'], as_index=False).agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                PARTICIPACION=('PARTICIPACION', 'sum')
-            )
-            df_actividades['porcentaje_empresas'] = df_actividades['Cantidad_Empresas'] / cantidad_empresas * 100
-            df_actividades['rentabilidad_empresas'] = df_actividades.apply(
-                lambda row: (row['PARTICIPACION'] / row['porcentaje_empresas'] * 100)
-                if (row['porcentaje_empresas'] > 0 and row['PARTICIPACION'] > 0) else 0,
-                axis=1
-            )
-            df_actividades = df_actividades.fillna(0)
-
-            # --- Paso 6: Crear IDs únicos para cada nivel ---
-            df_distritos['DIST_ID'] = df_distritos['DISTRITO']
-            df_secciones['SEC_ID'] = df_secciones['DISTRITO'] + ' - ' + df_secciones['Seccion']
-            df_divisiones['DIV_ID'] = df_divisiones['DISTRITO'] + ' - ' + df_divisiones['Seccion'] + ' - ' + df_divisiones['Division']
-            df_actividades['ACT_ID'] = df_actividades['DISTRITO'] + ' - ' + df_actividades['Seccion'] + ' - ' + df_actividades['Division'] + ' - ' + df_actividades['Actividad_principal']
-
-            # --- Paso 7: Inicializar las listas para el treemap ---
-            ids = []
-            labels = []
-            parents = []
-            values = []
-
-            # Nivel Distritos (usando df_distritos_rentabilidad)
-            for _, row in df_distritos_rentabilidad.iterrows():
-                ids.append(row['DISTRITO'])       # Cada distrito como identificador único
-                labels.append(row['DISTRITO'])
-                parents.append('')
-                values.append(row['rentabilidad_empresas'])
-
-            # Nivel Secciones
-            for _, row in df_secciones.iterrows():
-                sec_id = row['DISTRITO'] + ' - ' + row['Seccion']
-                ids.append(sec_id)
-                labels.append(row['Seccion'])
-                parents.append(row['DISTRITO'])
-                values.append(row['rentabilidad_empresas'])
-
-            # Nivel Divisiones
-            for _, row in df_divisiones.iterrows():
-                div_id = row['DISTRITO'] + ' - ' + row['Seccion'] + ' - ' + row['Division']
-                sec_id = row['DISTRITO'] + ' - ' + row['Seccion']
-                ids.append(div_id)
-                labels.append(row['Division'])
-                parents.append(sec_id)
-                values.append(row['rentabilidad_empresas'])
-
-            # Nivel Actividades
-            for _, row in df_actividades.iterrows():
-                act_id = row['DISTRITO'] + ' - ' + row['Seccion'] + ' - ' + row['Division'] + ' - ' + row['Actividad_principal']
-                div_id = row['DISTRITO'] + ' - ' + row['Seccion'] + ' - ' + row['Division']
-                ids.append(act_id)
-                labels.append(row['Actividad_principal'])
-                parents.append(div_id)
-                values.append(row['rentabilidad_empresas'])
-
-            # --- Paso 8: Crear el treemap usando Plotly ---
-            fig = go.Figure(go.Treemap(
-                ids=ids,
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value+percent entry",
-                textinfo="label+value+percent entry",
-                # Puedes ajustar la escala de colores según tus necesidades:
-                # marker=dict(colors=values, colorscale='RdBu', cmid=100)
-            ))
-
-            # --- Paso 9: Actualizar el layout del gráfico ---
-            fig.update_layout(title=f"Rentabilidad relativa por actividad y territorio en {selected_options}")
+            distritos2['porcentaje_empresas'] = indicadores.participacion(distritos2['Cantidad_Empresas'])
+            distritos2['rentabilidad_empresas'] = indicadores.rentabilidad(distritos2['PARTICIPACION'], distritos2['porcentaje_empresas'])
 
 
 
@@ -1227,7 +868,7 @@ def update_dashboard(radio, selected_options, selected_info):
             distritos3 = distritos2.head(20)
 
             datos = distritos3
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 datos,
                 x='DISTRITO',
                 y='rentabilidad_empresas',
@@ -1242,61 +883,21 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'RELACION', 'id': 'rentabilidad_empresas'},
             ]
 
-
-#---------------------------------------------------------------------------------------------------------------------------------------------------------
-
         elif selected_info == 'd':
-            children = explicaciones.get('d') 
-            # 1 Calcular el coeficiente distrital 
+            distritos2 = cubo.agregado('empresas', 'DISTRITO', ['Cantidad_Empresas', 'Poblacion'])
 
-            # 1️⃣ Calcular el coeficiente distrital (Empresas por habitante)
-            distritos = dff.groupby('DISTRITO').agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                Poblacion=('Poblacion', 'max'),
-            ).reset_index()
-
-            distritos['empresas_habitantes'] = distritos['Cantidad_Empresas'] / distritos['Poblacion']
-
-            # 2️⃣ Inicializar listas para Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 🔹 Agregar distritos como único nivel
-            for _, row in distritos.iterrows():
-                labels.append(row['DISTRITO'])
-                parents.append("")  # Nivel raíz, ya que no hay departamentos ni país
-                values.append(row['empresas_habitantes'])
-
-            # 3️⃣ Crear Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value",
-                textinfo="label+value",
-            ))
-
-            # 4️⃣ Mostrar gráfico
-            fig.update_layout(title=f'Cantidad de empresas por cada habitante a nivel distrital en {selected_options}')
-            
-            distritos2 = dff2.groupby('DISTRITO').agg(
-                Cantidad_Empresas=('Cantidad_Empresas', 'sum'),
-                Poblacion=('Poblacion', 'max'),
-            ).reset_index()
-
-            distritos2['Empresas_por_Habitantes'] = distritos2['Cantidad_Empresas'] / distritos2['Poblacion']
+            distritos2['Empresas_por_Habitantes'] = indicadores.por_habitante(distritos2['Cantidad_Empresas'], distritos2['Poblacion'])
             distritos2 = distritos2.sort_values(by='Empresas_por_Habitantes', ascending=False)
             distritos2 = distritos2.loc[distritos2['DISTRITO'] != 'Sin Datos']  # Filtrar el distrito "Sin Datos"
             distritos3 = distritos2.head(20)
 
             datos = distritos3
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 datos,
                 x='DISTRITO',
                 y='Empresas_por_Habitantes',
                 #color='Seccion',  # Se mantiene la categorización por 'Seccion'
-                #color_continuous_scale='Viridis',  # Aplica el mismo esquema de colores
+                #
                 title='Cantidad de empresas por cada habitante en distritos top 20')
 
 
@@ -1308,63 +909,22 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'RELACION', 'id': 'Empresas_por_Habitantes'},
             ]
 
-
-
-    #-------------------------------------------------------------------------------------------------------------------------------------
-
-    
         elif selected_info == 'e':
-            children = explicaciones.get('e') 
-
-            distritos = dff.groupby('DISTRITO').agg(
-                PARTICIPACION=('PARTICIPACION', 'sum'),
-                Porcentaje_poblacion=('Porcentaje_poblacion', 'max')
-            ).reset_index()
-
-            # Calcular la relación de ganancias por población a nivel distrital
-            distritos['ganancias_por_poblacion_distrital'] = distritos['PARTICIPACION'] / distritos['Porcentaje_poblacion']
-
-            # Inicializar listas para el treemap
-            labels = []
-            parents = []
-            values = []
-
-            # Agregar distritos como únicos niveles
-            for _, row in distritos.iterrows():
-                labels.append(row['DISTRITO'])
-                parents.append("")  # Nivel raíz, ya que no hay departamentos
-                values.append(row['ganancias_por_poblacion_distrital'])
-
-            # Crear Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value",
-                textinfo="label+value",
-            ))
-
-            fig.update_layout(title=f'Relación entre el porcentaje de ganancia y el porcentaje de población a nivel distrital en {selected_options}')
-
-            
-            distritos2 = dff2.groupby('DISTRITO').agg(
-                PARTICIPACION=('PARTICIPACION', 'sum'),
-                Porcentaje_poblacion=('Porcentaje_poblacion', 'max')
-            ).reset_index()
+            distritos2 = cubo.agregado('empresas', 'DISTRITO', ['PARTICIPACION', 'Porcentaje_poblacion'])
 
             # Calcular la relación de ganancias por población a nivel distrital
-            distritos2['Ganancias_por_Poblacion_Distrital'] = distritos2['PARTICIPACION'] / distritos2['Porcentaje_poblacion']
+            distritos2['Ganancias_por_Poblacion_Distrital'] = indicadores.por_poblacion(distritos2['PARTICIPACION'], distritos2['Porcentaje_poblacion'])
             distritos2 = distritos2.sort_values(by='Ganancias_por_Poblacion_Distrital', ascending=False)
             distritos2 = distritos2.loc[distritos2['DISTRITO'] != 'Sin Datos']  # Filtrar el distrito "Sin Datos"
             distritos3 = distritos2.head(20)
 
             datos = distritos3
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 datos,
                 x='DISTRITO',
                 y='Ganancias_por_Poblacion_Distrital',
                 #color='Seccion',  # Se mantiene la categorización por 'Seccion'
-                #color_continuous_scale='Viridis',  # Aplica el mismo esquema de colores
+                #
                 title='Relación entre el porcentaje de ganancia y el porcentaje de población')
 
 
@@ -1376,49 +936,19 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'RELACION', 'id': 'Ganancias_por_Poblacion_Distrital'},
             ]
 
-#-----------------------------------------------------------------------------------------------------------------------------------
-
-        elif selected_info == 'f':
-            children = explicaciones.get('f') 
- 
-            distritos = dff.groupby(['DISTRITO'])['Actividad_principal'].nunique().reset_index()
-
-            # 2️⃣ Inicializar listas para Treemap
-            labels = []
-            parents = []
-            values = []
-
-            # 🔹 Agregar distritos como único nivel
-            for _, row in distritos.iterrows():
-                labels.append(row['DISTRITO'])
-                parents.append("")  # Nivel raíz, ya que no hay departamentos ni país
-                values.append(row['Actividad_principal'])
-
-            # 3️⃣ Crear Treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=parents,
-                values=values,
-                hoverinfo="label+value",
-                textinfo="label+value",
-            ))
-
-            
-            # Mostrar gráfico
-            fig.update_layout(title=f'Cantidad de actividades economicas desarrolladas en {selected_options}')
-            
-            distritos = dff2.groupby(['DISTRITO'])['Actividad_principal'].nunique().reset_index()
+        elif selected_info in ('f', 'g'):
+            distritos = cubo.agregado('empresas', ['DISTRITO'], ['Cantidad_Actividades']).rename(columns={'Cantidad_Actividades': 'Actividad_principal'})
             distritos2 = distritos.sort_values(by='Actividad_principal', ascending=False)
             distritos3 = distritos2.head(20)
             distritos3 = distritos3.sort_values(by='Actividad_principal', ascending=False)
 
             datos = distritos3
-            fig2 = px.bar(
+            fig2 = figuras.barras(
                 datos,
                 x='DISTRITO',
                 y='Actividad_principal',
                 #color='Seccion',  # Se mantiene la categorización por 'Seccion'
-                #color_continuous_scale='Viridis',  # Aplica el mismo esquema de colores
+                #
                 title='Top 20 Distritos por cantidad de actividades economicas desarrolladas')
 
 
@@ -1428,7 +958,48 @@ def update_dashboard(radio, selected_options, selected_info):
                 {'name': 'Cantidad de Actividades', 'id': 'Actividad_principal'},
             ]
 
+    return fig2, columns, data
 
 
+@dash.callback(
+    [Output('plot2b', 'figure'),
+     Output('tableb', 'columns'),
+     Output('tableb', 'page_current')],
+    [Input('radiob', 'value'),
+     Input('infob', 'value')]
+)
+def update_nacional(radio, selected_info):
+    # Las filas de la tabla las envía update_tabla, una página por vez; al
+    # cambiar de vista se vuelve a la primera página
+    fig2, columns, _ = nacional(radio, selected_info)
+    return fig2, columns, 0
 
-    return fig, fig2, columns, data, children
\ No newline at end of file
+
+@dash.callback(
+    [Output('tableb', 'data'),
+     Output('tableb', 'page_count')],
+    [Input('radiob', 'value'),
+     Input('infob', 'value'),
+     Input('tableb', 'page_current'),
+     Input('tableb', 'page_size'),
+     Input('tableb', 'sort_by'),
+     Input('tableb', 'filter_query')]
+)
+def update_tabla(radio, selected_info, page_current, page_size, sort_by, filter_query):
+    # Filtrado, orden y paginación en el servidor sobre la tabla nacional completa
+    registros = nacional(radio, selected_info)[2]
+    datos = paginacion.marco(('empresas', radio, selected_info, almacen.version('empresas')), registros)
+    return paginacion.pagina(datos, page_current, page_size, sort_by, filter_query)
+
+
+@cache.precalentamiento
+def precalentar():
+    # Selección por defecto del dropdown, en los dos modos y todas las métricas
+    vistas = 0
+    for radio in ['Departamentos', 'Distritos']:
+        _, seleccion = dropdown(radio)
+        for metrica in explicaciones:
+            update_dashboard(radio, seleccion, metrica)
+            nacional(radio, metrica)
+            vistas += 1
+    return vistas
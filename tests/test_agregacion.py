@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import agregacion
+
+MEDIDAS = {
+    'suma_entera': ('entero', 'sum'),
+    'suma_real': ('real', 'sum'),
+    'maximo_entero': ('entero', 'max'),
+    'maximo_real': ('real', 'max'),
+    'distintos': ('texto', 'nunique'),
+}
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(3)
+    n = 2000
+    real = rng.normal(size=n)
+    real[rng.random(n) < 0.2] = np.nan
+    # Un grupo con todos los reales faltantes: su máximo es NaN y su suma 0
+    real[:40] = np.nan
+    departamento = rng.choice(['Central', 'Itapúa', 'Guairá', None], n)
+    departamento[:40] = 'Boquerón'
+    return pd.DataFrame({
+        'departamento': departamento,
+        'codigo': rng.integers(0, 30, n),
+        'seccion': pd.Categorical(rng.choice(list('ABCDE'), n), categories=list('ABCDEFG')),
+        # Valores por encima de 2**53, donde una suma en float64 pierde unidades
+        'entero': rng.integers(0, 1000, n) + (1 << 60) // n,
+        'real': real,
+        'texto': rng.choice(['x', 'y', 'z', None], n),
+    })
+
+
+@pytest.fixture(params=['densa', 'unica'])
+def camino(request, monkeypatch):
+    # Con LIMITE_DENSO = 0 las combinaciones se numeran con np.unique
+    if request.param == 'unica':
+        monkeypatch.setattr(agregacion, 'LIMITE_DENSO', 0)
+    return request.param
+
+
+def _groupby(df, claves, medidas):
+    return df.groupby(claves, observed=True, sort=True).agg(**medidas).reset_index()
+
+
+@pytest.mark.parametrize('claves', [
+    ['departamento'],
+    ['codigo'],
+    ['seccion'],
+    ['departamento', 'seccion'],
+    ['seccion', 'codigo', 'departamento'],
+])
+def test_como_groupby(df, camino, claves):
+    pd.testing.assert_frame_equal(agregacion.agrupar(df, claves, MEDIDAS), _groupby(df, claves, MEDIDAS))
+
+
+def test_suma_entera_exacta(df, camino):
+    resultado = agregacion.agrupar(df, ['departamento'], {'suma': ('entero', 'sum')})
+    esperado = [sum(int(v) for v in df.loc[df['departamento'] == d, 'entero']) for d in resultado['departamento']]
+    assert resultado['suma'].tolist() == esperado
+
+
+def test_entrada_vacia(df, camino):
+    vacio = df.iloc[:0]
+    resultado = agregacion.agrupar(vacio, ['departamento', 'codigo'], MEDIDAS)
+    assert len(resultado) == 0
+    assert list(resultado.columns) == ['departamento', 'codigo'] + list(MEDIDAS)
+
+
+def test_claves_todas_faltantes(df, camino):
+    # Sin ninguna fila con clave: vacío, como groupby (y _maximo sin grupos)
+    sin_clave = df.assign(departamento=None)
+    resultado = agregacion.agrupar(sin_clave, ['departamento'], {'maximo': ('real', 'max')})
+    assert len(resultado) == 0
+
+
+def test_funcion_no_soportada_usa_pandas(df):
+    medidas = {'media': ('real', 'mean')}
+    pd.testing.assert_frame_equal(agregacion.agrupar(df, ['codigo'], medidas), _groupby(df, ['codigo'], medidas))
@@ -0,0 +1,175 @@
+import pandas as pd
+import pytest
+
+from utils import paginacion
+
+# Los resultados esperados son los del DataTable de dash 2.18.2 con
+# filter_action y sort_action en 'native' sobre las mismas filas (su código de
+# filtrado y ordenamiento, src/dash-table/syntax-tree y src/core/sorting), salvo
+# donde se indica que el DataTable falla.
+
+FILAS = [
+    {'id': 0, 'DEPARTAMENTO': 'Asunción', 'Cantidad_Empresas': 120, 'PARTICIPACION': 12.5, 'fecha': '2020-05-01', 'codigo': '05'},
+    {'id': 1, 'DEPARTAMENTO': 'Central', 'Cantidad_Empresas': 95, 'PARTICIPACION': 30.25, 'fecha': '2020-11-17 10:30', 'codigo': '5'},
+    {'id': 2, 'DEPARTAMENTO': 'Alto Paraná', 'Cantidad_Empresas': 40, 'PARTICIPACION': None, 'fecha': '2021-01-01', 'codigo': 'A1'},
+    {'id': 3, 'DEPARTAMENTO': 'ASUNCION', 'Cantidad_Empresas': 7, 'PARTICIPACION': 0.5, 'fecha': None, 'codigo': '7.0'},
+    {'id': 4, 'DEPARTAMENTO': 'Itapúa', 'Cantidad_Empresas': 40, 'PARTICIPACION': 8.0, 'fecha': '2019-12-31', 'codigo': None},
+    {'id': 5, 'DEPARTAMENTO': 'San Pedro', 'Cantidad_Empresas': 5, 'PARTICIPACION': 2.0, 'fecha': '2020-02-30', 'codigo': 'a1'},
+    {'id': 6, 'DEPARTAMENTO': None, 'Cantidad_Empresas': 0, 'PARTICIPACION': 0.0, 'fecha': '2020', 'codigo': ''},
+    {'id': 7, 'DEPARTAMENTO': 'Presidente Hayes', 'Cantidad_Empresas': 13, 'PARTICIPACION': 1.25, 'fecha': '2020-05-17', 'codigo': '13'},
+]
+
+TODAS = list(range(len(FILAS)))
+
+
+@pytest.fixture
+def df():
+    # Como en paginacion.marco: las celdas vacías de columnas numéricas son NaN
+    return pd.DataFrame.from_records(FILAS)
+
+
+def ids(df, filter_query='', sort_by=None):
+    return paginacion.ordenar(paginacion.filtrar(df, filter_query), sort_by)['id'].tolist()
+
+
+@pytest.mark.parametrize('filter_query, esperado', [
+    # contains: sin prefijo y con s distingue mayúsculas, con i no
+    ('{DEPARTAMENTO} contains Asun', [0]),
+    ('{DEPARTAMENTO} scontains asun', []),
+    ('{DEPARTAMENTO} icontains asun', [0, 3]),
+    # contains compara textos: entre dos números no coincide
+    ('{Cantidad_Empresas} contains 4', []),
+    ('{codigo} contains 1', [2, 5, 7]),
+    # = entre textos exacto; entre valores numéricos (también textos) por valor
+    ('{DEPARTAMENTO} = Central', [1]),
+    ('{DEPARTAMENTO} eq central', []),
+    ('{DEPARTAMENTO} s= Central', [1]),
+    ('{Cantidad_Empresas} = 40', [2, 4]),
+    ('{codigo} = 5', [0, 1]),
+    ('{codigo} = 7', [3]),
+    # != es estricto: el texto '5' es distinto del número 5
+    ('{Cantidad_Empresas} != 40', [0, 1, 3, 5, 6, 7]),
+    ('{DEPARTAMENTO} ne Central', [0, 2, 3, 4, 5, 6, 7]),
+    ('{codigo} != 5', TODAS),
+    ('{Cantidad_Empresas} > 40', [0, 1]),
+    ('{Cantidad_Empresas} >= 40', [0, 1, 2, 4]),
+    ('{Cantidad_Empresas} gt 100', [0]),
+    ('{Cantidad_Empresas} < 13', [3, 5, 6]),
+    ('{Cantidad_Empresas} le 13', [3, 5, 6, 7]),
+    ('{PARTICIPACION} >= 8', [0, 1, 4]),
+    # En JavaScript null < 1 (null vale 0)
+    ('{PARTICIPACION} < 1', [2, 3, 6]),
+    ('{DEPARTAMENTO} > Central', [4, 5, 7]),
+    # Con i y una celda vacía el DataTable falla (null.toString()); aquí la fila no pasa
+    ('{DEPARTAMENTO} ieq central', [1]),
+    ('{DEPARTAMENTO} ige central', [1, 4, 5, 7]),
+    # datestartswith solo con fechas válidas (2020-02-30 no lo es)
+    ('{fecha} datestartswith 2020', [0, 1, 6, 7]),
+    ('{fecha} datestartswith 2020-05', [0, 7]),
+    ('{Cantidad_Empresas} datestartswith 2020', []),
+    ('{DEPARTAMENTO} datestartswith 2020', []),
+])
+def test_operadores(df, filter_query, esperado):
+    assert ids(df, filter_query) == esperado
+
+
+@pytest.mark.parametrize('filter_query, esperado', [
+    ('{no_existe} > 1', []),
+    ('{no_existe} < 1', []),
+    ('{DEPARTAMENTO} is blank', [6]),
+    ('{PARTICIPACION} is nil', [2]),
+    ('{codigo} is blank', [4, 6]),
+    ('{Cantidad_Empresas} is even', [0, 2, 4, 6]),
+    ('{Cantidad_Empresas} is odd', [1, 3, 5, 7]),
+    ('{Cantidad_Empresas} is prime', [3, 5, 7]),
+    ('{codigo} is num', []),
+    ('{PARTICIPACION} is num', [0, 1, 3, 4, 5, 6, 7]),
+    ('{Cantidad_Empresas} > {PARTICIPACION}', [0, 1, 2, 3, 4, 5, 7]),
+])
+def test_columnas_y_operadores_unarios(df, filter_query, esperado):
+    assert ids(df, filter_query) == esperado
+
+
+@pytest.mark.parametrize('filter_query, esperado', [
+    ('{DEPARTAMENTO} contains "o P"', [2]),
+    ("{DEPARTAMENTO} contains 'Alto Paran\\á'", [2]),
+    ('{DEPARTAMENTO} = `San Pedro`', [5]),
+    ('{codigo} = "5"', [0, 1]),
+    ('{codigo} = 0x5', [0, 1]),
+    ('{PARTICIPACION} < 1e1', [2, 3, 4, 5, 6, 7]),
+])
+def test_valores_entre_comillas_y_numericos(df, filter_query, esperado):
+    assert ids(df, filter_query) == esperado
+
+
+@pytest.mark.parametrize('filter_query, esperado', [
+    ('{Cantidad_Empresas} > 10 && {PARTICIPACION} < 20', [0, 2, 4, 7]),
+    ('{Cantidad_Empresas} > 10 and {DEPARTAMENTO} contains a && {codigo} != 5', [1, 2, 4, 7]),
+    ('{Cantidad_Empresas} < 6 || {DEPARTAMENTO} = Central', [1, 5, 6]),
+    # && antes que ||
+    ('{Cantidad_Empresas} < 6 || {Cantidad_Empresas} > 40 && {PARTICIPACION} > 20', [1, 5, 6]),
+    ('({Cantidad_Empresas} < 6 || {Cantidad_Empresas} > 40) && {PARTICIPACION} > 20', [1]),
+    ('!({Cantidad_Empresas} > 10)', [3, 5, 6]),
+])
+def test_operadores_logicos(df, filter_query, esperado):
+    assert ids(df, filter_query) == esperado
+
+
+@pytest.mark.parametrize('filter_query', [
+    '',
+    None,
+    'garbage',
+    '{DEPARTAMENTO}',
+    '{DEPARTAMENTO} contains',
+    '{Cantidad_Empresas} > 10 &&',
+    '({Cantidad_Empresas} > 10',
+    # Un valor sin comillas termina en el espacio: el resto no es válido
+    '{DEPARTAMENTO} contains San Pedro',
+    # El DataTable tampoco acepta espacios al final
+    '{Cantidad_Empresas} > 10 ',
+])
+def test_consulta_invalida_no_filtra(df, filter_query):
+    # Como en el navegador: una consulta que el DataTable no acepta no filtra
+    assert ids(df, filter_query) == TODAS
+
+
+@pytest.mark.parametrize('sort_by, esperado', [
+    # Las celdas vacías quedan al final en los dos sentidos
+    ([{'column_id': 'PARTICIPACION', 'direction': 'asc'}], [6, 3, 7, 5, 4, 0, 1, 2]),
+    ([{'column_id': 'PARTICIPACION', 'direction': 'desc'}], [1, 0, 4, 5, 7, 3, 6, 2]),
+    ([{'column_id': 'DEPARTAMENTO', 'direction': 'asc'}], [3, 2, 0, 1, 4, 7, 5, 6]),
+    # Los empates conservan el orden original
+    ([{'column_id': 'Cantidad_Empresas', 'direction': 'asc'}], [6, 5, 3, 7, 2, 4, 1, 0]),
+    ([{'column_id': 'Cantidad_Empresas', 'direction': 'desc'}], [0, 1, 2, 4, 7, 3, 5, 6]),
+    ([{'column_id': 'Cantidad_Empresas', 'direction': 'desc'}, {'column_id': 'DEPARTAMENTO', 'direction': 'desc'}],
+     [0, 1, 4, 2, 7, 3, 5, 6]),
+    ([{'column_id': 'no_existe', 'direction': 'asc'}], TODAS),
+    ([], TODAS),
+])
+def test_ordenar(df, sort_by, esperado):
+    assert ids(df, sort_by=sort_by) == esperado
+
+
+def test_pagina_como_el_datatable(df):
+    # Filas que muestra el DataTable (filtro y orden nativos) para la misma
+    # consulta: [1, 4, 7, 2], en páginas de 3
+    filter_query = '{Cantidad_Empresas} > 10 and {DEPARTAMENTO} contains a && {codigo} != 5'
+    sort_by = [{'column_id': 'PARTICIPACION', 'direction': 'desc'}]
+    registros, paginas = paginacion.pagina(df, 0, 3, sort_by, filter_query)
+    assert [r['id'] for r in registros] == [1, 4, 7]
+    assert paginas == 2
+    registros, paginas = paginacion.pagina(df, 1, 3, sort_by, filter_query)
+    assert [r['id'] for r in registros] == [2]
+    assert registros[0]['DEPARTAMENTO'] == 'Alto Paraná'
+
+
+def test_pagina_sin_filas(df):
+    registros, paginas = paginacion.pagina(df, 0, 3, None, '{Cantidad_Empresas} > 1000')
+    assert registros == []
+    assert paginas == 1
+
+
+def test_pagina_por_defecto(df):
+    registros, paginas = paginacion.pagina(df, None, None)
+    assert [r['id'] for r in registros] == TODAS
+    assert paginas == 1
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import indicadores
+from utils.treemap import _recortar, profundidades, rollup, rutas, subarbol, treemap_de_niveles
+
+NIVELES = ['DEPARTAMENTO', 'Seccion', 'Division']
+
+
+@pytest.fixture
+def hojas():
+    # Jerarquía con ramas de distinto tamaño: 8 departamentos, hasta 6
+    # secciones por departamento y hasta 5 divisiones por sección
+    rng = np.random.default_rng(12)
+    filas = []
+    for d in range(8):
+        for s in range(rng.integers(1, 7)):
+            for v in range(rng.integers(1, 6)):
+                filas.append({
+                    'DEPARTAMENTO': f'Dpto {d}', 'Seccion': f'Seccion {s}', 'Division': f'Div {s}{v}',
+                    'Cantidad_Empresas': int(rng.integers(1, 500)), 'PARTICIPACION': float(rng.random() * 3),
+                })
+    return pd.DataFrame(filas)
+
+
+def _rentabilidades(total):
+    # Como los treemaps 'c' de las páginas: cociente recalculado desde las sumas
+    def derivar(tabla):
+        tabla['porcentaje_empresas'] = indicadores.participacion(tabla['Cantidad_Empresas'], total)
+        tabla['rentabilidad_empresas'] = indicadores.rentabilidad(tabla['PARTICIPACION'], tabla['porcentaje_empresas'])
+        return tabla
+    return derivar
+
+
+def _hijos(arbol):
+    hijos = {}
+    for id_, padre in zip(arbol['ids'], arbol['parents']):
+        hijos.setdefault(padre, []).append(id_)
+    return hijos
+
+
+def test_niveles_sin_limite_como_groupby(hojas):
+    tablas = rollup(hojas, NIVELES, ['Cantidad_Empresas'])
+    arbol = treemap_de_niveles(tablas, NIVELES, 'Cantidad_Empresas', maximo=None)
+    caminos = rutas(tablas, NIVELES, 'Cantidad_Empresas', (), len(NIVELES), maximo=None)
+    assert len(arbol['ids']) == sum(hojas.groupby(NIVELES[:i + 1]).ngroups for i in range(len(NIVELES)))
+    for camino, valor, nivel in zip(caminos, arbol['values'], profundidades(arbol)):
+        assert len(camino) == nivel + 1
+        esperado = hojas[(hojas[NIVELES[:nivel + 1]] == camino).all(axis=1)]['Cantidad_Empresas'].sum()
+        assert valor == esperado
+
+
+@pytest.mark.parametrize('maximo', [15, 40, 100])
+def test_limite_de_nodos_con_todos_los_niveles(hojas, maximo):
+    tablas = rollup(hojas, NIVELES, ['Cantidad_Empresas'])
+    assert sum(map(len, tablas)) > maximo
+    arbol = treemap_de_niveles(tablas, NIVELES, 'Cantidad_Empresas', maximo=maximo)
+    assert len(arbol['ids']) <= maximo
+    assert max(profundidades(arbol)) == len(NIVELES) - 1
+
+
+def test_k_es_el_mayor_que_entra(hojas):
+    tablas = rollup(hojas, NIVELES, ['Cantidad_Empresas'])
+    arbol = treemap_de_niveles(tablas, NIVELES, 'Cantidad_Empresas', maximo=40)
+    caminos = rutas(tablas, NIVELES, 'Cantidad_Empresas', (), len(NIVELES), maximo=40)
+    # k: hijos conservados (no 'Otros') por padre
+    conservados = {}
+    for padre, camino in zip(arbol['parents'], caminos):
+        if camino is not None:
+            conservados[padre] = conservados.get(padre, 0) + 1
+    k = max(conservados.values())
+    assert sum(map(len, _recortar(tablas, NIVELES, 'Cantidad_Empresas', k + 1, None))) > 40
+
+
+def test_hijos_no_superan_al_padre(hojas):
+    tablas = rollup(hojas, NIVELES, ['Cantidad_Empresas'])
+    arbol = treemap_de_niveles(tablas, NIVELES, 'Cantidad_Empresas', maximo=40)
+    valores = dict(zip(arbol['ids'], arbol['values']))
+    for padre, hijos in _hijos(arbol).items():
+        if padre == '':
+            # La raíz conserva el total, con los 'Otros (n)'
+            assert sum(valores[h] for h in hijos) == hojas['Cantidad_Empresas'].sum()
+        else:
+            assert sum(valores[h] for h in hijos) <= valores[padre]
+
+
+@pytest.mark.parametrize('ruta', [(), ('Dpto 3',), ('Dpto 3', 'Seccion 0')])
+def test_rutas_none_en_otros(hojas, ruta):
+    tablas = rollup(hojas, NIVELES, ['Cantidad_Empresas'])
+    arbol = subarbol(tablas, NIVELES, 'Cantidad_Empresas', ruta, 2, maximo=10)
+    caminos = rutas(tablas, NIVELES, 'Cantidad_Empresas', ruta, 2, maximo=10)
+    assert len(caminos) == len(arbol['ids'])
+    for label, camino in zip(arbol['labels'], caminos):
+        if label.startswith('Otros ('):
+            assert camino is None
+        else:
+            assert camino[-1] == label
+            assert tuple(camino[:len(ruta)]) == ruta
+
+
+def test_otros_recalcula_cocientes(hojas):
+    total = hojas['Cantidad_Empresas'].sum() * 2
+    derivar = _rentabilidades(total)
+    medidas = ['Cantidad_Empresas', 'PARTICIPACION']
+    tablas = [derivar(tabla) for tabla in rollup(hojas, NIVELES, medidas)]
+    arbol = treemap_de_niveles(tablas, NIVELES, 'rentabilidad_empresas', maximo=40, derivar=derivar)
+    caminos = rutas(tablas, NIVELES, 'rentabilidad_empresas', (), len(NIVELES), maximo=40, derivar=derivar)
+    otros = [i for i, camino in enumerate(caminos) if camino is None]
+    assert otros
+    for i in otros:
+        padre = arbol['parents'][i]
+        prefijo = () if padre == '' else tuple(caminos[padre])
+        # Filas juntadas: los hijos del padre que no se muestran
+        mostrados = {tuple(c) for c, p in zip(caminos, arbol['parents']) if c is not None and p == padre}
+        nivel = len(prefijo)
+        hijos = hojas[(hojas[NIVELES[:nivel]] == prefijo).all(axis=1)] if prefijo else hojas
+        hijos = hijos.groupby(NIVELES[:nivel + 1])[medidas].sum()
+        juntados = hijos[[tuple(np.atleast_1d(c)) not in mostrados for c in hijos.index]]
+        assert arbol['labels'][i] == f'Otros ({len(juntados)})'
+        porcentaje = juntados['Cantidad_Empresas'].sum() / total * 100
+        esperado = juntados['PARTICIPACION'].sum() / porcentaje * 100
+        assert arbol['values'][i] == pytest.approx(esperado)
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+# Agregaciones sobre códigos enteros densos. Las dimensiones (departamentos,
+# distritos, secciones, divisiones, actividades) tienen pocas categorías, así
+# que cada combinación de claves se codifica como un único entero y las sumas,
+# máximos y conteos de distintos se calculan con np.bincount / reduceat en
+# lugar del groupby genérico de pandas. El resultado es el mismo que el de
+# df.groupby(claves, observed=True, sort=True).agg(...).reset_index().
+
+FUNCIONES = {'sum', 'max', 'nunique'}
+
+# Hasta esta cantidad de combinaciones posibles se usa una tabla densa; por
+# encima se numeran solo las combinaciones presentes (np.unique)
+LIMITE_DENSO = 1 << 22
+
+
+def _codigos(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy().astype(np.int64), serie.cat.categories, True
+    codigos, categorias = pd.factorize(serie, sort=True)
+    return codigos.astype(np.int64), categorias, False
+
+
+def _grupos(codigos, tamanos):
+    combinado = np.zeros(len(codigos[0]), dtype=np.int64)
+    for codigo, tamano in zip(codigos, tamanos):
+        combinado = combinado * tamano + codigo
+    total = int(np.prod(tamanos, dtype=np.float64))
+    if total <= LIMITE_DENSO:
+        presentes = np.flatnonzero(np.bincount(combinado, minlength=total))
+        numero = np.full(total, -1, dtype=np.int64)
+        numero[presentes] = np.arange(len(presentes))
+        return presentes, numero[combinado]
+    return np.unique(combinado, return_inverse=True)
+
+
+def _suma(valores, grupos, k):
+    if valores.dtype.kind == 'f':
+        resultado = np.bincount(grupos, weights=np.where(np.isnan(valores), 0, valores), minlength=k)
+        return resultado.astype(valores.dtype)
+    if valores.dtype.kind in 'iub':
+        # Exacta en int64: los pesos de bincount pasan por float64 y pierden
+        # precisión por encima de 2**53
+        resultado = np.zeros(k, dtype=np.int64)
+        np.add.at(resultado, grupos, valores.astype(np.int64))
+        return resultado
+    raise TypeError(f'No se puede sumar una columna {valores.dtype}')
+
+
+def _maximo(valores, grupos):
+    if len(grupos) == 0:
+        # reduceat no acepta índices vacíos
+        return np.empty(0, dtype=valores.dtype)
+    orden = np.argsort(grupos, kind='stable')
+    ordenados = grupos[orden]
+    inicios = np.flatnonzero(np.r_[True, ordenados[1:] != ordenados[:-1]])
+    if valores.dtype.kind == 'f':
+        return np.fmax.reduceat(valores[orden], inicios)
+    return np.maximum.reduceat(valores[orden], inicios)
+
+
+def _distintos(serie, grupos, k):
+    codigos, categorias, _ = _codigos(serie)
+    validos = codigos >= 0
+    pares = np.unique(grupos[validos] * len(categorias) + codigos[validos])
+    return np.bincount(pares // len(categorias), minlength=k).astype(np.int64)
+
+
+def agrupar(df, claves, medidas):
+    """Agrupa `df` por `claves` con `medidas` ({nombre: (columna, función)}).
+
+    Las funciones soportadas son sum, max y nunique; con cualquier otra se
+    usa el groupby de pandas.
+    """
+    claves = list(claves)
+    if not claves or any(funcion not in FUNCIONES for _, funcion in medidas.values()):
+        return df.groupby(claves, observed=True).agg(**medidas).reset_index()
+    codigos, categorias, categoricas = zip(*(_codigos(df[col]) for col in claves))
+    # Como en groupby, las filas con alguna clave faltante no forman grupo
+    validas = np.logical_and.reduce([codigo >= 0 for codigo in codigos])
+    codigos = [codigo[validas] for codigo in codigos]
+    presentes, grupos = _grupos(codigos, [len(c) for c in categorias])
+    k = len(presentes)
+
+    columnas = {}
+    resto = presentes
+    for col, cats, categorica in reversed(list(zip(claves, categorias, categoricas))):
+        resto, codigo = np.divmod(resto, len(cats))
+        columnas[col] = pd.Categorical.from_codes(codigo, categories=cats) if categorica else cats.take(codigo)
+    resultado = pd.DataFrame({col: columnas[col] for col in claves})
+    for nombre, (col, funcion) in medidas.items():
+        if funcion == 'nunique':
+            resultado[nombre] = _distintos(df[col][validas], grupos, k)
+            continue
+        valores = df[col].to_numpy()[validas]
+        if funcion == 'sum':
+            resultado[nombre] = _suma(valores, grupos, k)
+        else:
+            resultado[nombre] = _maximo(valores, grupos)
+    return resultado
@@ -0,0 +1,240 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # sin pyarrow se lee siempre el CSV
+    pa = None
+
+# Capa de datos compartida por todas las páginas: cada CSV se lee una sola vez
+# por proceso y las páginas reciben vistas de solo lectura del mismo DataFrame.
+# Junto a cada CSV se guarda una copia tipada en formato Arrow IPC (sin
+# compresión) que se reutiliza mientras el CSV de origen no cambie. Ese archivo
+# se abre con memory-map: las columnas del DataFrame apuntan directamente a las
+# páginas del archivo, así que todos los workers de gunicorn de un mismo nodo
+# comparten la misma memoria física en lugar de tener copias privadas.
+# Las filas se guardan ordenadas por la jerarquía territorial y de actividad,
+# así una selección es un conjunto de tramos contiguos del archivo.
+
+ARCHIVOS = {
+    'empresas': 'empresas.csv',
+    'actividades': 'actividades.csv',
+}
+
+# Columnas de texto que se repiten en cada fila -> categóricas
+DIMENSIONES = ['PAIS', 'DPTO_DESC', 'DEPARTAMENTO', 'DISTRITO', 'Seccion', 'Division', 'Actividad_principal']
+
+# Medidas monetarias: se escalan (x10) y se suman, se dejan en 64 bits
+MONETARIAS = ['Ganancias', 'Aporte']
+
+# Orden de las filas: de lo general a lo particular, así cada departamento
+# (y cada distrito dentro de él) ocupa un tramo contiguo del dataset
+JERARQUIA = ['PAIS', 'DEPARTAMENTO', 'DISTRITO', 'Seccion', 'Division', 'Actividad_principal']
+
+# Clave de los metadatos del snapshot donde se guarda la huella del CSV
+CLAVE_ORIGEN = b'almacen.origen'
+
+# Versión del formato del snapshot: si cambia, los snapshots anteriores se regeneran
+FORMATO = 2
+
+_tablas = {}
+_versiones = {}
+_indices = {}
+
+
+def _optimizar(df):
+    for col in df.columns:
+        if col in DIMENSIONES:
+            df[col] = df[col].astype('category')
+        elif col in MONETARIAS:
+            continue
+        elif pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        elif pd.api.types.is_float_dtype(df[col]):
+            # Solo se baja a float32 si no se pierde precisión
+            reducida = df[col].astype('float32')
+            if np.array_equal(reducida.to_numpy(dtype='float64'), df[col].to_numpy(), equal_nan=True):
+                df[col] = reducida
+    return df
+
+
+def _solo_lectura(df):
+    # Marca los arrays numéricos como no escribibles: las vistas pueden agregar
+    # o reemplazar columnas, pero no modificar los datos compartidos
+    for arr in df._mgr.arrays:
+        if isinstance(arr, np.ndarray):
+            arr.flags.writeable = False
+    return df
+
+
+def ruta_snapshot(nombre):
+    return os.path.splitext(ARCHIVOS[nombre])[0] + '.arrow'
+
+
+def _hash(ruta):
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _huella(ruta, con_hash=True):
+    st = os.stat(ruta)
+    huella = {'tamano': st.st_size, 'mtime_ns': st.st_mtime_ns}
+    if con_hash:
+        huella['sha256'] = _hash(ruta)
+    return huella
+
+
+def _snapshot_vigente(nombre):
+    # El snapshot vale si el CSV tiene el mismo tamaño y mtime que al generarlo;
+    # si el mtime cambió (por ejemplo, tras un deploy) se compara el hash
+    ruta = ruta_snapshot(nombre)
+    if pa is None or not os.path.exists(ruta):
+        return False
+    try:
+        with pa.memory_map(ruta) as fuente:
+            metadatos = pa.ipc.open_file(fuente).schema.metadata or {}
+        guardada = json.loads(metadatos[CLAVE_ORIGEN])
+    except (KeyError, ValueError, OSError, pa.ArrowException):
+        return False
+    if guardada.get('formato') != FORMATO:
+        return False
+    actual = _huella(ARCHIVOS[nombre], con_hash=False)
+    if actual['tamano'] != guardada['tamano']:
+        return False
+    if actual['mtime_ns'] == guardada['mtime_ns']:
+        return True
+    return _hash(ARCHIVOS[nombre]) == guardada['sha256']
+
+
+def _escribir_snapshot(nombre, df):
+    if pa is None:
+        return
+    ruta = ruta_snapshot(nombre)
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    metadatos = dict(tabla.schema.metadata or {})
+    metadatos[CLAVE_ORIGEN] = json.dumps(dict(_huella(ARCHIVOS[nombre]), formato=FORMATO)).encode()
+    tabla = tabla.replace_schema_metadata(metadatos)
+    # Escritura atómica: varios workers pueden reconstruir el snapshot a la vez
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    try:
+        with pa.OSFile(temporal, 'wb') as destino:
+            with pa.ipc.new_file(destino, tabla.schema) as escritor:
+                escritor.write_table(tabla)
+        # Los workers que ya mapearon el archivo anterior siguen leyendo su
+        # versión: os.replace no invalida los mapeos existentes
+        os.replace(temporal, ruta)
+    except OSError:
+        # Sistema de archivos de solo lectura: se sigue trabajando con el CSV
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def _ordenar(df):
+    orden = [col for col in JERARQUIA if col in df.columns]
+    return df.sort_values(orden, kind='stable', ignore_index=True)
+
+
+def _leer_csv(nombre):
+    df = pd.read_csv(ARCHIVOS[nombre], encoding='utf-8')
+    return _ordenar(_optimizar(df))
+
+
+def _mapear(nombre):
+    # Lectura sin copia: con split_blocks cada columna queda en su propio bloque
+    # y pandas usa los buffers del archivo mapeado (también los códigos de las
+    # categóricas) en lugar de consolidarlos en arrays nuevos
+    fuente = pa.memory_map(ruta_snapshot(nombre), 'r')
+    tabla = pa.ipc.open_file(fuente).read_all()
+    _versiones[nombre] = json.loads(tabla.schema.metadata[CLAVE_ORIGEN])['sha256']
+    return tabla.to_pandas(split_blocks=True)
+
+
+def _cargar(nombre):
+    if not _snapshot_vigente(nombre):
+        df = _leer_csv(nombre)
+        _escribir_snapshot(nombre, df)
+        if not _snapshot_vigente(nombre):
+            _versiones[nombre] = _hash(ARCHIVOS[nombre])
+            return _solo_lectura(df)
+    return _solo_lectura(_mapear(nombre))
+
+
+def obtener(nombre):
+    """Devuelve una vista de solo lectura del dataset `nombre` ('empresas' o 'actividades')."""
+    if nombre not in _tablas:
+        _tablas[nombre] = _cargar(nombre)
+    return _tablas[nombre].copy(deep=False)
+
+
+def version(nombre):
+    """Huella (sha256) del CSV con el que se cargó el dataset `nombre`."""
+    obtener(nombre)
+    return _versiones[nombre]
+
+
+def _indice(nombre, columna):
+    # Tramos [inicio, fin) de filas consecutivas con el mismo valor de `columna`.
+    # Con el dataset ordenado por JERARQUIA, cada departamento es un único
+    # tramo; las columnas más particulares quedan en varios tramos cortos
+    clave = (nombre, columna)
+    if clave not in _indices:
+        serie = _tablas[nombre][columna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos, valores = serie.cat.codes.to_numpy(), serie.cat.categories
+        else:
+            codigos, valores = pd.factorize(serie)
+        inicios = np.flatnonzero(np.r_[True, codigos[1:] != codigos[:-1]])
+        fines = np.r_[inicios[1:], len(codigos)]
+        indice = {}
+        for codigo, inicio, fin in zip(codigos[inicios], inicios, fines):
+            if codigo >= 0:
+                indice.setdefault(valores[codigo], []).append((int(inicio), int(fin)))
+        _indices[clave] = indice
+    return _indices[clave]
+
+
+def seleccionar(nombre, columna, valores, vista=None):
+    """Filas del dataset `nombre` cuya `columna` está en `valores`, en el orden original.
+
+    Las filas se toman por tramos contiguos (sin recorrer la tabla entera) de
+    `vista`, si se indica, o del dataset compartido; `vista` tiene que tener
+    las mismas filas que el dataset, por ejemplo una copia con columnas extra.
+    """
+    if vista is None:
+        vista = obtener(nombre)
+    else:
+        obtener(nombre)
+    indice = _indice(nombre, columna)
+    tramos = []
+    for inicio, fin in sorted(t for valor in set(valores) for t in indice.get(valor, [])):
+        if tramos and tramos[-1][1] == inicio:
+            tramos[-1] = (tramos[-1][0], fin)
+        else:
+            tramos.append((inicio, fin))
+    if len(tramos) == 1:
+        inicio, fin = tramos[0]
+        return vista.iloc[inicio:fin]
+    if not tramos:
+        return vista.iloc[0:0]
+    return pd.concat([vista.iloc[inicio:fin] for inicio, fin in tramos])
+
+
+def preprocesar():
+    """Regenera los snapshots Arrow de todos los CSV que hayan cambiado."""
+    for nombre in ARCHIVOS:
+        if _snapshot_vigente(nombre):
+            print(f'{ruta_snapshot(nombre)}: vigente')
+            continue
+        _escribir_snapshot(nombre, _leer_csv(nombre))
+        print(f'{ruta_snapshot(nombre)}: regenerado')
+
+
+if __name__ == '__main__':
+    preprocesar()
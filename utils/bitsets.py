@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from utils import almacen
+
+# Índices de conjuntos empaquetados en bits para los conteos de distintos:
+# para cada miembro de una dimensión (un departamento, una sección) se guarda
+# el conjunto de valores de otra dimensión (actividades, distritos) como una
+# fila de bits. Los distintos de una selección son el OR de sus filas y los
+# valores compartidos por todos, el AND; en ambos casos se cuentan los bits
+# encendidos, sin volver a recorrer el dataset.
+
+# Cantidad de bits encendidos de cada byte
+_BITS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+_indices = {}
+
+
+def _codigos(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), serie.cat.categories
+    return pd.factorize(serie, sort=True)
+
+
+def _indice(nombre, fila, columna):
+    clave = (nombre, fila, columna)
+    if clave not in _indices:
+        df = almacen.obtener(nombre)
+        filas, miembros = _codigos(df[fila])
+        columnas, valores = _codigos(df[columna])
+        validas = (filas >= 0) & (columnas >= 0)
+        presentes = np.zeros((len(miembros), len(valores)), dtype=bool)
+        presentes[filas[validas], columnas[validas]] = True
+        _indices[clave] = (pd.Index(miembros), pd.Index(valores), np.packbits(presentes, axis=1))
+    return _indices[clave]
+
+
+def _filas(nombre, fila, columna, seleccion):
+    miembros, valores, bits = _indice(nombre, fila, columna)
+    posiciones = miembros.get_indexer(list(seleccion))
+    return valores, bits[posiciones[posiciones >= 0]]
+
+
+def precalcular(nombre, fila, columna):
+    """Arma el índice `fila` -> conjunto de valores de `columna` del dataset `nombre`."""
+    _indice(nombre, fila, columna)
+
+
+def conteos(nombre, fila, columna):
+    """Cantidad de valores distintos de `columna` para cada miembro de `fila`."""
+    miembros, _, bits = _indice(nombre, fila, columna)
+    return pd.Series(_BITS[bits].sum(axis=1, dtype=np.int64), index=miembros)
+
+
+def distintos(nombre, fila, columna, seleccion):
+    """Cantidad de valores de `columna` presentes en alguno de los miembros `seleccion` de `fila`."""
+    _, bits = _filas(nombre, fila, columna, seleccion)
+    if not len(bits):
+        return 0
+    return int(_BITS[np.bitwise_or.reduce(bits, axis=0)].sum())
+
+
+def compartidos(nombre, fila, columna, seleccion):
+    """Valores de `columna` presentes en todos los miembros `seleccion` de `fila`."""
+    valores, bits = _filas(nombre, fila, columna, seleccion)
+    if not len(bits):
+        return valores[:0].tolist()
+    comunes = np.unpackbits(np.bitwise_and.reduce(bits, axis=0), count=len(valores)).astype(bool)
+    return valores[comunes].tolist()
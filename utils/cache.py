@@ -0,0 +1,206 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import abort, current_app, jsonify
+from flask_caching import Cache
+from flask_caching.backends.base import BaseCache
+
+from utils import almacen, serializacion
+
+# Cache de los callbacks que dependen de la selección del usuario. Se usa
+# Flask-Caching sobre app.server, así el backend se elige por configuración:
+#   CACHE_TYPE=utils.cache.LRUCache    en memoria del proceso, LRU (por defecto)
+#   CACHE_TYPE=SimpleCache             en memoria del proceso
+#   CACHE_TYPE=FileSystemCache         en CACHE_DIR, compartida por los workers
+#   CACHE_TYPE=RedisCache              en CACHE_REDIS_URL (requiere el paquete redis)
+# CACHE_DEFAULT_TIMEOUT es el TTL en segundos y CACHE_THRESHOLD la cantidad
+# máxima de entradas antes de empezar a descartar.
+
+_cache = Cache()
+
+logger = logging.getLogger(__name__)
+
+# Backends en memoria del proceso: lo que se precalienta ahí lo ven solo ese
+# proceso y los que se crean después con fork (gunicorn --preload)
+_LOCALES = {'utils.cache.LRUCache', 'SimpleCache', 'simple', 'NullCache', 'null'}
+
+# Aciertos y fallos por callback (contadores del proceso)
+estadisticas = {}
+_candado_estadisticas = threading.Lock()
+
+# Funciones de cada página que calculan sus vistas más frecuentes
+_precalentamientos = []
+
+
+class LRUCache(BaseCache):
+    """Cache en memoria con TTL que descarta primero la entrada usada hace más tiempo."""
+
+    def __init__(self, threshold=500, default_timeout=300):
+        super().__init__(default_timeout)
+        self._umbral = threshold
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        kwargs.update(threshold=config['CACHE_THRESHOLD'])
+        return cls(*args, **kwargs)
+
+    def _vence(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return time.time() + timeout if timeout > 0 else None
+
+    def get(self, key):
+        with self._candado:
+            entrada = self._entradas.get(key)
+            if entrada is None:
+                return None
+            vence, valor = entrada
+            if vence is not None and vence <= time.time():
+                del self._entradas[key]
+                return None
+            self._entradas.move_to_end(key)
+            return valor
+
+    def set(self, key, value, timeout=None):
+        with self._candado:
+            self._entradas[key] = (self._vence(timeout), value)
+            self._entradas.move_to_end(key)
+            while len(self._entradas) > self._umbral:
+                self._entradas.popitem(last=False)
+        return True
+
+    def add(self, key, value, timeout=None):
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout)
+
+    def delete(self, key):
+        with self._candado:
+            return self._entradas.pop(key, None) is not None
+
+    def has(self, key):
+        return self.get(key) is not None
+
+    def clear(self):
+        with self._candado:
+            self._entradas.clear()
+        return True
+
+
+def configuracion():
+    """Configuración de Flask-Caching tomada de las variables de entorno."""
+    return {
+        'CACHE_TYPE': os.environ.get('CACHE_TYPE', 'utils.cache.LRUCache'),
+        'CACHE_DEFAULT_TIMEOUT': int(os.environ.get('CACHE_DEFAULT_TIMEOUT', 3600)),
+        'CACHE_THRESHOLD': int(os.environ.get('CACHE_THRESHOLD', 500)),
+        'CACHE_DIR': os.environ.get('CACHE_DIR', 'cache'),
+        'CACHE_REDIS_URL': os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'),
+        'CACHE_KEY_PREFIX': 'callbacks_',
+    }
+
+
+def compartida():
+    """True si el backend configurado se comparte entre procesos (FileSystemCache, Redis)."""
+    return configuracion()['CACHE_TYPE'] not in _LOCALES
+
+
+def iniciar(server):
+    """Conecta la cache al servidor Flask de la app."""
+    _cache.init_app(server, config=configuracion())
+    server.add_url_rule('/cache/estadisticas', 'cache_estadisticas', _estadisticas)
+
+
+def _estadisticas():
+    # Solo con el servidor en modo debug: expone nombres internos de funciones
+    if not current_app.debug:
+        abort(404)
+    with _candado_estadisticas:
+        return jsonify({nombre: dict(contador) for nombre, contador in estadisticas.items()})
+
+
+def _contar(contador, campo):
+    with _candado_estadisticas:
+        contador[campo] += 1
+
+
+def _retitular(valor, cambios):
+    # Títulos de las figuras de `valor` (ya decodificado) con cada texto
+    # canónico reemplazado por el original
+    if isinstance(valor, list):
+        for elemento in valor:
+            _retitular(elemento, cambios)
+    elif isinstance(valor, dict):
+        if 'data' in valor and isinstance(valor.get('layout'), dict):
+            titulo = valor['layout'].get('title')
+            if isinstance(titulo, dict) and isinstance(titulo.get('text'), str):
+                for canonico, original in cambios:
+                    titulo['text'] = titulo['text'].replace(canonico, original)
+        else:
+            for elemento in valor.values():
+                _retitular(elemento, cambios)
+
+
+def memorizar(nombre, normalizar):
+    """Guarda en la cache el resultado del callback por argumentos y versión del dataset `nombre`.
+
+    `normalizar` recibe los argumentos del callback y devuelve los argumentos
+    canónicos, que son los que se usan para la clave y para calcular. Si
+    reordena una lista (la selección), los títulos de las figuras se
+    devuelven con la lista en el orden en que llegó.
+    """
+    def decorador(funcion):
+        with _candado_estadisticas:
+            contador = estadisticas.setdefault(f'{funcion.__module__}.{funcion.__qualname__}',
+                                               {'aciertos': 0, 'fallos': 0})
+
+        @functools.wraps(funcion)
+        def envoltura(*args):
+            canonicos = normalizar(*args)
+            firma = json.dumps([funcion.__module__, funcion.__qualname__, canonicos, almacen.version(nombre)])
+            clave = hashlib.sha256(firma.encode()).hexdigest()
+            texto = _cache.get(clave)
+            if texto is None:
+                _contar(contador, 'fallos')
+                texto = serializacion.codificar(funcion(*canonicos))
+                _cache.set(clave, texto)
+            else:
+                _contar(contador, 'aciertos')
+            resultado = serializacion.decodificar(texto)
+            cambios = [(str(canonico), str(original)) for original, canonico in zip(args, canonicos)
+                       if isinstance(original, list) and original != canonico]
+            if cambios:
+                _retitular(resultado, cambios)
+            return resultado
+        return envoltura
+    return decorador
+
+
+def seleccion(radio, seleccionados, metrica):
+    """Clave normalizada de los update_dashboard: la selección ordenada."""
+    return radio, sorted(seleccionados) if seleccionados is not None else None, metrica
+
+
+def seleccion_y_ruta(radio, seleccionados, metrica, ruta):
+    """Clave normalizada de las vistas de un nodo de un treemap: la selección ordenada y la ruta."""
+    return (*seleccion(radio, seleccionados, metrica), list(ruta))
+
+
+def precalentamiento(funcion):
+    """Registra `funcion` para que precalentar() la ejecute."""
+    _precalentamientos.append(funcion)
+    return funcion
+
+
+def precalentar():
+    """Calcula las vistas registradas por las páginas y las deja en la cache."""
+    for funcion in _precalentamientos:
+        inicio = time.perf_counter()
+        vistas = funcion()
+        logger.info('%s: %d vistas en %.1f s', funcion.__module__, vistas, time.perf_counter() - inicio)
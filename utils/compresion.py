@@ -0,0 +1,112 @@
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # sin brotli se ofrece solo gzip
+    brotli = None
+
+from flask import request
+
+from utils.cache import LRUCache
+
+# Compresión de las respuestas de app.server. Las respuestas de los callbacks
+# (figuras y tablas en JSON), el HTML y los bundles de JavaScript se comprimen
+# con brotli o gzip según el Accept-Encoding del navegador. Los recursos
+# estáticos (bundles con huella en la ruta o con ETag) se comprimen una vez y
+# se guardan por ruta y ETag; el resto se comprime en cada respuesta, sin
+# calcular huellas de contenido que no se va a repetir. La ETag de la
+# respuesta comprimida lleva la codificación, así cada variante tiene su
+# propio validador.
+
+# Por debajo de este tamaño (bytes) no vale la pena comprimir
+MINIMO = 500
+
+NIVEL_GZIP = 6
+NIVEL_BROTLI = 5
+
+TIPOS = {'application/json', 'text/html', 'text/css', 'text/plain', 'application/javascript',
+         'text/javascript', 'image/svg+xml'}
+
+# Recursos estáticos comprimidos, por codificación, ruta y ETag
+_comprimidos = LRUCache(threshold=int(os.environ.get('COMPRESION_UMBRAL', 256)), default_timeout=0)
+
+
+def _aceptadas(accept_encoding):
+    # Codificaciones aceptadas (q > 0) del encabezado Accept-Encoding
+    aceptadas = set()
+    for parte in accept_encoding.split(','):
+        nombre, _, parametros = parte.strip().partition(';')
+        try:
+            q = float(parametros.strip()[2:]) if parametros.strip().startswith('q=') else 1.0
+        except ValueError:
+            q = 1.0
+        if q > 0:
+            aceptadas.add(nombre.strip().lower())
+    return aceptadas
+
+
+def elegir(accept_encoding):
+    """Codificación a usar para un Accept-Encoding: 'br', 'gzip' o None."""
+    aceptadas = _aceptadas(accept_encoding or '')
+    if brotli is not None and ('br' in aceptadas or '*' in aceptadas):
+        return 'br'
+    if 'gzip' in aceptadas or '*' in aceptadas:
+        return 'gzip'
+    return None
+
+
+def _comprimir(cuerpo, codificacion):
+    if codificacion == 'br':
+        return brotli.compress(cuerpo, quality=NIVEL_BROTLI)
+    return gzip.compress(cuerpo, compresslevel=NIVEL_GZIP, mtime=0)
+
+
+def comprimir(cuerpo, codificacion, clave=None):
+    """`cuerpo` comprimido con `codificacion`; con `clave`, reutiliza el resultado ya calculado."""
+    if clave is None:
+        return _comprimir(cuerpo, codificacion)
+    clave = f'{codificacion}:{clave}'
+    comprimido = _comprimidos.get(clave)
+    if comprimido is None:
+        comprimido = _comprimir(cuerpo, codificacion)
+        _comprimidos.set(clave, comprimido)
+    return comprimido
+
+
+def _clave(respuesta):
+    # Solo los recursos estáticos se repiten: los bundles con huella en la
+    # ruta (cache de un año) o con ETag. Callbacks y HTML no se guardan
+    etag, _ = respuesta.get_etag()
+    if etag is not None:
+        return f'{request.path}:{etag}'
+    if (respuesta.cache_control.max_age or 0) > 0:
+        return request.path
+    return None
+
+
+def _responder(respuesta):
+    respuesta.vary.add('Accept-Encoding')
+    if (respuesta.direct_passthrough or respuesta.is_streamed or respuesta.status_code != 200
+            or 'Content-Encoding' in respuesta.headers or respuesta.mimetype not in TIPOS):
+        return respuesta
+    codificacion = elegir(request.headers.get('Accept-Encoding'))
+    if codificacion is None:
+        return respuesta
+    cuerpo = respuesta.get_data()
+    if len(cuerpo) < MINIMO:
+        return respuesta
+    respuesta.set_data(comprimir(cuerpo, codificacion, _clave(respuesta)))
+    respuesta.headers['Content-Encoding'] = codificacion
+    etag, debil = respuesta.get_etag()
+    if etag is not None:
+        # Cada codificación es otra representación: su propia ETag, y el 304
+        # se resuelve contra ella
+        respuesta.set_etag(f'{etag}-{codificacion}', weak=debil)
+        respuesta.make_conditional(request)
+    return respuesta
+
+
+def iniciar(server):
+    """Comprime las respuestas del servidor Flask de la app."""
+    server.after_request(_responder)
@@ -0,0 +1,82 @@
+from itertools import product
+
+from utils import agregacion, almacen, esquema
+
+# Cubo de agregados precalculado: las sumas, máximos y conteos de distintos de
+# cada combinación útil de niveles territoriales y de actividad se calculan
+# una vez al arrancar, así los callbacks consultan tablas pequeñas en lugar de
+# recorrer el dataset completo en cada interacción.
+
+TERRITORIO = [(), ('PAIS',), ('DEPARTAMENTO',), ('DISTRITO',), ('DEPARTAMENTO', 'DISTRITO'),
+              ('PAIS', 'DEPARTAMENTO'), ('PAIS', 'DEPARTAMENTO', 'DISTRITO')]
+ACTIVIDAD = [(), ('Seccion',), ('Division',), ('Actividad_principal',), ('Seccion', 'Division'),
+             ('Division', 'Actividad_principal'), ('Seccion', 'Division', 'Actividad_principal')]
+
+SUMAS = ['Cantidad_Empresas', 'PARTICIPACION', 'Ganancias', 'Aporte']
+MAXIMOS = ['Poblacion', 'Porcentaje_poblacion']
+# Conteos de valores distintos: columna de origen -> nombre de la medida
+DISTINTOS = {'Actividad_principal': 'Cantidad_Actividades', 'DISTRITO': 'Cantidad_Distritos'}
+
+_cubos = {}
+
+
+def _agrupar(nombre, claves):
+    df = almacen.obtener(nombre)
+    # En agrupaciones solo territoriales la población sale de la dimensión de
+    # territorios (suma de sus distritos); con niveles de actividad se sigue
+    # tomando el máximo de las filas, que es la del distrito
+    poblacion = esquema.poblacion(nombre, claves)
+    medidas = {}
+    for col in SUMAS:
+        if col in df.columns:
+            medidas[col] = (col, 'sum')
+    for col in MAXIMOS:
+        if col in df.columns and poblacion is None:
+            medidas[col] = (col, 'max')
+    for col, medida in DISTINTOS.items():
+        if col in df.columns and col not in claves:
+            medidas[medida] = (col, 'nunique')
+    tabla = agregacion.agrupar(df, claves, medidas)
+    if poblacion is not None:
+        tabla = tabla.merge(poblacion, on=list(claves), how='left')
+    return tabla
+
+
+def _celda(nombre, claves):
+    clave = (nombre, claves)
+    if clave not in _cubos:
+        # Mismo conjunto de columnas en otro orden: se reordena el agregado ya
+        # calculado en lugar de volver a recorrer el dataset
+        previo = next((v for (n, c), v in _cubos.items() if n == nombre and set(c) == set(claves)), None)
+        if previo is not None:
+            _cubos[clave] = previo.sort_values(list(claves), ignore_index=True)[list(claves) + list(previo.columns[len(claves):])]
+        else:
+            _cubos[clave] = _agrupar(nombre, claves)
+    return _cubos[clave]
+
+
+def precalcular(nombre):
+    """Calcula el cubo de `nombre` para todas las combinaciones de TERRITORIO x ACTIVIDAD."""
+    columnas = set(almacen.obtener(nombre).columns)
+    for territorio, actividad in product(TERRITORIO, ACTIVIDAD):
+        claves = territorio + actividad
+        if claves and set(claves) <= columnas:
+            _celda(nombre, claves)
+
+
+def agregado(nombre, claves, medidas, seleccion=None):
+    """Devuelve el agregado de `nombre` por `claves` con las columnas `medidas`.
+
+    `seleccion` ({columna: valores}) filtra las filas del agregado; las
+    columnas filtradas tienen que ser parte de `claves`.
+    """
+    if isinstance(claves, str):
+        claves = [claves]
+    tabla = _celda(nombre, tuple(claves))
+    if seleccion:
+        filas = True
+        for col, valores in seleccion.items():
+            filas = filas & tabla[col].isin(valores)
+        tabla = tabla.loc[filas].reset_index(drop=True)
+    # Copia propia: los callbacks agregan columnas al resultado
+    return tabla[list(claves) + list(medidas)].copy()
@@ -0,0 +1,108 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from utils import agregacion, almacen
+
+# Modelo en estrella de cada dataset. Los CSV repiten en cada fila los nombres
+# del territorio y de la actividad (CIIU) y, en empresas, la población del
+# distrito. Al cargar se separan en:
+#   - hechos: una fila por registro, con claves enteras (id_territorio,
+#     id_ciiu) y solo las medidas que se suman;
+#   - territorios: un distrito por fila, con su departamento, país y población;
+#   - ciiu: una actividad por fila, con su sección y división.
+# La población de una agrupación territorial es la suma de la de sus
+# distritos en la dimensión, sin el max por fila que hacía falta con la tabla
+# ancha. La excepción es agrupar por nombre de distrito, que sigue con max
+# (ver poblacion()). Las claves son la posición en la dimensión ordenada, así
+# que son estables mientras no cambie el catálogo de territorios o actividades.
+
+TERRITORIO = ['PAIS', 'DEPARTAMENTO', 'DPTO_DESC', 'DISTRITO']
+CIIU = ['Seccion', 'Division', 'Actividad_principal']
+
+# Atributos del distrito que el CSV repite en cada fila
+POBLACION = ['Poblacion', 'Porcentaje_poblacion']
+
+Esquema = namedtuple('Esquema', ['hechos', 'territorios', 'ciiu'])
+
+_esquemas = {}
+
+
+def _dimension(df, columnas, clave, atributos=()):
+    # Una fila por combinación de `columnas`, en el orden de sus categorías;
+    # los atributos se toman con max como hacía el cubo sobre la tabla ancha
+    columnas = [col for col in columnas if col in df.columns]
+    atributos = [col for col in atributos if col in df.columns]
+    medidas = {col: (col, 'max') for col in atributos}
+    dimension = agregacion.agrupar(df[columnas + atributos], columnas, medidas)
+    ids = pd.MultiIndex.from_frame(dimension[columnas]).get_indexer(pd.MultiIndex.from_frame(df[columnas]))
+    if (ids < 0).any():
+        # Filas con alguna columna faltante (agrupar no las junta en ningún
+        # grupo): van a un miembro nulo al final, sin valores ni atributos
+        ids[ids < 0] = len(dimension)
+        dimension = dimension.reindex(range(len(dimension) + 1))
+    dimension.insert(0, clave, np.arange(len(dimension)))
+    return dimension, pd.to_numeric(ids, downcast='integer')
+
+
+def construir(df):
+    """Separa la tabla ancha `df` en hechos, territorios y ciiu (ver Esquema)."""
+    territorios, id_territorio = _dimension(df, TERRITORIO, 'id_territorio', POBLACION)
+    ciiu, id_ciiu = _dimension(df, CIIU, 'id_ciiu')
+    medidas = [col for col in df.columns if col not in TERRITORIO + CIIU + POBLACION]
+    hechos = df[medidas].copy(deep=False)
+    hechos.insert(0, 'id_ciiu', id_ciiu)
+    hechos.insert(0, 'id_territorio', id_territorio)
+    return Esquema(hechos, territorios, ciiu)
+
+
+def obtener(nombre):
+    """Esquema en estrella del dataset `nombre`, compartido por todas las páginas."""
+    if nombre not in _esquemas:
+        _esquemas[nombre] = construir(almacen.obtener(nombre))
+    return _esquemas[nombre]
+
+
+def poblacion(nombre, claves):
+    """Población (y su porcentaje) por `claves` territoriales, desde la dimensión de territorios.
+
+    Devuelve None si el dataset no tiene población o si alguna clave no es territorial.
+    """
+    territorios = obtener(nombre).territorios
+    atributos = [col for col in POBLACION if col in territorios.columns]
+    if not atributos or not set(claves) <= set(territorios.columns) - set(atributos):
+        return None
+    if not claves:
+        return territorios[atributos].sum().to_frame().T
+    # Cada fila de la dimensión es un distrito (departamento y nombre). Hay
+    # nombres repetidos en departamentos distintos: agrupando por DISTRITO sin
+    # el departamento, un grupo junta distritos distintos y se toma la mayor
+    # población, como el max por fila de la tabla ancha
+    funcion = 'max' if 'DISTRITO' in claves and not {'DEPARTAMENTO', 'DPTO_DESC'} & set(claves) else 'sum'
+    return agregacion.agrupar(territorios, list(claves), {col: (col, funcion) for col in atributos})
+
+
+def desnormalizar(nombre, columnas=None):
+    """Vuelve a armar la tabla ancha (solo `columnas`, si se indican) uniendo hechos y dimensiones."""
+    hechos, territorios, ciiu = obtener(nombre)
+    partes = [
+        territorios.drop(columns='id_territorio').take(hechos['id_territorio']),
+        ciiu.drop(columns='id_ciiu').take(hechos['id_ciiu']),
+        hechos.drop(columns=['id_territorio', 'id_ciiu']),
+    ]
+    resultado = pd.concat([parte.reset_index(drop=True) for parte in partes], axis=1)
+    return resultado if columnas is None else resultado[list(columnas)]
+
+
+def _memoria(df):
+    return df.memory_usage(index=False, deep=True).sum()
+
+
+if __name__ == '__main__':
+    for nombre in almacen.ARCHIVOS:
+        ancha = pd.read_csv(almacen.ARCHIVOS[nombre], encoding='utf-8')
+        esquema = obtener(nombre)
+        estrella = sum(_memoria(tabla) for tabla in esquema)
+        print(f'{nombre}: {len(esquema.hechos)} hechos, {len(esquema.territorios)} territorios, '
+              f'{len(esquema.ciiu)} actividades; {_memoria(ancha) / 2**20:.1f} MiB -> {estrella / 2**20:.1f} MiB')
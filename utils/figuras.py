@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+import plotly.colors
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# Fábrica de las figuras de las páginas (treemaps, barras apiladas y el mapa
+# coroplético). En lugar de plotly express, que arma un DataFrame largo, agrupa
+# y recorre sus trazas en cada llamada, las trazas se arman directamente como
+# diccionarios con arrays de NumPy. No hay plantillas validadas una sola vez:
+# cada figura pasa por go.Figure, que valida todas sus propiedades como
+# siempre (las páginas después usan update_layout). Lo que se ahorra es el
+# costo de px y de las anotaciones de los totales, una por barra; las figuras
+# ya armadas quedan en la cache de callbacks. Las figuras se ven igual que las
+# de px.bar / px.choropleth_mapbox; las barras apiladas sin leyenda van en una
+# sola traza (ver barras()).
+
+
+def figura(trazas, layout=None):
+    """go.Figure con `trazas` (diccionarios con 'type') y `layout`."""
+    return go.Figure(data=trazas, layout=layout or {})
+
+
+def treemap(**propiedades):
+    """Figura con un único go.Treemap de `propiedades` (ids, labels, parents, values, ...)."""
+    return figura([dict(type='treemap', **propiedades)])
+
+
+def _colores(color_discrete_sequence):
+    if color_discrete_sequence:
+        return list(color_discrete_sequence)
+    return list(pio.templates[pio.templates.default].layout.colorway)
+
+
+def _barra(x, y, nombre, color, hovertemplate, showlegend):
+    traza = dict(
+        type='bar', hovertemplate=hovertemplate, legendgroup=nombre, name=nombre,
+        marker=dict(color=color, pattern=dict(shape='')), orientation='v',
+        showlegend=showlegend, textposition='auto', xaxis='x', yaxis='y',
+    )
+    if x is not None:
+        traza.update(x=x, y=y)
+    return traza
+
+
+def totales(x, y, separador=','):
+    """Traza con el total sobre cada barra, girado 90° (una sola traza, no una anotación por barra).
+
+    `separador` es el separador de miles del texto.
+    """
+    # Barras de alto 0 apiladas al final: quedan sobre la barra más alta de
+    # cada x y su texto 'outside' admite textangle (el texto de un scatter no)
+    y = np.asarray(y)
+    return dict(
+        type='bar', x=np.asarray(x, dtype=object), y=np.zeros(len(y)),
+        text=[f'{int(valor):,}'.replace(',', separador) for valor in y], textposition='outside',
+        textangle=90, constraintext='none', textfont=dict(color='black', size=12),
+        hoverinfo='skip', showlegend=False, cliponaxis=False, xaxis='x', yaxis='y',
+    )
+
+
+def _apiladas(df, x, y, color, colores):
+    # Una sola traza con todos los segmentos: plotly.js apila las barras de la
+    # misma traza que caen en la misma x, en el orden de los puntos. El color de
+    # cada segmento es el código de su categoría sobre una escala escalonada
+    # (un array de enteros en lugar de una traza con sus x por categoría).
+    codigos, categorias = pd.factorize(df[color], sort=False)
+    # Las filas sin categoría (código -1) quedan fuera, como en el groupby de px
+    orden = np.argsort(codigos, kind='stable')
+    orden = orden[codigos[orden] >= 0]
+    codigos = codigos[orden]
+    n = len(categorias)
+    colores = [colores[i % len(colores)] for i in range(n)]
+    escala = [par for i, c in enumerate(colores) for par in ((i / n, c), ((i + 1) / n, c))]
+    return [dict(
+        type='bar', x=df[x].to_numpy(dtype=object)[orden], y=df[y].to_numpy()[orden],
+        customdata=categorias.astype(str).to_numpy(dtype=object)[codigos],
+        marker=dict(color=codigos.astype('int32'), colorscale=escala, cmin=-0.5, cmax=n - 0.5),
+        hovertemplate=f'{color}=%{{customdata}}<br>{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>',
+        name='', orientation='v', showlegend=False, xaxis='x', yaxis='y',
+    )]
+
+
+def barras(df=None, x=None, y=None, color=None, title=None, color_discrete_sequence=None, total=None,
+           separador=',', leyenda=True):
+    """Barras como las de px.bar(df, x, y, color, title, color_discrete_sequence).
+
+    Con `color` los segmentos se apilan en orden de aparición de cada valor,
+    con una traza por valor y su entrada en la leyenda (un click la oculta),
+    igual que px.bar: una leyenda de trazas vacías no ocultaría nada. Solo con
+    `leyenda=False`, para las figuras que no muestran leyenda, todos los
+    segmentos van en una sola traza. `total` (DataFrame con las columnas `x`
+    e `y`) agrega los totales de cada barra como texto, con `separador` de
+    miles.
+    """
+    colores = _colores(color_discrete_sequence)
+    layout = dict(
+        xaxis=dict(anchor='y', domain=[0.0, 1.0]),
+        yaxis=dict(anchor='x', domain=[0.0, 1.0]),
+        legend=dict(tracegroupgap=0),
+        barmode='relative',
+    )
+    if title is not None:
+        layout['title'] = dict(text=title)
+    if df is None:
+        trazas = [_barra(None, None, '', colores[0], '<extra></extra>', False)]
+    else:
+        layout['xaxis']['title'] = dict(text=x)
+        layout['yaxis']['title'] = dict(text=y)
+        if color is None:
+            trazas = [_barra(df[x].to_numpy(dtype=object), df[y].to_numpy(), '', colores[0],
+                             f'{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>', False)]
+        else:
+            layout['legend']['title'] = dict(text=color)
+            if leyenda:
+                trazas = [
+                    _barra(grupo[x].to_numpy(dtype=object), grupo[y].to_numpy(), str(valor), colores[i % len(colores)],
+                           f'{color}={valor}<br>{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>', True)
+                    for i, (valor, grupo) in enumerate(df.groupby(color, sort=False, observed=True))
+                ]
+            else:
+                trazas = _apiladas(df, x, y, color, colores)
+    if total is not None:
+        trazas.append(totales(total[x], total[y], separador))
+    return figura(trazas, layout)
+
+
+def coropletico(df, geojson, locations, featureidkey, color, color_continuous_scale, center, zoom,
+                opacity, mapbox_style):
+    """Mapa coroplético como el de px.choropleth_mapbox con los mismos argumentos."""
+    escala = plotly.colors.make_colorscale(getattr(plotly.colors.sequential, color_continuous_scale))
+    traza = dict(
+        type='choroplethmapbox', coloraxis='coloraxis', featureidkey=featureidkey, geojson=geojson,
+        hovertemplate=f'{locations}=%{{location}}<br>{color}=%{{z}}<extra></extra>',
+        locations=df[locations].to_numpy(dtype=object), marker=dict(opacity=opacity), name='',
+        subplot='mapbox', z=df[color].to_numpy(),
+    )
+    layout = dict(
+        mapbox=dict(domain=dict(x=[0.0, 1.0], y=[0.0, 1.0]), center=center, zoom=zoom, style=mapbox_style),
+        coloraxis=dict(colorbar=dict(title=dict(text=color)), colorscale=escala),
+        legend=dict(tracegroupgap=0),
+        margin=dict(t=60),
+    )
+    return figura([traza], layout)
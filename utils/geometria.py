@@ -0,0 +1,225 @@
+import hashlib
+import json
+import math
+import os
+from collections import defaultdict
+
+import numpy as np
+
+# Geometría simplificada del mapa de departamentos. El GeoJSON del censo tiene
+# mucho más detalle del que se ve en el mapa, y va entero dentro de cada figura.
+# Se generan versiones simplificadas con Douglas-Peucker a varias tolerancias
+# (en grados), con las coordenadas cuantizadas a la grilla de esa tolerancia y
+# guardadas sin espacios; el mapa usa la versión que corresponde a su zoom.
+# Como en TopoJSON, los anillos se cortan en arcos en los puntos donde empieza
+# o termina un borde compartido, y cada arco se simplifica una sola vez: dos
+# departamentos vecinos reciben el mismo borde, sin huecos ni superposiciones.
+# Cada versión guarda la huella del GeoJSON original y se regenera si cambia.
+
+ORIGEN = 'assets/DEPARTAMENTOS_PY_CNPV2022.geojson'
+CARPETA = 'geometrias'
+
+# Tolerancias disponibles, de la más gruesa a la más fina
+TOLERANCIAS = [0.02, 0.005, 0.001, 0.0002]
+
+# Forma parte de la huella: las versiones hechas con otro método se regeneran
+METODO = 'arcos'
+
+_geometrias = {}
+_huella = []
+
+
+def _douglas_peucker(puntos, tolerancia):
+    n = len(puntos)
+    conservar = np.zeros(n, dtype=bool)
+    conservar[[0, -1]] = True
+    pendientes = [(0, n - 1)]
+    while pendientes:
+        i, j = pendientes.pop()
+        if j <= i + 1:
+            continue
+        a, b = puntos[i], puntos[j]
+        tramo = puntos[i + 1:j] - a
+        segmento = b - a
+        largo = segmento @ segmento
+        if largo == 0:
+            # Anillo cerrado: el primer y el último punto coinciden
+            distancias = np.hypot(tramo[:, 0], tramo[:, 1])
+        else:
+            t = np.clip(tramo @ segmento / largo, 0, 1)
+            distancias = np.hypot(*(tramo - np.outer(t, segmento)).T)
+        k = int(np.argmax(distancias))
+        if distancias[k] > tolerancia:
+            conservar[i + 1 + k] = True
+            pendientes.extend([(i, i + 1 + k), (i + 1 + k, j)])
+    return puntos[conservar]
+
+
+def _decimales(tolerancia):
+    # Grilla de cuantización diez veces más fina que la tolerancia
+    return max(0, math.ceil(-math.log10(tolerancia / 10)))
+
+
+def _poligonos(geometria):
+    if geometria['type'] == 'Polygon':
+        return [geometria['coordinates']]
+    if geometria['type'] == 'MultiPolygon':
+        return geometria['coordinates']
+    return []
+
+
+def _uniones(anillos):
+    # Índices de cada anillo (abierto) donde cambia el conjunto de anillos que
+    # pasan por el punto: ahí empieza o termina un borde compartido
+    anillos_de = defaultdict(set)
+    for i, anillo in enumerate(anillos):
+        for punto in map(tuple, anillo):
+            anillos_de[punto].add(i)
+    uniones = []
+    for anillo in anillos:
+        conjuntos = [frozenset(anillos_de[punto]) for punto in map(tuple, anillo)]
+        n = len(conjuntos)
+        union = np.flatnonzero([len(c) > 2 or c != conjuntos[k - 1] or c != conjuntos[(k + 1) % n]
+                                for k, c in enumerate(conjuntos)])
+        if len(union) == 0:
+            # Sin cortes (anillo suelto, o compartido entero con un enclave):
+            # empieza en su menor punto, el mismo para los dos lados
+            union = np.array([np.lexsort(anillo.T[::-1])[0]])
+        uniones.append(union)
+    return uniones
+
+
+def _simplificar_arco(arco, tolerancia, arcos):
+    # Cada arco se simplifica en un sentido canónico y se guarda, así el
+    # vecino que lo recorre al revés recibe exactamente los mismos puntos
+    directo, inverso = arco.tobytes(), arco[::-1].tobytes()
+    clave = min(directo, inverso)
+    if clave not in arcos:
+        arcos[clave] = _douglas_peucker(arco if clave == directo else arco[::-1], tolerancia)
+    simplificado = arcos[clave]
+    return simplificado if clave == directo else simplificado[::-1]
+
+
+def _simplificar_anillo(anillo, union, tolerancia, arcos):
+    # `anillo` abierto (sin repetir el primer punto); se recorre desde la
+    # primera unión y se arma con los arcos simplificados entre uniones
+    puntos = np.roll(anillo, -union[0], axis=0)
+    cortes = list(union - union[0]) + [len(puntos)]
+    cerrado = np.vstack([puntos, puntos[:1]])
+    partes = [_simplificar_arco(cerrado[i:j + 1], tolerancia, arcos) for i, j in zip(cortes, cortes[1:])]
+    simplificado = np.vstack([partes[0]] + [parte[1:] for parte in partes[1:]])
+    if len(simplificado) < 4:
+        # Un polígono necesita al menos 4 puntos (cerrado): se conserva el
+        # contorno mínimo en lugar de perder islas pequeñas
+        simplificado = cerrado[[0, len(cerrado) // 3, 2 * len(cerrado) // 3, -1]]
+    redondeado = np.round(simplificado, _decimales(tolerancia))
+    # La cuantización puede repetir puntos consecutivos
+    distinto = np.r_[True, np.any(redondeado[1:] != redondeado[:-1], axis=1)]
+    return redondeado[distinto].tolist()
+
+
+def simplificar(geojson, tolerancia):
+    """Copia de `geojson` simplificada a `tolerancia` grados y con coordenadas cuantizadas.
+
+    Los bordes compartidos entre polígonos se simplifican una vez y quedan
+    iguales en los dos lados.
+    """
+    features = geojson['features']
+    anillos = [np.asarray(anillo, dtype='float64')[:-1]
+               for f in features for poligono in _poligonos(f['geometry']) for anillo in poligono]
+    arcos = {}
+    simplificados = iter([_simplificar_anillo(anillo, union, tolerancia, arcos)
+                          for anillo, union in zip(anillos, _uniones(anillos))])
+    resultado = []
+    for f in features:
+        geometria = f['geometry']
+        if geometria['type'] in ('Polygon', 'MultiPolygon'):
+            coordenadas = [[next(simplificados) for _ in poligono] for poligono in _poligonos(geometria)]
+            geometria = {'type': geometria['type'],
+                         'coordinates': coordenadas[0] if geometria['type'] == 'Polygon' else coordenadas}
+        resultado.append({'type': 'Feature', 'properties': f['properties'], 'geometry': geometria})
+    return {'type': 'FeatureCollection', 'features': resultado}
+
+
+def tolerancia_para_zoom(zoom):
+    """Tolerancia más gruesa que no se nota en un mapa de Mapbox a `zoom`."""
+    # Medio píxel en grados (teselas de 512 px)
+    medio_pixel = 360 / (512 * 2 ** zoom) / 2
+    return max([t for t in TOLERANCIAS if t <= medio_pixel], default=TOLERANCIAS[-1])
+
+
+def _hash(ruta):
+    with open(ruta, 'rb') as f:
+        return f'{METODO}-{hashlib.sha256(f.read()).hexdigest()}'
+
+
+def _huella_origen():
+    # Una vez por proceso, como los datasets de almacen
+    if not _huella:
+        _huella.append(_hash(ORIGEN))
+    return _huella[0]
+
+
+def ruta_simplificada(tolerancia):
+    nombre = os.path.splitext(os.path.basename(ORIGEN))[0]
+    return os.path.join(CARPETA, f'{nombre}.{tolerancia:g}.geojson')
+
+
+def _leer_vigente(tolerancia, huella):
+    try:
+        with open(ruta_simplificada(tolerancia), encoding='utf-8') as f:
+            geojson = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return geojson if geojson.get('origen') == huella else None
+
+
+def _generar(tolerancia, huella):
+    with open(ORIGEN, encoding='utf-8') as f:
+        geojson = simplificar(json.load(f), tolerancia)
+    geojson['origen'] = huella
+    ruta = ruta_simplificada(tolerancia)
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(CARPETA, exist_ok=True)
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(geojson, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(temporal, ruta)
+    except OSError:
+        # Sin permisos de escritura: se usa la versión calculada en memoria
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    return geojson
+
+
+def obtener(zoom):
+    """GeoJSON de los departamentos con el detalle adecuado para un mapa a `zoom`."""
+    tolerancia = tolerancia_para_zoom(zoom)
+    if tolerancia not in _geometrias:
+        huella = _huella_origen()
+        geojson = _leer_vigente(tolerancia, huella) or _generar(tolerancia, huella)
+        geojson.pop('origen')
+        _geometrias[tolerancia] = geojson
+    return _geometrias[tolerancia]
+
+
+def version(zoom):
+    """Identifica la geometría que devuelve obtener(zoom): tolerancia y huella del original."""
+    return f'{tolerancia_para_zoom(zoom):g}-{_huella_origen()}'
+
+
+def preprocesar():
+    """Regenera las versiones simplificadas que no correspondan al GeoJSON actual."""
+    huella = _hash(ORIGEN)
+    original = os.path.getsize(ORIGEN)
+    for tolerancia in TOLERANCIAS:
+        ruta = ruta_simplificada(tolerancia)
+        if _leer_vigente(tolerancia, huella) is not None:
+            print(f'{ruta}: vigente')
+            continue
+        _generar(tolerancia, huella)
+        print(f'{ruta}: regenerado ({os.path.getsize(ruta) / original:.0%} del original)')
+
+
+if __name__ == '__main__':
+    preprocesar()
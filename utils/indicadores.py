@@ -0,0 +1,44 @@
+import numpy as np
+
+# Indicadores de las páginas de análisis calculados con NumPy sobre columnas
+# completas, en lugar de fila por fila con apply. Donde el denominador es cero,
+# negativo o falta, el resultado es 0 (no inf ni NaN). `dtype` permite pedir
+# float32 cuando el resultado solo se va a graficar.
+
+
+def cociente(numerador, denominador, escala=1, dtype='float64'):
+    """numerador / denominador * escala, con 0 donde el denominador no es positivo."""
+    numerador = np.asarray(numerador, dtype=dtype)
+    denominador = np.asarray(denominador, dtype=dtype)
+    resultado = np.zeros(np.broadcast(numerador, denominador).shape, dtype=dtype)
+    np.divide(numerador * escala, denominador, out=resultado, where=denominador > 0)
+    return resultado
+
+
+def participacion(valores, total=None, dtype='float64'):
+    """Porcentaje de cada valor sobre `total` (por defecto, la suma de `valores`)."""
+    valores = np.asarray(valores, dtype=dtype)
+    if total is None:
+        total = valores.sum()
+    return cociente(valores, total, 100, dtype)
+
+
+def rentabilidad(participacion_ganancias, porcentaje_empresas, dtype='float64'):
+    """Participación en las ganancias sobre participación en las empresas (x100).
+
+    Vale 0 si alguna de las dos participaciones no es positiva.
+    """
+    ganancias = np.asarray(participacion_ganancias, dtype=dtype)
+    resultado = cociente(ganancias, porcentaje_empresas, 100, dtype)
+    resultado[~(ganancias > 0)] = 0
+    return resultado
+
+
+def por_habitante(valores, poblacion, dtype='float64'):
+    """Valor (empresas, participación en las ganancias) por habitante."""
+    return cociente(valores, poblacion, 1, dtype)
+
+
+def por_poblacion(participacion_ganancias, porcentaje_poblacion, dtype='float64'):
+    """Participación en las ganancias sobre el porcentaje de población."""
+    return cociente(participacion_ganancias, porcentaje_poblacion, 1, dtype)
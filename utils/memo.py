@@ -0,0 +1,59 @@
+import functools
+import hashlib
+import json
+import os
+
+from utils import almacen, serializacion
+
+# Resultados que dependen solo del dataset y no de la selección del usuario
+# (gráficos y tablas a nivel nacional): se calculan una vez por versión de los
+# datos y se guardan serializados en disco, así los reutilizan todos los
+# usuarios y todos los workers. La versión forma parte de la clave, de modo que
+# al cambiar el CSV los resultados anteriores dejan de usarse.
+
+CARPETA = 'memo'
+
+_memoria = {}
+
+
+def _ruta(clave):
+    return os.path.join(CARPETA, clave + '.json')
+
+
+def _leer(clave):
+    try:
+        with open(_ruta(clave), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _escribir(clave, texto):
+    temporal = f'{_ruta(clave)}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(CARPETA, exist_ok=True)
+        with open(temporal, 'wb') as f:
+            f.write(texto)
+        os.replace(temporal, _ruta(clave))
+    except OSError:
+        # Sin permisos de escritura: queda solo la copia en memoria del proceso
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def por_version(nombre):
+    """Memoriza la función por argumentos y versión del dataset `nombre`."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args):
+            firma = json.dumps([funcion.__module__, funcion.__qualname__, args, almacen.version(nombre)])
+            clave = hashlib.sha256(firma.encode()).hexdigest()
+            if clave not in _memoria:
+                texto = _leer(clave)
+                if texto is None:
+                    texto = serializacion.codificar(funcion(*args))
+                    _escribir(clave, texto)
+                _memoria[clave] = serializacion.decodificar(texto)
+            return _memoria[clave]
+        return envoltura
+    return decorador
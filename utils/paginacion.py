@@ -0,0 +1,396 @@
+import calendar
+import datetime
+import math
+import re
+
+import numpy as np
+import pandas as pd
+
+# Tablas paginadas en el servidor: el DataTable (con page_action, sort_action y
+# filter_action en 'custom') pide solo la página visible y el filtrado y el
+# ordenamiento se hacen aquí, sobre un DataFrame que se arma una sola vez por
+# tabla, en lugar de enviar al navegador todas las filas como diccionarios.
+# filter_query se interpreta como lo hace el DataTable con filter_action
+# 'native' (dash-table, src/dash-table/syntax-tree): la misma gramática y
+# precedencia (|| sobre && sobre ! sobre paréntesis) y las mismas
+# comparaciones de JavaScript entre números, textos y celdas vacías. Una
+# consulta que el DataTable no acepta no filtra, como en el navegador.
+
+# Filas por página
+TAMANO_PAGINA = 50
+
+# Lexemas en el orden en que los prueba el DataTable: (nombre, tipo, expresión,
+# grupo con el texto del lexema)
+_LEXEMAS = [
+    ('&&', 'logico', re.compile(r'(and\s|&&)', re.I), 0),
+    ('||', 'logico', re.compile(r'(or\s|\|\|)', re.I), 0),
+    (')', 'cierra', re.compile(r'\)'), 0),
+    ('(', 'abre', re.compile(r'\('), 0),
+    ('contains', 'relacional', re.compile(r'((i|s)?contains)(?=\s|\Z)', re.I), 1),
+    ('datestartswith', 'relacional', re.compile(r'(datestartswith)(?=\s|\Z)', re.I), 1),
+    ('=', 'relacional', re.compile(r'((i|s)?(=|eq(?=\s|\Z)))', re.I), 1),
+    ('>=', 'relacional', re.compile(r'((i|s)?(>=|ge(?=\s|\Z)))', re.I), 1),
+    ('>', 'relacional', re.compile(r'((i|s)?(>|gt(?=\s|\Z)))', re.I), 1),
+    ('<=', 'relacional', re.compile(r'((i|s)?(<=|le(?=\s|\Z)))', re.I), 1),
+    ('<', 'relacional', re.compile(r'((i|s)?(<|lt(?=\s|\Z)))', re.I), 1),
+    ('!=', 'relacional', re.compile(r'((i|s)?(!=|ne(?=\s|\Z)))', re.I), 1),
+] + [
+    (nombre, 'unario', re.compile(f'({nombre})', re.I), 1)
+    for nombre in ['is blank', 'is bool', 'is even', 'is nil', 'is num', 'is object', 'is odd', 'is prime', 'is str']
+] + [
+    # '!' cuenta como operador unario al decidir qué puede seguir
+    ('!', 'unario', re.compile(r'!'), 0),
+    ('campo', 'expresion', re.compile(r'\{(?:[^{}\\]|\\.)+\}'), 0),
+    ('texto', 'expresion', re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`(?:[^`\\]|\\.)*`"), 0),
+    ('valor', 'expresion', re.compile(r'((?:[^\s\'"`{}()\\]|\\.)+)(?:[\s)]|\Z)'), 1),
+]
+
+# Tipos del lexema anterior con los que puede aparecer cada tipo (None: al principio)
+_ANTERIORES = {
+    'logico': {'cierra', 'expresion', 'unario'},
+    'cierra': {'cierra', 'abre', 'expresion', 'unario'},
+    'abre': {None, 'abre', 'logico', 'unario'},
+    'relacional': {'expresion'},
+    'unario': {'expresion'},
+    '!': {None, 'logico', 'unario'},
+    'expresion': {None, 'abre', 'logico', 'relacional'},
+}
+
+# Prioridad de cada operador al elegir la raíz del árbol (mayor: se evalúa último)
+_PRIORIDADES = {'||': 3, '&&': 2, '!': 1.5, '(': 1}
+
+# Celda de una columna que no existe (undefined en JavaScript)
+_INDEFINIDO = object()
+
+_NUMERO_JS = re.compile(r'[+-]?(?:(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|Infinity)\Z', re.A)
+_BASE_JS = re.compile(r'0(?:[xX][0-9a-fA-F]+|[oO][0-7]+|[bB][01]+)\Z')
+_FECHA = re.compile(
+    r'^\s*(-?\d{4}|\d{2})(-(\d{1,2})(-(\d{1,2})([ Tt]([01]?\d|2[0-3])(:([0-5]\d)(:([0-5]\d(\.\d+)?))?'
+    r'(Z|z|[+\-]\d{2}:?\d{2})?)?)?)?)?\s*$',
+    re.M | re.A,
+)
+_ESCAPE = re.compile(r'\\(.)')
+
+_marcos = {}
+
+
+def marco(clave, registros):
+    """DataFrame de `registros` (lista de dicts), armado una sola vez por `clave`."""
+    if clave not in _marcos:
+        _marcos[clave] = pd.DataFrame.from_records(registros)
+    return _marcos[clave]
+
+
+def _lexemas(consulta):
+    # (nombre, tipo, texto) de cada lexema, o None si la consulta no es válida
+    lexemas = []
+    anidamiento = 0
+    while consulta:
+        consulta = consulta.lstrip()
+        anterior = lexemas[-1][1] if lexemas else None
+        for nombre, tipo, expresion, grupo in _LEXEMAS:
+            if anterior not in _ANTERIORES[nombre if nombre == '!' else tipo]:
+                continue
+            if tipo == 'cierra' and anidamiento == 0:
+                continue
+            coincidencia = expresion.match(consulta)
+            if coincidencia:
+                break
+        else:
+            return None
+        texto = coincidencia[grupo]
+        lexemas.append((nombre, tipo, texto))
+        anidamiento += {'abre': 1, 'cierra': -1}.get(tipo, 0)
+        consulta = consulta[len(texto):]
+    if not lexemas:
+        return lexemas
+    nombre, tipo, _ = lexemas[-1]
+    if anidamiento != 0 or tipo not in ('cierra', 'unario', 'expresion') or nombre == '!':
+        return None
+    if tipo == 'expresion' and (len(lexemas) < 2 or lexemas[-2][1] != 'relacional'):
+        return None
+    return lexemas
+
+
+def _arbol(lexemas):
+    # La raíz es el operador de mayor prioridad fuera de paréntesis (el primero si empatan)
+    candidatos = []
+    anidamiento = 0
+    for i, (nombre, tipo, _) in enumerate(lexemas):
+        if anidamiento == 0 and tipo not in ('expresion', 'cierra'):
+            candidatos.append(i)
+        anidamiento += {'abre': 1, 'cierra': -1}.get(tipo, 0)
+    if not candidatos:
+        raise ValueError('Consulta vacía')
+    i = max(candidatos, key=lambda i: _PRIORIDADES.get(lexemas[i][0], -1))
+    nombre, tipo, texto = lexemas[i]
+    if tipo == 'logico':
+        return (nombre, _arbol(lexemas[:i]), _arbol(lexemas[i + 1:]))
+    if nombre in ('(', '!'):
+        return (nombre, _arbol(lexemas[1:-1] if nombre == '(' else lexemas[1:]))
+    # Como en el DataTable, el operador es el segundo lexema
+    if tipo == 'relacional' and len(lexemas) >= 3:
+        return (lexemas[1][0], lexemas[1][2], lexemas[0], lexemas[2])
+    if tipo == 'unario' and len(lexemas) >= 2:
+        return (lexemas[1][0], None, lexemas[0])
+    raise ValueError('Consulta incompleta')
+
+
+def _analizar(filter_query):
+    lexemas = _lexemas(filter_query or '')
+    if not lexemas:
+        return None
+    try:
+        return _arbol(lexemas)
+    except ValueError:
+        return None
+
+
+# Valores y comparaciones con las reglas de JavaScript
+
+def _es_nulo(valor):
+    return valor is None or valor is _INDEFINIDO
+
+
+def _es_numero(valor):
+    return isinstance(valor, (int, float, np.number)) and not isinstance(valor, (bool, np.bool_))
+
+
+def _numero(valor):
+    # Number(valor)
+    if valor is None:
+        return 0.0
+    if _es_numero(valor) or isinstance(valor, bool):
+        return float(valor)
+    if isinstance(valor, str):
+        texto = valor.strip()
+        if not texto:
+            return 0.0
+        if _NUMERO_JS.match(texto):
+            return float(texto.replace('Infinity', 'inf'))
+        if _BASE_JS.match(texto):
+            return float(int(texto, 0))
+    return math.nan
+
+
+def _es_numerico(valor):
+    # isNumeric de fast-isnumeric: números finitos y textos que se leen como tales
+    if isinstance(valor, str):
+        return bool(valor.strip()) and math.isfinite(_numero(valor))
+    return _es_numero(valor) and math.isfinite(valor)
+
+
+def _texto(valor):
+    # valor.toString(); con null o undefined el DataTable falla y la fila no pasa
+    if _es_nulo(valor):
+        raise TypeError('Celda vacía')
+    if isinstance(valor, bool):
+        return 'true' if valor else 'false'
+    if not _es_numero(valor):
+        return str(valor)
+    valor = float(valor)
+    if math.isnan(valor):
+        return 'NaN'
+    if math.isinf(valor):
+        return 'Infinity' if valor > 0 else '-Infinity'
+    if valor == int(valor) and abs(valor) < 1e21:
+        return str(int(valor))
+    if 1e-6 <= abs(valor) < 1e21:
+        return np.format_float_positional(valor, trim='-')
+    return re.sub(r'e([+-])0*', r'e\1', repr(valor))
+
+
+def _identico(a, b):
+    # a === b
+    if _es_numero(a) and _es_numero(b):
+        return float(a) == float(b)
+    return type(a) is type(b) and a == b
+
+
+def _comparar(a, b, comparacion):
+    # a < b (y los demás): textos por orden de caracteres, el resto como números
+    if isinstance(a, str) and isinstance(b, str):
+        return comparacion(a, b)
+    a, b = _numero(a), _numero(b)
+    return not (math.isnan(a) or math.isnan(b)) and comparacion(a, b)
+
+
+def _fecha(valor):
+    # normalizeDate de dash-table/type/date: fecha normalizada a 'AAAA-MM-DD HH:MM:SS'
+    # hasta la precisión del texto, o None
+    if not isinstance(valor, str):
+        return None
+    coincidencia = _FECHA.search(valor)
+    if not coincidencia:
+        return None
+    anio = coincidencia[1]
+    if len(anio) == 2:
+        primero = datetime.date.today().year - 70
+        anio = (int(anio) + 2000 - primero) % 100 + primero
+    else:
+        anio = int(anio)
+    mes, dia = int(coincidencia[3] or 1), int(coincidencia[5] or 1)
+    dias = [31, 29 if calendar.isleap(anio) else 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    if not (1 <= mes <= 12 and 1 <= dia <= dias[mes - 1]):
+        return None
+    hora, minuto, segundos = int(coincidencia[7] or 0), int(coincidencia[9] or 0), coincidencia[11]
+    texto = f'{abs(anio):04d}-{mes:02d}-{dia:02d} {hora:02d}:{minuto:02d}:{segundos or ""}'
+    largo = (29 if segundos else 16 if coincidencia[9] else 13 if coincidencia[7] else
+             10 if coincidencia[5] else 7 if coincidencia[3] else 4)
+    return ('-' if anio < 0 else '') + texto[:largo]
+
+
+def _contiene(izquierda, derecha, sin_mayusculas):
+    if _es_nulo(izquierda) or _es_nulo(derecha):
+        return False
+    if not (isinstance(izquierda, str) or isinstance(derecha, str)):
+        return False
+    izquierda, derecha = _texto(izquierda), _texto(derecha)
+    if sin_mayusculas:
+        izquierda, derecha = izquierda.upper(), derecha.upper()
+    return derecha in izquierda
+
+
+def _igual(izquierda, derecha, sin_mayusculas):
+    if _es_numerico(izquierda) and _es_numerico(derecha):
+        return _numero(izquierda) == _numero(derecha)
+    if sin_mayusculas:
+        return _texto(izquierda).upper() == _texto(derecha).upper()
+    return _identico(izquierda, derecha)
+
+
+def _empieza_con_fecha(izquierda, derecha, sin_mayusculas):
+    izquierda = _texto(izquierda) if _es_numero(izquierda) else izquierda
+    derecha = _texto(derecha) if _es_numero(derecha) else derecha
+    izquierda, derecha = _fecha(izquierda), _fecha(derecha)
+    return izquierda is not None and derecha is not None and izquierda.startswith(derecha)
+
+
+def _relacion(comparacion, distinto=False):
+    # Con el prefijo i se comparan los textos en mayúsculas
+    def evaluar(izquierda, derecha, sin_mayusculas):
+        if sin_mayusculas:
+            return comparacion(_texto(izquierda).upper(), _texto(derecha).upper())
+        if distinto:
+            return not _identico(izquierda, derecha)
+        return _comparar(izquierda, derecha, comparacion)
+    return evaluar
+
+
+def _primo(valor):
+    if valor == 2:
+        return True
+    if valor < 2 or math.fmod(valor, 2) == 0:
+        return False
+    divisor = 3
+    while divisor * divisor <= valor:
+        if math.fmod(valor, divisor) == 0:
+            return False
+        divisor += 2
+    return True
+
+
+def _finito(valor):
+    return _es_numero(valor) and math.isfinite(valor)
+
+
+_RELACIONALES = {
+    'contains': _contiene,
+    'datestartswith': _empieza_con_fecha,
+    '=': _igual,
+    '>=': _relacion(lambda a, b: a >= b),
+    '>': _relacion(lambda a, b: a > b),
+    '<=': _relacion(lambda a, b: a <= b),
+    '<': _relacion(lambda a, b: a < b),
+    '!=': _relacion(lambda a, b: a != b, distinto=True),
+}
+
+_UNARIOS = {
+    'is blank': lambda valor: _es_nulo(valor) or (isinstance(valor, str) and valor == ''),
+    'is bool': lambda valor: isinstance(valor, bool),
+    'is even': lambda valor: _finito(valor) and math.fmod(valor, 2) == 0,
+    'is nil': _es_nulo,
+    'is num': _es_numero,
+    'is object': lambda valor: isinstance(valor, (dict, list)),
+    'is odd': lambda valor: _finito(valor) and math.fmod(valor, 2) == 1,
+    'is prime': lambda valor: _finito(valor) and _primo(valor),
+    'is str': lambda valor: isinstance(valor, str),
+}
+
+
+def _celdas(df, expresion):
+    # Valor de la expresión en cada fila, como lo recibe el navegador (NaN es null)
+    nombre, _, texto = expresion
+    if nombre == 'campo':
+        columna = _ESCAPE.sub(r'\1', texto[1:-1])
+        if columna not in df.columns:
+            return [_INDEFINIDO] * len(df)
+        return [None if isinstance(v, float) and math.isnan(v) else v for v in df[columna].tolist()]
+    if nombre == 'valor' and _es_numerico(texto):
+        return [_numero(texto)] * len(df)
+    if nombre == 'texto':
+        texto = texto[1:-1]
+    return [_ESCAPE.sub(r'\1', texto)] * len(df)
+
+
+def _fila(funcion, *argumentos):
+    try:
+        return funcion(*argumentos)
+    except TypeError:
+        return False
+
+
+def _evaluar(df, arbol):
+    operador = arbol[0]
+    if operador == '||':
+        return _evaluar(df, arbol[1]) | _evaluar(df, arbol[2])
+    if operador == '&&':
+        return _evaluar(df, arbol[1]) & _evaluar(df, arbol[2])
+    if operador == '(':
+        return _evaluar(df, arbol[1])
+    if operador == '!':
+        return ~_evaluar(df, arbol[1])
+    if operador in _UNARIOS:
+        funcion = _UNARIOS[operador]
+        return np.fromiter((funcion(v) for v in _celdas(df, arbol[2])), dtype=bool, count=len(df))
+    funcion = _RELACIONALES[operador]
+    sin_mayusculas = arbol[1][0] == 'i'
+    pares = zip(_celdas(df, arbol[2]), _celdas(df, arbol[3]))
+    return np.fromiter((_fila(funcion, a, b, sin_mayusculas) for a, b in pares), dtype=bool, count=len(df))
+
+
+def filtrar(df, filter_query):
+    """Filas de `df` que cumplen `filter_query`, como las filtra el DataTable en el navegador.
+
+    Una consulta vacía o que el DataTable no acepta devuelve todas las filas.
+    """
+    arbol = _analizar(filter_query)
+    if arbol is None:
+        return df
+    return df[_evaluar(df, arbol)]
+
+
+def ordenar(df, sort_by):
+    """Ordena `df` según `sort_by` ([{'column_id': ..., 'direction': 'asc'|'desc'}]).
+
+    Como en el DataTable, las celdas vacías quedan al final en los dos sentidos.
+    """
+    columnas = [orden for orden in sort_by or [] if orden['column_id'] in df.columns]
+    if not columnas:
+        return df
+    return df.sort_values(
+        [orden['column_id'] for orden in columnas],
+        ascending=[orden['direction'] == 'asc' for orden in columnas],
+        kind='stable',
+        na_position='last',
+    )
+
+
+def pagina(df, page_current, page_size, sort_by=None, filter_query=''):
+    """Registros de la página visible y cantidad de páginas, después de filtrar y ordenar."""
+    page_size = page_size or TAMANO_PAGINA
+    page_current = page_current or 0
+    visibles = ordenar(filtrar(df, filter_query), sort_by)
+    inicio = page_current * page_size
+    registros = visibles.iloc[inicio:inicio + page_size].to_dict('records')
+    return registros, max(1, math.ceil(len(visibles) / page_size))
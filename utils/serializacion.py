@@ -0,0 +1,28 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # sin orjson se usa el json de la biblioteca estándar
+    orjson = None
+
+from plotly.io.json import to_json_plotly
+
+# Serialización de los resultados de los callbacks que se guardan en cache.
+# Se usa el mismo camino que Dash para las respuestas (to_json_plotly, con
+# orjson si está instalado): las figuras pasan por to_dict, que codifica los
+# arrays de NumPy como arrays tipados de plotly.js en base64 ({'dtype',
+# 'bdata'}) en lugar de listas de números. Lo que se guarda son esos bytes,
+# así una vista que ya se calculó no se vuelve a convertir desde objetos de
+# plotly.
+
+
+def codificar(valor):
+    """Bytes JSON de `valor` (figuras, listas, registros de tablas)."""
+    return to_json_plotly(valor, engine='orjson' if orjson is not None else 'json').encode()
+
+
+def decodificar(datos):
+    """Inverso de codificar(): estructuras de Python listas para devolver a Dash."""
+    if orjson is not None:
+        return orjson.loads(datos)
+    return json.loads(datos)
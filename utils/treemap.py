@@ -0,0 +1,185 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.agregacion import agrupar
+
+# Construcción vectorizada de treemaps jerárquicos: en lugar de recorrer cada
+# nodo con iterrows y sumar con una máscara sobre todo el DataFrame, se agrupa
+# una vez al nivel más fino y los niveles superiores se derivan de ese
+# resultado. Cada nodo recibe un id entero (su posición en la figura) y el
+# padre se busca por las claves del nivel superior, así no se arman ni se
+# envían al navegador rutas de texto como 'Central. - Seccion A - Div A0'.
+# subarbol() arma solo una parte del árbol (un nodo y algunos niveles debajo)
+# para los treemaps que cargan el resto a medida que se hace click.
+# Con muchos nodos (decenas de territorios seleccionados) los hijos más chicos
+# de cada padre, en todos los niveles, se juntan en un nodo 'Otros (n)' para
+# no pasar de NODOS. 'Otros (n)' suma las medidas de los nodos que junta; los
+# valores que no se suman (como la rentabilidad, un cociente) se recalculan
+# con `derivar` a partir de esas sumas.
+
+# Máximo de nodos de un treemap
+NODOS = int(os.environ.get('TREEMAP_NODOS', 1000))
+
+# Columna que marca los nodos 'Otros (n)' en la tabla de hojas podada
+OTROS = '_otros'
+RAIZ = '_raiz'
+
+
+def rollup(df, niveles, medidas, agregacion='sum'):
+    """Agrega `medidas` por cada prefijo de `niveles` (como ROLLUP en SQL).
+
+    Se agrupa una sola vez al nivel más fino y cada nivel superior se obtiene
+    reagregando el inferior, así que `agregacion` tiene que poder componerse
+    (sum, max, min). Devuelve una tabla por nivel, de la raíz a las hojas.
+    """
+    funciones = {medida: (medida, agregacion) for medida in medidas}
+    tablas = [agrupar(df, niveles, funciones)]
+    for i in range(len(niveles) - 1, 0, -1):
+        tablas.insert(0, agrupar(tablas[0], niveles[:i], funciones))
+    return tablas
+
+
+def _claves(tabla, columnas):
+    if len(columnas) == 1:
+        return pd.Index(tabla[columnas[0]])
+    return pd.MultiIndex.from_frame(tabla[columnas])
+
+
+def _juntar(tabla, padres, hijo, valor, k, derivar=None):
+    # Los k hijos de mayor `valor` de cada padre y un nodo 'Otros (n)' con la
+    # suma de las medidas del resto; `derivar` recalcula en esos nodos las
+    # columnas que no se suman (cocientes)
+    raiz = not padres
+    if raiz:
+        tabla, padres = tabla.assign(**{RAIZ: ''}), [RAIZ]
+    tabla = tabla.sort_values(valor, ascending=False, kind='stable')
+    puesto = tabla.groupby(padres, sort=False, observed=True).cumcount().to_numpy()
+    medidas = [col for col in tabla.columns
+               if col not in padres + [hijo, OTROS] and pd.api.types.is_numeric_dtype(tabla[col])]
+    resto = tabla[puesto >= k].groupby(padres, sort=False, observed=True)
+    otros = resto[medidas].sum().reset_index()
+    otros[hijo] = 'Otros (' + resto.size().astype(str).to_numpy(dtype=object) + ')'
+    if derivar is not None:
+        otros = derivar(otros)
+    resultado = pd.concat([tabla[puesto < k].assign(**{OTROS: False}), otros.assign(**{OTROS: True})],
+                          ignore_index=True)
+    resultado[OTROS] = resultado[OTROS].astype(bool)
+    return resultado.drop(columns=RAIZ) if raiz else resultado
+
+
+def _recortar(tablas, niveles, valor, k, derivar):
+    # Cada nivel con k hijos por padre; los hijos de un nodo juntado en
+    # 'Otros (n)' no se muestran
+    resultado = []
+    for i, tabla in enumerate(tablas):
+        if resultado:
+            anterior = resultado[-1]
+            vivos = _claves(anterior[~anterior[OTROS]], niveles[:i])
+            tabla = tabla[_claves(tabla, niveles[:i]).isin(vivos)]
+        resultado.append(_juntar(tabla, niveles[:i], niveles[i], valor, k, derivar))
+    return resultado
+
+
+def _podar(tablas, niveles, valor, maximo, derivar=None):
+    # Con más de `maximo` nodos, en todos los niveles se juntan los hijos chicos
+    # de cada padre con el mayor k que entra (búsqueda binaria: los nodos
+    # crecen con k); si ni con k = 1 entra, queda k = 1
+    if maximo is None or sum(len(tabla) for tabla in tablas) <= maximo:
+        return tablas
+    hijos = [tabla.groupby(niveles[:i], sort=False, observed=True).size().max() if i else len(tabla)
+             for i, tabla in enumerate(tablas)]
+    bajo, alto = 1, max(hijos)
+    while bajo < alto:
+        k = (bajo + alto + 1) // 2
+        if sum(map(len, _recortar(tablas, niveles, valor, k, derivar))) <= maximo:
+            bajo = k
+        else:
+            alto = k - 1
+    return _recortar(tablas, niveles, valor, bajo, derivar)
+
+
+def treemap_de_niveles(tablas, niveles, valor, maximo=NODOS, derivar=None):
+    """ids/labels/parents/values de un go.Treemap con una tabla por nivel (como las de rollup).
+
+    La tabla del nivel i tiene las columnas niveles[:i + 1] y la columna `valor`.
+    Los ids son enteros consecutivos, de la raíz a las hojas; ids y values son
+    arrays de NumPy, que plotly envía como arrays tipados. Si hay más de
+    `maximo` nodos, los hijos chicos de cada padre se juntan en 'Otros (n)'
+    (None: sin límite). Si `valor` no es una suma, `derivar(tabla)` devuelve
+    `tabla` con `valor` recalculado a partir de las medidas sumadas.
+    """
+    tablas = _podar(tablas, niveles, valor, maximo, derivar)
+    labels, parents, values = [], [], []
+    for i, (col, nivel) in enumerate(zip(niveles, tablas)):
+        inicio = len(labels)
+        if i == 0:
+            padre = [''] * len(nivel)
+        else:
+            # Posición de cada nodo del nivel anterior en la figura
+            anterior = tablas[i - 1]
+            posiciones = _claves(anterior, niveles[:i]).get_indexer(_claves(nivel, niveles[:i]))
+            padre = (posiciones + inicio - len(anterior)).tolist()
+        labels.extend(nivel[col].astype(str).tolist())
+        parents.extend(padre)
+        values.append(nivel[valor].to_numpy())
+    return {'ids': np.arange(len(labels)), 'labels': labels, 'parents': parents, 'values': np.concatenate(values)}
+
+
+def construir_treemap(df, niveles, valor, agregacion='sum', maximo=NODOS):
+    """Devuelve ids/labels/parents/values de un go.Treemap para la jerarquía `niveles`.
+
+    Los ids son enteros y el label es solo el nombre del nivel (p. ej.
+    'Seccion A'); `valor` se agrega con `agregacion`. Como mucho `maximo`
+    nodos (ver treemap_de_niveles).
+    """
+    return treemap_de_niveles(rollup(df, niveles, [valor], agregacion), niveles, valor, maximo)
+
+
+def profundidades(arbol):
+    """Nivel de cada nodo (0 = raíz) en el mismo orden que arbol['ids']."""
+    nivel = {}
+    for id_, padre in zip(arbol['ids'], arbol['parents']):
+        nivel[id_] = 0 if padre == '' else nivel[padre] + 1
+    return [nivel[id_] for id_ in arbol['ids']]
+
+
+def _vista(tablas, niveles, ruta, profundidad):
+    # Tablas de la vista de `ruta`: el nodo (si la ruta no está vacía) y hasta
+    # `profundidad` niveles debajo, filtradas a su subárbol
+    inicio = max(len(ruta) - 1, 0)
+    vista = []
+    for tabla in tablas[inicio:len(ruta) + profundidad]:
+        if ruta:
+            mascara = np.logical_and.reduce([(tabla[col] == valor).to_numpy() for col, valor in zip(niveles, ruta)])
+            tabla = tabla[mascara]
+        vista.append(tabla)
+    return inicio, vista
+
+
+def subarbol(tablas, niveles, valor, ruta=(), profundidad=2, maximo=NODOS, derivar=None):
+    """ids/labels/parents/values del treemap reducido a un nodo y `profundidad` niveles debajo.
+
+    `ruta` son los valores de niveles[:k] del nodo, que queda como raíz; con la
+    ruta vacía se devuelven los `profundidad` primeros niveles. Sirve para
+    enviar solo la parte del árbol que se ve y pedir el resto al hacer click.
+    """
+    inicio, vista = _vista(tablas, niveles, ruta, profundidad)
+    return treemap_de_niveles(vista, niveles[inicio:], valor, maximo, derivar)
+
+
+def rutas(tablas, niveles, valor, ruta=(), profundidad=2, maximo=NODOS, derivar=None):
+    """Ruta de cada nodo de subarbol(tablas, niveles, valor, ruta, profundidad, maximo, derivar), en el orden de sus ids.
+
+    Para los nodos 'Otros (n)' la ruta es None.
+    """
+    inicio, vista = _vista(tablas, niveles, ruta, profundidad)
+    vista = _podar(vista, niveles[inicio:], valor, maximo, derivar)
+    resultado = []
+    for i, tabla in enumerate(vista):
+        filas = tabla[niveles[:inicio + i + 1]].to_numpy(dtype=object).tolist()
+        if OTROS in tabla:
+            filas = [None if otros else fila for fila, otros in zip(filas, tabla[OTROS])]
+        resultado.extend(filas)
+    return resultado